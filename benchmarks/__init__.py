@@ -0,0 +1,10 @@
+"""Benchmarks of rendering tables, run by airspeed velocity (asv), see asv.conf.json.
+
+Results are stored per commit and machine in .asv/results, so runs can be compared across commits:
+
+    asv machine --yes
+    asv run master^!                    # benchmark the head of master
+    asv continuous master HEAD          # benchmark both and report changes
+    asv compare master HEAD             # compare results already stored
+    asv run --python=same --quick       # try the benchmarks in the current environment, without storing results
+"""
@@ -0,0 +1,137 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+import pybloqs.block.table_formatters as pbtf
+from pybloqs.block.table import HTMLJinjaTableBlock
+from pybloqs.block.table_formatter_builder import CommonTableFormatterBuilder
+
+# Rows and columns of the frames rendered, by name of the shape
+SHAPES = {
+    "1k rows": (1_000, 10),
+    "100k rows": (100_000, 10),
+    "wide": (1_000, 500),
+}
+
+
+def make_frame(n_rows: int, n_columns: int, seed: int = 0) -> pd.DataFrame:
+    """Random values of mixed sign and magnitude with some missing values, as in typical reports."""
+    rng = np.random.RandomState(seed)
+    values = rng.standard_normal((n_rows, n_columns)) * 10.0 ** rng.randint(-2, 6, n_columns)
+    values[rng.random_sample(values.shape) < 0.01] = np.nan
+    return pd.DataFrame(values, columns=[f"column {i}" for i in range(n_columns)])
+
+
+def make_multiindex_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Frame with three row index levels, merged into cells spanning rows, and two column levels."""
+    df = make_frame(n_rows, 12, seed)
+    df.index = pd.MultiIndex.from_arrays(
+        [
+            np.arange(n_rows) // 1000,
+            np.arange(n_rows) // 50 % 20,
+            np.arange(n_rows) % 50,
+        ],
+        names=["book", "desk", "trade"],
+    )
+    df.columns = pd.MultiIndex.from_product([["delta", "gamma", "vega"], ["1d", "1w", "1m", "1y"]])
+    return df
+
+
+def render(df: pd.DataFrame, formatters: Optional[List[pbtf.TableFormatter]] = None, **kwargs) -> str:
+    """Create and render the table with all rows and columns, as the formatters modify the frame on creation."""
+    return HTMLJinjaTableBlock(df, formatters, max_rows=0, max_cols=0, **kwargs).render_html()
+
+
+class TableBenchmark:
+    # Large tables take seconds to render, so each is rendered once per sample
+    number = 1
+    repeat = (1, 5, 60.0)
+    timeout = 600
+
+
+class DefaultFormatters(TableBenchmark):
+    params = list(SHAPES)
+    param_names = ["shape"]
+
+    def setup(self, shape: str) -> None:
+        self.df = make_frame(*SHAPES[shape])
+
+    def time_render(self, shape: str) -> None:
+        render(self.df)
+
+    def peakmem_render(self, shape: str) -> None:
+        render(self.df)
+
+
+class Heatmap(TableBenchmark):
+    params = [list(SHAPES), [None, 0]]
+    param_names = ["shape", "axis"]
+
+    def setup(self, shape: str, axis: Optional[int]) -> None:
+        self.df = make_frame(*SHAPES[shape])
+
+    def time_render(self, shape: str, axis: Optional[int]) -> None:
+        render(self.df, [pbtf.FmtHeatmap(axis=axis)])
+
+    def peakmem_render(self, shape: str, axis: Optional[int]) -> None:
+        render(self.df, [pbtf.FmtHeatmap(axis=axis)])
+
+
+class MultiIndex(TableBenchmark):
+    params = [1_000, 100_000]
+    param_names = ["n_rows"]
+
+    def setup(self, n_rows: int) -> None:
+        self.df = make_multiindex_frame(n_rows)
+
+    def time_render(self, n_rows: int) -> None:
+        render(self.df)
+
+    def peakmem_render(self, n_rows: int) -> None:
+        render(self.df)
+
+    def time_render_expanded(self, n_rows: int) -> None:
+        render(self.df, [pbtf.FmtExpandMultiIndex()])
+
+    def peakmem_render_expanded(self, n_rows: int) -> None:
+        render(self.df, [pbtf.FmtExpandMultiIndex()])
+
+
+class FormatterBuilderDefaults(TableBenchmark):
+    params = list(SHAPES)
+    param_names = ["shape"]
+
+    def setup(self, shape: str) -> None:
+        self.df = make_frame(*SHAPES[shape])
+
+    def _render(self) -> str:
+        return render(self.df, CommonTableFormatterBuilder(self.df).formatters, use_default_formatters=False)
+
+    def time_render(self, shape: str) -> None:
+        self._render()
+
+    def peakmem_render(self, shape: str) -> None:
+        self._render()
+
+
+class RenderOptions(TableBenchmark):
+    """Options of HTMLJinjaTableBlock changing how the markup is written, for a table of the default formatters."""
+
+    params = ["inline styles", "css_classes", "structural_css", "compact"]
+    param_names = ["option"]
+
+    def setup(self, option: str) -> None:
+        self.df = make_frame(*SHAPES["100k rows"])
+        self.kwargs = {} if option == "inline styles" else {option: True}
+
+    def time_render(self, option: str) -> None:
+        render(self.df, **self.kwargs)
+
+    def peakmem_render(self, option: str) -> None:
+        render(self.df, **self.kwargs)
+
+    def track_html_bytes(self, option: str) -> int:
+        return len(render(self.df, **self.kwargs).encode("utf-8"))
+
+    track_html_bytes.unit = "bytes"
@@ -3,11 +3,15 @@ from pybloqs.block.collapsible import CollapsibleBlock
 from pybloqs.block.convenience import Block
 from pybloqs.block.image import ImgBlock, PlotBlock, set_plot_format
 from pybloqs.block.layout import Flow, Grid, HStack, VStack
-from pybloqs.block.table import HTMLJinjaTableBlock
+from pybloqs.block.table import HTMLJinjaTableBlock, StreamingHTMLJinjaTableBlock
 from pybloqs.block.text import Markdown, Pre, Raw, Span
 from pybloqs.block.wrap import Box, Paragraph
 from pybloqs.util import Cfg
 
+# isort: split
+# Registers the block types of Arrow tables, after the blocks it depends on
+from pybloqs.block.arrow_table import ArrowTableBlock
+
 try:
     from importlib.metadata import PackageNotFoundError, distribution
 
@@ -39,6 +43,8 @@ __all__ = [
     "ImgBlock",
     "PlotBlock",
     "HTMLJinjaTableBlock",
+    "StreamingHTMLJinjaTableBlock",
+    "ArrowTableBlock",
     "Box",
     "Paragraph",
     "Pre",
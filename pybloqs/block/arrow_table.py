@@ -0,0 +1,68 @@
+from typing import Any, List, Optional
+
+import pandas as pd
+
+from pybloqs.block.convenience import add_block_types
+from pybloqs.block.table import HTMLJinjaTableBlock, _to_numpy_backed
+from pybloqs.block.table_formatters import TableFormatter
+
+try:
+    import pyarrow as pa
+
+    _PYARROW_AVAILABLE = True
+except ImportError:
+    _PYARROW_AVAILABLE = False
+
+try:
+    import polars as pl
+
+    _POLARS_AVAILABLE = True
+except ImportError:
+    _POLARS_AVAILABLE = False
+
+
+class ArrowTableBlock(HTMLJinjaTableBlock):
+    def __init__(
+        self,
+        table: Any,
+        formatters: Optional[List[TableFormatter]] = None,
+        use_default_formatters: bool = True,
+        **kwargs,
+    ) -> None:
+        """Create table from a pyarrow.Table or RecordBatch, or from a frame providing to_arrow(), e.g. Polars.
+
+        Columns are read from the Arrow buffers through pandas columns of pd.ArrowDtype, instead of being copied into
+        a pandas dataframe first. Body cells are converted one column at a time as they are rendered. Only if a
+        formatter modifies the dataframe, e.g. to append totals, the columns are converted to numpy arrays first.
+
+        Parameters()
+        ----------
+        table: 'pyarrow.Table'
+            The table from which the values are taken.
+        formatters: 'list'
+            List of formatters, which are objects inheriting from TableFormatter class.
+        kwargs:
+            See HTMLJinjaTableBlock.
+        """
+        if not _PYARROW_AVAILABLE:
+            raise ImportError("ArrowTableBlock requires pyarrow")
+        if hasattr(table, "to_arrow"):
+            table = table.to_arrow()
+        # Zero-copy, the columns wrap the chunked arrays of the table
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        super().__init__(df, formatters, use_default_formatters, **kwargs)
+
+    def modify_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self._hook_formatters["modify_dataframe"]:
+            # Formatters modifying the dataframe, e.g. inserting rows, expect numpy columns
+            df = pd.concat([_to_numpy_backed(df.iloc[:, i]) for i in range(df.shape[1])], axis=1).set_axis(
+                df.columns, axis=1
+            )
+        return super().modify_dataframe(df)
+
+
+if _PYARROW_AVAILABLE:
+    add_block_types((pa.Table, pa.RecordBatch), ArrowTableBlock)
+
+if _POLARS_AVAILABLE:
+    add_block_types(pl.DataFrame, ArrowTableBlock)
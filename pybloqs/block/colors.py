@@ -51,6 +51,18 @@ def css_color_from_tuple(color_tuple: Tuple[float, ...]) -> str:
     return rgb_string
 
 
+def css_colors_from_alphas(color_tuple: Tuple[float, ...], alphas: np.ndarray) -> List[str]:
+    """Vectorised css_color_from_tuple((*color_tuple, alpha)) for each of the given alpha values."""
+    if len(color_tuple) != 3:
+        raise ValueError("Color passed as tuple, but length of tuple is not 3 or 4, but:", len(color_tuple) + 1)
+    color_array = np.array(color_tuple, dtype=float)
+    alphas = np.asarray(alphas, dtype=float)[:, np.newaxis]
+    scaled = ((1 - alphas) * (1 - color_array) + color_array) * 255
+    if not np.isfinite(scaled).all():
+        raise ValueError("cannot convert float NaN or infinity to integer")
+    return ["rgb(" + ",".join(rgb) + ")" for rgb in np.trunc(scaled).astype(np.int64).astype(str).tolist()]
+
+
 def css_color_from_string(color_string: str) -> str:
     if len(color_string) == 7 and color_string[0] == "#":
         # We got a hex string, no conversion necessary
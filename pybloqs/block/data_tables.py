@@ -1,8 +1,12 @@
-from typing import List, Optional
+import json
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
+from bs4.element import Tag
 
-from pybloqs.block.table import HTMLJinjaTableBlock
+from pybloqs.block.table import HTMLJinjaTableBlock, IndexCell
 from pybloqs.block.table_formatters import (
     TableFormatter,
     fmt_align_cells,
@@ -13,21 +17,41 @@ from pybloqs.block.table_formatters import (
     fmt_page_break,
     fmt_table_center,
 )
+from pybloqs.html import js_elem
 from pybloqs.static import Css, JScript
+from pybloqs.util import encode_string
+
+# Page lengths offered by tables initialised by their own script, as by jquery-dataTables-impl
+_LENGTH_MENU = [[10, 25, 50, 100, 250, 500, 1000, -1], [10, 25, 50, 100, 250, 500, 1000, "All"]]
 
 
 class DataTablesCSSClass(TableFormatter):
-    def __init__(self, paging: bool = True, searching: bool = True, info: bool = True) -> None:
+    def __init__(
+        self,
+        paging: bool = True,
+        searching: bool = True,
+        info: bool = True,
+        server_side: bool = False,
+        json_data: bool = False,
+    ) -> None:
         super().__init__()
         self.paging = paging
         self.searching = searching
         self.info = info
+        self.server_side = server_side
+        self.json_data = json_data
 
     def create_table_level_css_class(self) -> str:
         no_paging = " dt-no-paging" if self.paging is False else ""
         no_info = " dt-no-info" if self.info is False else ""
         no_searching = " dt-no-searching" if self.searching is False else ""
-        css = f"blox_table compact row-border order-col stripe nowrap{no_paging}{no_info}{no_searching}"
+        # Server side and JSON data tables are initialised by their own script rather than jquery-dataTables-impl
+        server_side = " dt-server-side" if self.server_side else ""
+        json_data = " dt-json-data" if self.json_data else ""
+        css = (
+            f"blox_table compact row-border order-col stripe nowrap"
+            f"{no_paging}{no_info}{no_searching}{server_side}{json_data}"
+        )
         return css
 
 
@@ -39,6 +63,9 @@ class DataTablesHTMLJinjaTableBlock(HTMLJinjaTableBlock):
         JScript("jquery-dataTables-impl"),
     )
 
+    # Rows are filtered, sorted and paged by a server, see pybloqs.server.block.ServerSideDataTable
+    server_side = False
+
     def __init__(
         self,
         df: pd.DataFrame,
@@ -47,11 +74,33 @@ class DataTablesHTMLJinjaTableBlock(HTMLJinjaTableBlock):
         paging: bool = True,
         searching: bool = True,
         info: bool = True,
+        json_data: bool = False,
         **kwargs,
     ) -> None:
+        """Create table which can be paged, searched and sorted in the browser by jQuery DataTables.
+
+        Parameters()
+        ----------
+        df: 'DataFrame'
+            The DF from which the values are taken.
+        formatters: 'list'
+            List of formatters, which are objects inheriting from TableFormatter class.
+        paging, searching, info: 'bool'
+            Toggle the DataTables controls.
+        json_data: 'bool'
+            If True, rows are embedded as compressed JSON and DataTables only creates the rows shown (deferRender),
+            instead of writing all rows into the document. Styles of rows and cells are kept, index cells are not
+            merged across rows. Not supported with css_classes.
+        """
+        if json_data and kwargs.get("css_classes"):
+            raise ValueError("json_data does not support css_classes, styles are interned in the JSON data instead")
+        if json_data:
+            # All rows are embedded as data and paged by DataTables
+            kwargs.setdefault("max_rows", 0)
+            kwargs.setdefault("max_cols", 0)
         if formatters is None and use_default_formatters is False:
             formatters = [
-                DataTablesCSSClass(paging, searching, info),
+                DataTablesCSSClass(paging, searching, info, self.server_side, json_data),
                 fmt_fontsize_12,
                 fmt_table_center,
                 fmt_align_cells,
@@ -61,3 +110,118 @@ class DataTablesHTMLJinjaTableBlock(HTMLJinjaTableBlock):
                 fmt_decimals_2,
             ]
         super().__init__(df, formatters, use_default_formatters, **kwargs)
+        self.json_data = json_data
+        # Rows of the table being rendered in JSON data mode, see _render_tbody_json()
+        self._rows_data: Optional[Dict[str, Any]] = None
+
+    def _get_index_iterable(self) -> List[List[IndexCell]]:
+        if (self.json_data or self.server_side) and isinstance(self.df.index, pd.MultiIndex):
+            # DataTables does not support cells spanning rows, which it creates itself
+            return [[IndexCell(value, [row], 1, 1) for value in row] for row in self.df.index.tolist()]
+        return super()._get_index_iterable()
+
+    def _get_template_model(
+        self,
+        index_iterable: List[List[IndexCell]],
+        row_names: pd.Index,
+        additional_html: str,
+        render_tbody_rows: Optional[Callable[[], str]] = None,
+    ) -> Dict[str, Any]:
+        if render_tbody_rows is None and self.json_data:
+            render_tbody_rows = partial(self._render_tbody_json, index_iterable, row_names)
+        return super()._get_template_model(index_iterable, row_names, additional_html, render_tbody_rows)
+
+    def _write_contents(self, container, actual_cfg, *args, **kwargs) -> None:
+        super()._write_contents(container, actual_cfg, *args, **kwargs)
+        if not self.json_data:
+            return
+        rows_json = json.dumps(self._rows_data)
+        self._rows_data = None
+        if JScript.global_encode:
+            # The default compression level of zlib, as the highest level takes about ten times longer on large tables
+            rows_js = f'JSON.parse(RawDeflate.inflate(atob("{encode_string(rows_json, level=6).decode()}")))'
+        else:
+            rows_js = rows_json.replace("</", "<\\/")
+        _write_initialisation(
+            container,
+            f"table{self._id}",
+            {
+                "deferRender": True,
+                "lengthMenu": _LENGTH_MENU,
+                "columnDefs": [{"type": "sort-column", "targets": "_all"}],
+            },
+            f"""
+                var rows = {rows_js};
+                options.data = rows.data;
+                options.createdRow = function (row, data, dataIndex) {{
+                    var cellStyles = rows.cellStyles[dataIndex];
+                    row.setAttribute("style", rows.styles[rows.rowStyles[dataIndex]]);
+                    $(row).children("td").each(function (i) {{
+                        this.setAttribute("style", rows.styles[cellStyles[i]]);
+                    }});
+                }};
+            """,
+        )
+
+    def _render_tbody_json(self, index_iterable: List[List[IndexCell]], row_names: pd.Index) -> str:
+        """Collect the body rows as data for DataTables instead of rendering them, see _get_json_rows()."""
+        self._rows_data = self._get_json_rows(index_iterable, row_names)
+        return ""
+
+    def _get_json_rows(self, index_iterable: List[List[IndexCell]], row_names: pd.Index) -> Dict[str, Any]:
+        """Contents of the cells of each body row, as displayed by DataTables.
+
+        Distinct styles are listed once and rows and cells refer to them by position, see _get_body_cells().
+        """
+        style_index = self._style_classes = _StyleIndex()
+        try:
+            row_styles, cell_styles, contents = self._get_body_cells(index_iterable, row_names)
+        finally:
+            self._style_classes = None
+        return {"styles": style_index.styles(), "rowStyles": row_styles, "cellStyles": cell_styles, "data": contents}
+
+
+class _StyleIndex:
+    """Distinct CSS of table rows and cells, interned by position in a list of styles.
+
+    Takes the place of _StyleClasses while rows are collected as data, e.g. as JSON data or rows served to DataTables,
+    so the style hooks of the table return positions instead of attributes.
+    """
+
+    def __init__(self) -> None:
+        self.positions: Dict[str, int] = {}
+
+    def attribute(self, css: str) -> int:
+        return self.positions.setdefault(css, len(self.positions))
+
+    def attributes(self, css: np.ndarray) -> np.ndarray:
+        codes, distinct = pd.factorize(css)
+        return np.array([self.attribute(value) for value in distinct.tolist()], dtype=object)[codes]
+
+    def styles(self) -> List[str]:
+        return list(self.positions)
+
+
+def _write_initialisation(container: Tag, container_id: str, options: Dict[str, Any], script: str = "") -> None:
+    """Write script initialising the DataTables table in container with options, instead of jquery-dataTables-impl.
+
+    The script may set further options, e.g. functions, on the variable `options` before the table is initialised.
+    """
+    container["id"] = container_id
+    js_elem(
+        container,
+        f"""
+            $(document).ready(function () {{
+                var table = $("#{container_id} table");
+                var options = {json.dumps(options)};
+                options.paging = !table.hasClass("dt-no-paging");
+                options.searching = !table.hasClass("dt-no-searching");
+                options.info = !table.hasClass("dt-no-info");
+                {script.strip()}
+                if ($.fn.dataTable.isDataTable(table)) {{
+                    table.DataTable().destroy();
+                }}
+                table.DataTable(options);
+            }});
+        """,
+    )
@@ -1,34 +1,139 @@
-from collections import namedtuple
-from typing import Any, Iterable, List, Optional, Tuple
+import copy
+import hashlib
+import logging
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import partial
+from typing import Any, Callable, ContextManager, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
+from bs4.element import Tag
 from jinja2 import Environment, PackageLoader
 
 from pybloqs.block.base import BaseBlock
 from pybloqs.block.convenience import add_block_types
-from pybloqs.block.table_formatters import DEFAULT_DECIMALS_FORMATTER, DEFAULT_FORMATTERS, ORG_ROW_NAMES, TableFormatter
-from pybloqs.html import parse
+from pybloqs.block.table_formatters import (
+    DEFAULT_DECIMALS_FORMATTER,
+    DEFAULT_FORMATTERS,
+    INDEX_COL_NAME,
+    ORG_ROW_NAMES,
+    TableFormatter,
+    TableLayout,
+    TableStatistics,
+    _fingerprint,
+)
+from pybloqs.config import user_config
+from pybloqs.html import append_verbatim, parse, render
+from pybloqs.static import Css
 
-_jinja_env = Environment(loader=PackageLoader("pybloqs", "jinja"))
+_jinja_env = Environment(loader=PackageLoader("pybloqs", "jinja"), trim_blocks=True, lstrip_blocks=True)
 _jinja_env.globals.update(len=len)
 _jinja_env.globals.update(enumerate=enumerate)
 _jinja_env.globals.update(slice=slice)
 _jinja_env.globals.update(zip=zip)
 _table_tmpl = _jinja_env.get_template("table.html")
+_table_rows_tmpl = _jinja_env.get_template("table_rows.html")
+
+logger = logging.getLogger(__name__)
+
+# Content of the cells standing in for rows and columns left out of truncated tables
+ELISION = "..."
+
+# Class of tables written compact, which are spaced and padded by _COMPACT_STYLE_SHEET instead of attributes
+COMPACT_TABLE_CLASS = "blox_compact"
+
+# Same as the cellspacing="0" and cellpadding="1" attributes, which any other CSS overrides as it has no specificity
+_COMPACT_STYLE_SHEET = Css(
+    css_string=(
+        f":where(table.{COMPACT_TABLE_CLASS}) {{border-spacing: 0}}\n"
+        f":where(table.{COMPACT_TABLE_CLASS} > * > tr > td, table.{COMPACT_TABLE_CLASS} > * > tr > th) {{padding: 1px}}"
+    ),
+    name="table-compact",
+)
+
+# Indentation per depth of elements within the table, depth of rows and cells and indentation of their contents, see
+# _tag_layout()
+_INDENT = " "
+_ROW_DEPTH = 2
+_CELL_DEPTH = 3
+_CONTENT_INDENT = _INDENT * 4
+# Markup which may not stay within its cell when parsed along with other cells, i.e. tags of rows and cells and
+# character references parsed depending on the markup after them, see _parse_contents()
+_UNCONTAINED_MARKUP = re.compile(
+    r"</?(?:table|thead|tbody|tfoot|tr|th|td)\b|&#(?![0-9]|[xX][0-9a-fA-F])", re.IGNORECASE
+)
+# Empty attributes left out of compact tags
+_EMPTY_ATTRIBUTES = ('style=""', 'class=""')
+
+# Start and end tags of table elements with the whitespace around them, see _compact_markup()
+_TABLE_TAG = re.compile(r"\s*<(/?(?:table|colgroup|col|thead|tbody|tr|th|td))\b([^>]*)>\s*")
+_DEFAULT_ATTRIBUTE = re.compile(r'\s+(?:(?:style|class)=""|(?:rowspan|colspan)="1")(?=[\s/]|$)')
+_WHITESPACE = re.compile(r"\s+")
 
 
 IndexCell = namedtuple("IndexCell", ["value", "names", "span", "depth"])
 
+# Markup of a rendered table, whether it is to be parsed to keep only the table element, and its stylesheets
+RenderedTable = namedtuple("RenderedTable", ["table_html", "parse", "style_sheets"])
+
+# Markup of the body rows of a table rendered with cell_ids, of the start tag of each row, of each cell by position and
+# of the end tag of the rows
+RenderedCells = namedtuple("RenderedCells", ["rows_html", "row_tags", "cell_html", "row_end"])
+
+# Hooks of TableFormatter called by HTMLJinjaTableBlock
+FORMATTER_HOOKS = (
+    "insert_additional_html",
+    "modify_dataframe",
+    "modify_cell_content",
+    "modify_column_content",
+    "create_table_level_css",
+    "create_table_level_css_class",
+    "create_thead_level_css",
+    "create_row_level_css",
+    "create_column_level_css",
+    "create_cell_level_css",
+)
+
+# Hooks timed for each formatter of a profiled table, including the vectorised versions of cell and row level CSS
+PROFILED_HOOKS = (
+    *FORMATTER_HOOKS,
+    "create_column_cell_level_css",
+    "create_body_row_level_css",
+    "create_structural_css",
+)
+
 
 class HTMLJinjaTableBlock(BaseBlock):
     FormatterData = namedtuple("FormatterData", ["cell", "row_name", "column_name", "df"])
 
+    # Classes for row and cell CSS of the table being rendered, if css_classes is set
+    _style_classes: Optional["_StyleClasses"] = None
+    # Number of leading formatters of cell level CSS replaced by CSS rules of the table being rendered
+    _n_structural_formatters = 0
+    # Formatters of the table, while the table being rendered holds copies of them, see _bind_formatters()
+    _shared_formatters: Optional[List[TableFormatter]] = None
+
     def __init__(
         self,
         df: pd.DataFrame,
         formatters: Optional[List[TableFormatter]] = None,
         use_default_formatters: bool = True,
         merge_vertical: bool = False,
+        css_classes: bool = False,
+        max_workers: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        max_cols: Optional[int] = None,
+        profile: bool = False,
+        structural_css: bool = False,
+        render_cache: Union[bool, "TableRenderCache"] = False,
+        cell_ids: Optional[str] = None,
+        compact: bool = False,
         **kwargs,
     ) -> None:
         """Create table from Jinja framework. Apply formatters to customise table formatting.
@@ -39,6 +144,48 @@ class HTMLJinjaTableBlock(BaseBlock):
             The DF from which the values are taken.
         formatters: 'list'
             List of formatters, which are objects inheriting from TableFormatter class.
+        css_classes: 'bool'
+            If True, each distinct CSS of rows and cells is written once as generated class into a <style> element
+            and referenced by class name, instead of repeating it as inline style of each row and cell. The rules of
+            the classes are scoped to the table id, so that they take precedence over rules of the document styling
+            cells by element or class.
+        max_workers: 'int'
+            If set, the rows of the table body are split into as many ranges, which are rendered in parallel by a
+            pool of processes. Header, column and table level styles are still rendered by the table itself.
+        max_rows: 'int'
+            Tables with more rows only show as many rows from their head and tail, separated by a row of ellipses.
+            Formatters still compute statistics, e.g. heatmap ranges, on all rows. Defaults to
+            user_config["table_max_rows"]. 0 shows all rows.
+        max_cols: 'int'
+            Same as max_rows for columns, showing the first and last columns. Defaults to user_config["table_max_cols"].
+        profile: 'bool'
+            If True, the number of calls and time spent in each hook of each formatter, as well as in rendering the
+            template and parsing the table, are recorded in render_profile. Adds up over all renders of the table.
+        structural_css: 'bool'
+            If True, formatters applying the same style to whole columns, alternating rows, or the header and index,
+            e.g. the default formatters, write it once as CSS rules scoped to the table into a <style> element, instead
+            of into the style of each cell. Rules keep the order of formatters, so formatters after the first one which
+            needs inline styles are still applied inline. Tables rendering rows as partitions, e.g. if truncated or
+            with max_workers, are styled inline.
+        render_cache: 'bool' or 'TableRenderCache'
+            If set, the rendered table is looked up in this cache, or in default_render_cache if True, by fingerprints
+            of the dataframe (pd.util.hash_pandas_object) and of the formatters' parameters, see
+            TableFormatter.fingerprint(). If found, e.g. when a Poll provider rebuilds a table of unchanged data, the
+            markup rendered before is written without calling the formatters. As tables are rendered by copies of
+            their formatters, a table taken from the cache is the same as if rendered again. State outside the
+            attributes of the formatters, e.g. global variables read by a condition, is not part of the fingerprint,
+            so tables depending on it must not be cached. Not supported by tables writing more than the table
+            element, e.g. DataTables tables.
+        cell_ids: 'str'
+            If set, body rows and cells get ids by position, f"{cell_ids}-{row}" and f"{cell_ids}-{row}-{column}"
+            counting index levels first, so that single rows and cells can be replaced, see
+            pybloqs.server.block.IncrementalPoll. The markup of the rows and cells is kept in rendered_cells. Index
+            cells are not merged across rows, and rows and columns are not truncated.
+        compact: 'bool'
+            If True, the table is written without indentation, empty styles and classes, spans of one row or column,
+            and the border, cellpadding and cellspacing attributes, which are set by a stylesheet instead. Looks the
+            same, but takes fewer bytes to send and parse. Only the table element written verbatim stays compact, so
+            tables inserting additional HTML are indented by render_html(pretty=True).
         """
         super().__init__(**kwargs)
         if formatters is None:
@@ -47,30 +194,116 @@ class HTMLJinjaTableBlock(BaseBlock):
             formatters = DEFAULT_FORMATTERS + formatters + DEFAULT_DECIMALS_FORMATTER
 
         self.formatters = formatters
+        self.render_profile = RenderProfile() if profile else None
+        self._compile_formatters()
         # Apply modifications to DataFrame at the earliest stage.
-        for formatter in formatters:
+        self.df = df = self.modify_dataframe(df)
+        # Original row names looked up by row_index while rendering, see _get_org_row_names()
+        self._org_row_names = self._get_org_row_names()
+        # Statistics of self.df shared by the formatters, created when the table is rendered
+        self.statistics: Optional[TableStatistics] = None
+        self.n_header_rows = len(df.columns.names)
+        self.merge_vertical = merge_vertical
+        self.css_classes = css_classes
+        self.max_workers = max_workers
+        self.max_rows = user_config["table_max_rows"] if max_rows is None else max_rows
+        self.max_cols = user_config["table_max_cols"] if max_cols is None else max_cols
+        self.structural_css = structural_css
+        self.compact = compact
+        self.cell_ids = cell_ids
+        if cell_ids is not None:
+            # Rows and cells are identified by their position in the whole table
+            self.max_rows = self.max_cols = 0
+        # Markup of the body rows and cells last rendered, if cell_ids is set
+        self.rendered_cells: Optional[RenderedCells] = None
+        if render_cache is True:
+            render_cache = default_render_cache
+        self.render_cache = render_cache if isinstance(render_cache, TableRenderCache) else None
+
+    def _compile_formatters(self) -> None:
+        """Find out once which formatters implement which hook, so rendering only calls the relevant formatters.
+
+        If the table is profiled, the hooks are called through stand-ins timing each call, see _ProfiledFormatter.
+        """
+        formatters = self.formatters
+        if self.render_profile is not None:
+            formatters = [
+                _ProfiledFormatter(formatter, f"{type(formatter).__name__}[{position}]", self.render_profile)
+                for position, formatter in enumerate(formatters)
+            ]
+        self._hook_formatters: Dict[str, List[TableFormatter]] = {
+            hook: [formatter for formatter in formatters if formatter.implements(hook)] for hook in FORMATTER_HOOKS
+        }
+        # Cells are styled by CSS rules of the table instead, see _bind_structural_css()
+        del self._hook_formatters["create_cell_level_css"][: self._n_structural_formatters]
+        self._hook_functions: Dict[str, List[Callable]] = {
+            hook: [getattr(formatter, hook) for formatter in formatters]
+            for hook, formatters in self._hook_formatters.items()
+        }
+        # Pairs of formatter and whether it modifies whole columns at once or needs to be applied cell by cell
+        self._column_content_formatters: List[Tuple[TableFormatter, bool]] = [
+            (formatter, formatter.vectorises_column_content())
+            for formatter in formatters
+            if formatter.implements("modify_column_content") or formatter.implements("modify_cell_content")
+        ]
+        # Table body can be rendered without the template, if all cell and row level CSS is vectorised
+        self._vectorised_tbody = (
+            all(formatter.vectorises_cell_level_css() for formatter in self._hook_formatters["create_cell_level_css"])
+            and all(formatter.vectorises_row_level_css() for formatter in self._hook_formatters["create_row_level_css"])
+            and all(
+                getattr(type(self), hook) is getattr(HTMLJinjaTableBlock, hook)
+                for hook in ("create_row_level_css", "create_cell_level_css", "modify_column_content")
+            )
+        )
+
+    def modify_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        for formatter in self._hook_formatters["modify_dataframe"]:
             try:
                 df = formatter.modify_dataframe(df)
             except NotImplementedError:
                 continue
-        self.df = df
-        self.n_header_rows = len(df.columns.names)
-        self.merge_vertical = merge_vertical
+        return df
 
     def modify_cell_content(self, cell, row_name, column_name) -> Any:
-        if ORG_ROW_NAMES in self.df.columns and self.row_index > 0:
-            row_name = self.df[ORG_ROW_NAMES].iloc[self.row_index]
-        for formatter in self.formatters:
+        if self._org_row_names is not None and self.row_index > 0:
+            row_name = self._org_row_names[self.row_index]
+        for modify_cell_content in self._hook_functions["modify_cell_content"]:
             try:
-                data = self.FormatterData(cell, row_name, column_name, self.df)
-                cell = formatter.modify_cell_content(data)
+                cell = modify_cell_content(self.FormatterData(cell, row_name, column_name, self.df))
             except NotImplementedError:
                 continue
         return cell
 
+    def modify_column_content(self, series: pd.Series, column_name: str) -> pd.Series:
+        """Apply all formatters to the cell values of one column. Series is indexed by the row names of the cells.
+
+        Formatters without vectorised implementation are applied cell by cell.
+        """
+        for formatter, is_vectorised in self._column_content_formatters:
+            if not is_vectorised:
+                series = self._modify_column_content_by_cell(formatter, series, column_name)
+                continue
+            try:
+                series = formatter.modify_column_content(series, column_name)
+            except NotImplementedError:
+                series = self._modify_column_content_by_cell(formatter, series, column_name)
+        return series
+
+    def _modify_column_content_by_cell(
+        self, formatter: TableFormatter, series: pd.Series, column_name: str
+    ) -> pd.Series:
+        try:
+            values = [
+                formatter.modify_cell_content(self.FormatterData(cell, row_name, column_name, self.df))
+                for row_name, cell in series.items()
+            ]
+        except NotImplementedError:
+            return series
+        return pd.Series(values, index=series.index, name=series.name, dtype=object)
+
     def insert_additional_html(self) -> str:
         html_string = ""
-        for formatter in self.formatters:
+        for formatter in self._hook_formatters["insert_additional_html"]:
             try:
                 html_string += formatter.insert_additional_html()
             except NotImplementedError:
@@ -80,62 +313,667 @@ class HTMLJinjaTableBlock(BaseBlock):
     def _join_css_substrings(self, css_substrings: Iterable[str], prefix: str) -> str:
         return prefix + '="' + "; ".join(css_substrings) + '"'
 
+    def _join_row_and_cell_css(self, css_substrings: Iterable[str]) -> str:
+        """Return style attribute of a row or cell, or its class attribute if styles are interned as classes."""
+        if self._style_classes is None:
+            return self._join_css_substrings(css_substrings, "style")
+        return self._style_classes.attribute("; ".join(css_substrings))
+
     def _aggregate_css_formatters(
         self, function_name: str, fmt_args: Optional[List[Any]] = None, prefix: str = "style"
     ) -> str:
+        return self._join_css_substrings(self._collect_css_substrings(function_name, fmt_args), prefix)
+
+    def _collect_css_substrings(self, function_name: str, fmt_args: Optional[List[Any]] = None) -> List[str]:
         css_substrings = []
         fmt_args = fmt_args if fmt_args else []
-        for formatter in self.formatters:
+        fmt_funcs = self._hook_functions.get(function_name)
+        if fmt_funcs is None:
+            fmt_funcs = [
+                getattr(formatter, function_name)
+                for formatter in self.formatters
+                if formatter.implements(function_name)
+            ]
+        for fmt_func in fmt_funcs:
             try:
-                fmt_func = getattr(formatter, function_name)
                 css_substring = fmt_func(*fmt_args)
             except NotImplementedError:
                 continue
             if css_substring is not None:
                 css_substrings.append(css_substring)
-        return self._join_css_substrings(css_substrings, prefix)
+        return css_substrings
 
     def create_table_level_css(self) -> str:
         self.row_index = -self.n_header_rows - 1
         return self._aggregate_css_formatters("create_table_level_css")
 
     def create_table_level_css_class(self) -> str:
-        return self._aggregate_css_formatters("create_table_level_css_class", prefix="class")
+        if not self.compact:
+            return self._aggregate_css_formatters("create_table_level_css_class", prefix="class")
+        css_classes = "; ".join(self._collect_css_substrings("create_table_level_css_class"))
+        return 'class="' + (COMPACT_TABLE_CLASS + " " + css_classes).rstrip() + '"'
 
     def create_thead_level_css(self) -> str:
         return self._aggregate_css_formatters("create_thead_level_css")
 
     def create_row_level_css(self, row_name: str, row) -> str:
         self.row_index += 1
-        if ORG_ROW_NAMES in self.df.columns and self.row_index >= 0:
-            row_name = self.df[ORG_ROW_NAMES].iloc[self.row_index]
+        if self._org_row_names is not None and self.row_index >= 0:
+            row_name = self._org_row_names[self.row_index]
+        if not self._hook_formatters["create_row_level_css"]:
+            return self._join_row_and_cell_css([])
         data = pd.Series(row, name=row_name)
-        return self._aggregate_css_formatters("create_row_level_css", fmt_args=[data])
+        return self._join_row_and_cell_css(self._collect_css_substrings("create_row_level_css", fmt_args=[data]))
 
     def create_column_level_css(self, column_name: str, series) -> str:
         data = self.FormatterData(None, None, column_name, series)
         return self._aggregate_css_formatters("create_column_level_css", fmt_args=[data])
 
     def create_cell_level_css(self, cell, row_name: str, column_name: str) -> str:
-        if ORG_ROW_NAMES in self.df.columns and self.row_index >= 0:
-            row_name = self.df[ORG_ROW_NAMES].iloc[self.row_index]
+        if self._org_row_names is not None and self.row_index >= 0:
+            row_name = self._org_row_names[self.row_index]
         data = self.FormatterData(cell, row_name, column_name, self.df)
-        return self._aggregate_css_formatters("create_cell_level_css", fmt_args=[data])
+        return self._join_row_and_cell_css(self._collect_css_substrings("create_cell_level_css", fmt_args=[data]))
+
+    def create_column_cell_level_css(
+        self, series: pd.Series, column_name: str, row_positions: np.ndarray
+    ) -> np.ndarray:
+        """Style attributes of the index or body cells of one column, see
+        TableFormatter.create_column_cell_level_css().
+        """
+        css_columns = [
+            formatter.create_column_cell_level_css(series, column_name, row_positions)
+            for formatter in self._hook_formatters["create_cell_level_css"]
+        ]
+        return self._join_row_and_cell_css_columns(css_columns, len(series))
+
+    def create_body_row_level_css(self, df: pd.DataFrame, row_names: pd.Index) -> np.ndarray:
+        """Style attributes of all body rows."""
+        css_columns = [
+            formatter.create_body_row_level_css(df, row_names)
+            for formatter in self._hook_formatters["create_row_level_css"]
+        ]
+        return self._join_row_and_cell_css_columns(css_columns, len(row_names))
+
+    def _join_row_and_cell_css_columns(self, css_columns: List[np.ndarray], length: int) -> np.ndarray:
+        """Vectorised version of _join_row_and_cell_css(), joining CSS of several formatters per row or cell."""
+        if self._style_classes is None:
+            return _join_css_columns(css_columns, length, "style")
+        return self._style_classes.attributes(_join_css_columns(css_columns, length))
+
+    def _get_body_df(self) -> pd.DataFrame:
+        """Dataframe without the column holding original row names of a flattened index."""
+        return self.df.loc[:, self.df.columns.get_level_values(0) != ORG_ROW_NAMES]
+
+    def _get_body_columns(self, df: Optional[pd.DataFrame] = None) -> pd.Index:
+        """Columns of self.df or df without the column holding original row names, see _get_body_df()."""
+        columns = (self.df if df is None else df).columns
+        return columns[columns.get_level_values(0) != ORG_ROW_NAMES]
 
     def _get_header_iterable(self) -> List[List[IndexCell]]:
-        df_clean = self.df.loc[:, self.df.columns.get_level_values(0) != ORG_ROW_NAMES]
-        return columns_to_iterable(df_clean.columns, merge_depth=self.merge_vertical)
+        return columns_to_iterable(self._get_body_columns(self._get_display_df(0, 0)), merge_depth=self.merge_vertical)
+
+    def _get_truncated_rows(self) -> Optional[Tuple[int, int]]:
+        """End of the head rows and start of the tail rows, if the table is truncated to max_rows."""
+        n_rows = len(self.df)
+        if not self.max_rows or n_rows <= self.max_rows:
+            return None
+        n_head = (self.max_rows + 1) // 2
+        return n_head, n_rows - (self.max_rows - n_head)
+
+    def _get_truncated_columns(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Positions of the columns before and after the elision column, if the table is truncated to max_cols.
+
+        The column holding original row names is kept after the last column.
+        """
+        is_body = self.df.columns.get_level_values(0) != ORG_ROW_NAMES
+        body_positions = np.flatnonzero(is_body)
+        if not self.max_cols or len(body_positions) <= self.max_cols:
+            return None
+        n_head = (self.max_cols + 1) // 2
+        n_tail = self.max_cols - n_head
+        tail_positions = body_positions[len(body_positions) - n_tail :]
+        return body_positions[:n_head], np.concatenate([tail_positions, np.flatnonzero(~is_body)])
+
+    def _get_display_df(self, start: int, stop: int) -> pd.DataFrame:
+        """Rows start:stop of the table, with an elision column instead of the columns left out by max_cols."""
+        df = self.df.iloc[start:stop]
+        truncated_columns = self._get_truncated_columns()
+        if truncated_columns is None:
+            return df
+        head_positions, tail_positions = truncated_columns
+        df = df.iloc[:, np.concatenate([head_positions, tail_positions])].copy()
+        label = (ELISION,) * df.columns.nlevels if df.columns.nlevels > 1 else ELISION
+        df.insert(len(head_positions), label, ELISION, allow_duplicates=True)
+        return df
 
     def _get_index_iterable(self) -> List[List[IndexCell]]:
+        if self.cell_ids is not None and isinstance(self.df.index, pd.MultiIndex):
+            # Each row has a cell per index level, so that rows can be replaced on their own
+            return [[IndexCell(value, [row], 1, 1) for value in row] for row in self.df.index.tolist()]
         return index_to_iterable(self.df.index)
 
+    def _get_org_row_names(self) -> Optional[np.ndarray]:
+        """Original row names by row position, if the index was flattened by a formatter, e.g. FmtExpandMultiIndex."""
+        if ORG_ROW_NAMES in self.df.columns:
+            return self.df[ORG_ROW_NAMES].to_numpy()
+        return None
+
+    def _get_row_names(self) -> pd.Index:
+        """Row names passed to formatters for index and body cells, i.e. the original names if index was flattened."""
+        row_names = self._org_row_names if self._org_row_names is not None else self.df.index.to_numpy()
+        return pd.Index(row_names, dtype=object, tupleize_cols=False)
+
+    def _get_body_rows(self) -> Iterator[Tuple[Any, Any, List[Any]]]:
+        """Replaces df.iterrows() in the template, yielding index label, row and the list of cell values per row.
+
+        Rows are only turned into series for formatters providing row level CSS, otherwise they are arrays.
+        """
+        df_clean = self._get_body_df()
+        columns = df_clean.columns
+        rows_as_series = bool(self._hook_formatters["create_row_level_css"]) or (
+            type(self).create_row_level_css is not HTMLJinjaTableBlock.create_row_level_css
+        )
+        for label, row, cells in zip(df_clean.index, df_clean.values, _cell_values(df_clean).tolist()):
+            yield label, pd.Series(row, index=columns, name=label) if rows_as_series else row, cells
+
+    def _get_index_cells(
+        self, index_iterable: List[List[IndexCell]], row_names: pd.Index
+    ) -> Tuple[pd.Series, np.ndarray]:
+        """Values of all index cells indexed by their row names, and the positions of their rows."""
+        positions = np.array(
+            [row_position for row_position, cells in enumerate(index_iterable) for _ in cells], dtype=int
+        )
+        values = [cell.value for cells in index_iterable for cell in cells]
+        return pd.Series(values, index=row_names[positions], dtype=object), positions
+
+    def _get_index_contents(self, index_iterable: List[List[IndexCell]], row_names: pd.Index) -> List[List[Any]]:
+        """Formatted content of index cells, in the same layout as index_iterable."""
+        series, _ = self._get_index_cells(index_iterable, row_names)
+        contents = iter(self.modify_column_content(series, INDEX_COL_NAME).tolist())
+        return [[next(contents) for _ in cells] for cells in index_iterable]
+
+    def _get_body_contents(self, row_names: pd.Index) -> List[List[Any]]:
+        """Formatted content of body cells, as list of rows. Formatters are applied column by column."""
+        df_clean = self._get_body_df()
+        cell_values = _cell_values(df_clean)
+        contents = np.empty(cell_values.shape, dtype=object)
+        for i, column_name in enumerate(df_clean.columns):
+            series = pd.Series(cell_values[:, i], index=row_names, dtype=object)
+            contents[:, i] = self.modify_column_content(series, column_name).to_numpy()
+        return contents.tolist()
+
+    def _get_body_cells(
+        self, index_iterable: List[List[IndexCell]], row_names: pd.Index
+    ) -> Tuple[List[Any], List[List[Any]], List[List[str]]]:
+        """Attributes of body rows, and attributes and formatted contents of their cells, with index cells first.
+        Contents are markup, see _markup_contents().
+
+        Index cells must not be merged across rows. Formatters are called in the same order as when the rows are
+        rendered, column by column if their styles are vectorised, otherwise cell by cell.
+        """
+        if self._vectorised_tbody:
+            return self._get_body_cells_by_column(index_iterable, row_names)
+        return self._get_body_cells_by_cell(index_iterable, row_names)
+
+    def _get_body_cells_by_column(
+        self, index_iterable: List[List[IndexCell]], row_names: pd.Index
+    ) -> Tuple[List[Any], List[List[Any]], List[List[str]]]:
+        df_clean = self._get_body_df()
+        n_rows = len(df_clean)
+        row_styles = self.create_body_row_level_css(df_clean, row_names)
+        # Index cells are not merged, so each row has a cell per index level
+        index_series, index_positions = self._get_index_cells(index_iterable, row_names)
+        index_styles = self.create_column_cell_level_css(index_series, INDEX_COL_NAME, index_positions)
+        index_contents = _markup_contents(self.modify_column_content(index_series, INDEX_COL_NAME))
+        n_levels = len(index_series) // n_rows if n_rows else 0
+        cell_styles = np.empty((n_rows, n_levels + len(df_clean.columns)), dtype=object)
+        contents = np.empty(cell_styles.shape, dtype=object)
+        cell_styles[:, :n_levels] = np.asarray(index_styles, dtype=object).reshape(n_rows, n_levels)
+        contents[:, :n_levels] = np.asarray(index_contents, dtype=object).reshape(n_rows, n_levels)
+
+        cell_values = _cell_values(df_clean)
+        row_positions = np.arange(n_rows)
+        for i, column_name in enumerate(df_clean.columns):
+            series = pd.Series(cell_values[:, i], index=row_names, dtype=object)
+            cell_styles[:, n_levels + i] = self.create_column_cell_level_css(series, column_name, row_positions)
+            contents[:, n_levels + i] = _markup_contents(self.modify_column_content(series, column_name))
+        return row_styles.tolist(), cell_styles.tolist(), contents.tolist()
+
+    def _get_body_cells_by_cell(
+        self, index_iterable: List[List[IndexCell]], row_names: pd.Index
+    ) -> Tuple[List[Any], List[List[Any]], List[List[str]]]:
+        row_styles, cell_styles, contents = [], [], []
+        body_columns = self._get_body_columns()
+        for (row_name, row, cells), index_cells, index_contents, body_contents in zip(
+            self._get_body_rows(),
+            index_iterable,
+            self._get_index_contents(index_iterable, row_names),
+            self._get_body_contents(row_names),
+        ):
+            row_styles.append(self.create_row_level_css(row_name, row))
+            cell_styles.append(
+                [self.create_cell_level_css(cell.value, cell.names[0], INDEX_COL_NAME) for cell in index_cells]
+                + [
+                    self.create_cell_level_css(cell, row_name, column_name)
+                    for column_name, cell in zip(body_columns, cells)
+                ]
+            )
+            contents.append(_markup_contents(index_contents + body_contents))
+        return row_styles, cell_styles, contents
+
+    def _render_tbody_rows(self, index_iterable: List[List[IndexCell]], row_names: pd.Index) -> str:
+        """Render the rows of <tbody> column by column instead of cell by cell through the template.
+
+        Produces the same markup as the template, see _tag_layout(), using the vectorised content and CSS hooks of the
+        formatters.
+        """
+        df_clean = self._get_body_df()
+        n_rows = len(df_clean)
+        row_start, row_middle, row_end = _tag_layout("tr", _ROW_DEPTH, self.compact)
+        cell_start, cell_middle, cell_end = _tag_layout("td", _CELL_DEPTH, self.compact)
+        # Row level CSS first, as in the template, since cell level CSS may depend on it, e.g. alternating colors
+        row_css = self.create_body_row_level_css(df_clean, row_names)
+
+        # Index cells, possibly several per row and spanning multiple rows
+        index_series, index_positions = self._get_index_cells(index_iterable, row_names)
+        index_spans = [(cell.span, cell.depth) for cells in index_iterable for cell in cells]
+        index_css = self.create_column_cell_level_css(index_series, INDEX_COL_NAME, index_positions)
+        index_contents = _markup_content_lines(self.modify_column_content(index_series, INDEX_COL_NAME), self.compact)
+        row_index_html = [""] * n_rows
+        for row_position, css, content, (rowspan, colspan) in zip(
+            index_positions.tolist(), index_css, index_contents, index_spans
+        ):
+            row_index_html[row_position] += (
+                cell_start + _span_markup(css, rowspan, colspan, self.compact) + cell_middle + content + cell_end
+            )
+
+        # Body cells, one column at a time
+        cell_values = _cell_values(df_clean)
+        body_html = np.empty(cell_values.shape, dtype=object)
+        row_positions = np.arange(n_rows)
+        for i, column_name in enumerate(df_clean.columns):
+            series = pd.Series(cell_values[:, i], index=row_names, dtype=object)
+            css = self.create_column_cell_level_css(series, column_name, row_positions)
+            contents = np.array(
+                _markup_content_lines(self.modify_column_content(series, column_name), self.compact), dtype=object
+            )
+            body_html[:, i] = cell_start + _attributes_markup(css, self.compact) + cell_middle + contents + cell_end
+
+        return "".join(
+            row_start + css + row_middle + index_cells + "".join(cells) + row_end
+            for css, index_cells, cells in zip(
+                _attributes_markup(row_css, self.compact).tolist(), row_index_html, body_html.tolist()
+            )
+        )
+
+    def _render_tbody_cells(self, index_iterable: List[List[IndexCell]], row_names: pd.Index) -> str:
+        """Render the rows of <tbody> with ids of rows and cells, keeping their markup in rendered_cells."""
+        row_attributes, cell_attributes, contents = self._get_body_cells(index_iterable, row_names)
+        n_rows = len(row_attributes)
+        shape = (n_rows, self._get_row_width())
+        row_start, row_middle, row_end = _tag_layout("tr", _ROW_DEPTH, self.compact)
+        cell_start, cell_middle, cell_end = _tag_layout("td", _CELL_DEPTH, self.compact)
+        row_ids = np.array([f"{self.cell_ids}-{row_position}" for row_position in range(n_rows)], dtype=object)
+        row_tags = row_start + _with_ids(row_ids, _attributes_markup(row_attributes, self.compact)) + row_middle
+        cell_ids = row_ids[:, None] + np.array([f"-{column}" for column in range(shape[1])], dtype=object)
+        cell_attributes = _attributes_markup(np.array(cell_attributes, dtype=object).reshape(shape), self.compact)
+        contents = _content_lines(np.array(contents, dtype=object).reshape(shape), self.compact)
+        cell_html = cell_start + _with_ids(cell_ids, cell_attributes) + cell_middle + contents + cell_end
+        rows_html = "".join(
+            row_tag + "".join(cells) + row_end for row_tag, cells in zip(row_tags.tolist(), cell_html.tolist())
+        )
+        self.rendered_cells = RenderedCells(rows_html, row_tags, cell_html, row_end)
+        return rows_html
+
+    def _render_body_rows(self, index_iterable: List[List[IndexCell]], row_names: pd.Index) -> str:
+        """Render the rows of <tbody> on their own, without the rest of the table."""
+        if self._vectorised_tbody:
+            return self._render_tbody_rows(index_iterable, row_names)
+        return self._render_template_rows(self._get_template_model(index_iterable, row_names, ""))
+
+    def _render_template_rows(self, model: Dict[str, Any]) -> str:
+        """Render the rows of <tbody> cell by cell through the template."""
+        return _table_rows_tmpl.render(**model)
+
+    def _get_row_range_bounds(self, index_iterable: Optional[List[List[IndexCell]]]) -> Optional[List[int]]:
+        """Bounds of the ranges of rows rendered by a process pool, or None if rendered in this process."""
+        # Truncated tables render their rows by partitions without index iterable, see _bind_formatters()
+        if self.max_workers is None or index_iterable is None:
+            return None
+        bounds = _row_range_bounds(index_iterable, self.max_workers)
+        return bounds if len(bounds) > 2 else None
+
+    def _render_tbody_rows_in_processes(self, bounds: List[int]) -> str:
+        """Render the rows of <tbody> in ranges by a process pool, see max_workers and _get_row_range_bounds().
+
+        Each range is rendered by a copy of the table holding only its rows and partitions of the formatters, see
+        TableFormatter.partition_rows(). Ranges do not split index cells spanning multiple rows.
+        """
+        partitions = [self._partition_rows(start, stop) for start, stop in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            return self._join_partitions(list(executor.map(_render_partition, partitions)))
+
+    def _render_truncated_tbody_rows(self) -> str:
+        """Render the head and tail rows of <tbody> separated by an elision row, see max_rows and max_cols.
+
+        Rows are rendered as partitions of the table, so formatters use the statistics of all rows. The formatters
+        are advanced past the rows left out, so e.g. alternating row colors continue after the elision row.
+        """
+        n_rows = len(self.df)
+        head_stop, tail_start = self._get_truncated_rows() or (n_rows, n_rows)
+        head = _render_partition(self._partition_rows(0, head_stop))
+        if head_stop == n_rows:
+            # Only columns are truncated
+            return self._join_partitions([head])
+        elision_row = self._row_markup("", [("td", "", ELISION)] * self._get_row_width())
+        if tail_start == n_rows:
+            # Tables truncated to a single row have no tail rows
+            return self._join_partitions([head, (elision_row, {})])
+        for formatter in self.formatters:
+            formatter.partition_rows(head_stop, tail_start)
+        tail = _render_partition(self._partition_rows(tail_start, n_rows))
+        return self._join_partitions([head, (elision_row, {}), tail])
+
+    def _render_row_range(self, start: int, stop: int) -> str:
+        """Render body rows start:stop on their own, e.g. a page of the table, as partition of the table bound to all
+        rows. The formatters are advanced past the rows before start first, so e.g. alternating row colors continue like
+        in the whole table.
+        """
+        for formatter in self.formatters:
+            formatter.partition_rows(0, start)
+        return self._join_partitions([_render_partition(self._partition_rows(start, stop))])
+
+    def _row_markup(self, attributes: str, cells: Iterable[Tuple[str, str, Any]]) -> str:
+        """Markup of a row of the table with the given attributes, holding cells given by name, attributes and
+        content, e.g. rows standing in for rows left out.
+        """
+        return (
+            _row_start_tag(attributes, self.compact)
+            + "".join(
+                _cell_markup(name, cell_attributes, content, self.compact) for name, cell_attributes, content in cells
+            )
+            + _row_end_tag(self.compact)
+        )
+
+    def _get_row_width(self) -> int:
+        """Number of cells in a body row as displayed, i.e. index levels and body columns."""
+        display_df = self._get_display_df(0, 0)
+        return display_df.index.nlevels + len(self._get_body_columns(display_df))
+
+    def _renders_rows_in_partitions(self) -> bool:
+        """Whether body rows are rendered by partitions of the table, see _partition_rows(), e.g. if truncated."""
+        return self._get_truncated_rows() is not None
+
+    def _join_partitions(self, results: List[Tuple[str, Dict[str, str]]]) -> str:
+        """Join rows rendered by partitions of the table, see _render_partition()."""
+        if self._style_classes is not None:
+            for _, class_names in results:
+                self._style_classes.class_names.update(class_names)
+        return "".join(rows_html for rows_html, _ in results)
+
+    def _partition_rows(self, start: int, stop: int) -> "HTMLJinjaTableBlock":
+        """Copy of the table rendering body rows start:stop in another process."""
+        formatters = [formatter.partition_rows(start, stop) for formatter in self.formatters]
+        return self._partition(self._get_display_df(start, stop), formatters)
+
+    def _take_rows(self, positions: np.ndarray) -> "HTMLJinjaTableBlock":
+        """Copy of the table rendering the body rows at positions in the given order, see TableFormatter.take_rows()."""
+        formatters = [formatter.take_rows(positions) for formatter in self.formatters]
+        return self._partition(self._get_display_df(0, len(self.df)).iloc[positions], formatters)
+
+    def _partition(self, df: pd.DataFrame, formatters: List[TableFormatter]) -> "HTMLJinjaTableBlock":
+        partition = copy.copy(self)
+        partition.df = df
+        partition.formatters = formatters
+        partition._shared_formatters = None
+        partition._compile_formatters()
+        partition._org_row_names = partition.statistics = partition._style_classes = partition.max_workers = None
+        # Rows and columns are already truncated
+        partition.max_rows = partition.max_cols = 0
+        return partition
+
     def _write_contents(self, container, actual_cfg, *args, **kwargs) -> None:
+        cache_key = self._get_render_cache_key()
+        rendered = self.render_cache.get(cache_key) if cache_key is not None else None
+        if rendered is None:
+            rendered = self._render_table()
+            if cache_key is not None:
+                self.render_cache.put(cache_key, rendered)
+        for style_sheet in rendered.style_sheets:
+            self._write_css(container, style_sheet, kwargs.get("resource_deps"))
+        with self._measure("parse"):
+            if rendered.parse:
+                # Only the table element of the rendered template is kept
+                soup = parse(rendered.table_html)
+                table = soup.find("table")
+                container.append(table)
+            else:
+                # The template renders a single table element, which does not need to be parsed into a tree
+                append_verbatim(container, rendered.table_html.strip(), indent=not self.compact)
+
+    def _render_table(self) -> RenderedTable:
         # table boilerplate
-        model = {
-            "df": self.df,
+        index_iterable, row_names = self._bind_formatters()
+        style_classes = self._style_classes = _StyleClasses() if self.css_classes else None
+        try:
+            structural_rules = self._bind_structural_css(index_iterable)
+            additional_html = self.insert_additional_html()
+            with self._measure("render_template"):
+                table_html = self._render_template(index_iterable, row_names, additional_html)
+        finally:
+            self._style_classes = None
+            self._unbind_formatters()
+        style_sheets = [_COMPACT_STYLE_SHEET if self.compact else None, structural_rules]
+        if style_classes is not None and style_classes.class_names:
+            style_sheets.append(style_classes.style_sheet(self._get_table_id()))
+        return RenderedTable(
+            table_html, bool(additional_html), tuple(style_sheet for style_sheet in style_sheets if style_sheet)
+        )
+
+    def _get_render_cache_key(self) -> Optional[str]:
+        """Fingerprint of the dataframe, formatters and options determining the rendered table, see render_cache.
+
+        None if the table is not cached, or if its formatters cannot be fingerprinted.
+        """
+        if (
+            self.render_cache is None
+            or self.cell_ids is not None
+            or type(self)._write_contents is not HTMLJinjaTableBlock._write_contents
+        ):
+            # Rendered cells are only kept while rendering
+            return None
+        options = (
+            self.merge_vertical,
+            self.css_classes,
+            self.max_rows,
+            self.max_cols,
+            self.structural_css,
+            self.compact,
+        )
+        try:
+            fingerprints = [
+                _fingerprint((type(self).__module__, type(self).__qualname__, options)),
+                _fingerprint(self.df),
+                *(formatter.fingerprint() for formatter in self.formatters),
+            ]
+        except TypeError:
+            logger.debug("Table is not cached, as it cannot be fingerprinted", exc_info=True)
+            return None
+        return _fingerprint(fingerprints)
+
+    def _measure(self, stage: str) -> ContextManager[None]:
+        """Record the time of a stage of rendering the table, if it is profiled. Includes the hooks called by it."""
+        if self.render_profile is None:
+            return nullcontext()
+        return self.render_profile.measure(type(self).__name__, stage)
+
+    def _bind_formatters(self) -> Tuple[Optional[List[List[IndexCell]]], pd.Index]:
+        """Bind formatters to self.df about to be rendered. Returns its index iterable and row names.
+
+        If rows are rendered by partitions of the table, e.g. if truncated, only the rows shown are turned into index
+        cells by the partitions, so the index iterable is None and row names are only used to bind formatters. They are
+        not converted to an object index.
+
+        The table is rendered by copies of its formatters until _unbind_formatters(), which are bound again if the
+        table is bound to another dataframe meanwhile, e.g. the next chunk of a streamed table.
+        """
+        self._org_row_names = self._get_org_row_names()
+        if not self._renders_rows_in_partitions():
+            index_iterable = self._get_index_iterable()
+            row_names = self._get_row_names()
+        elif self._org_row_names is None:
+            index_iterable, row_names = None, self.df.index
+        else:
+            index_iterable, row_names = None, pd.Index(self._org_row_names, dtype=object, tupleize_cols=False)
+        if self._shared_formatters is None:
+            # Formatters may be shared between tables rendered at the same time, e.g. DEFAULT_FORMATTERS, so copies of
+            # them are bound to this table's dataframe and keep the state of rendering its rows, e.g. row colors
+            self._shared_formatters = self.formatters
+            self.formatters = [copy.copy(formatter) for formatter in self.formatters]
+            self._compile_formatters()
+        self.statistics = TableStatistics(self.df)
+        for formatter in self.formatters:
+            formatter.bind(self.df, row_names, self.statistics)
+        return index_iterable, row_names
+
+    def _unbind_formatters(self) -> None:
+        """Drop the copies of the formatters bound by _bind_formatters(), the formatters of the table are unchanged."""
+        if self._shared_formatters is None:
+            return
+        self.formatters = self._shared_formatters
+        self._shared_formatters = None
+        self._n_structural_formatters = 0
+        self._compile_formatters()
+
+    def _bind_structural_css(self, index_iterable: Optional[List[List[IndexCell]]]) -> Optional[Css]:
+        """Replace cell level CSS of the leading formatters by CSS rules of the table, see structural_css.
+
+        Inline styles take precedence over rules, so formatters are only replaced up to the first one, which does not
+        provide rules for the bound table. Returns the rules as stylesheet, if any.
+        """
+        if (
+            not self.structural_css
+            or index_iterable is None
+            or self.max_workers is not None
+            or self._get_truncated_columns() is not None
+        ):
+            return None
+        n_levels = self.df.index.nlevels
+        layout = TableLayout(
+            self._get_table_id(),
+            n_levels,
+            self._get_body_columns(),
+            all(len(index_cells) == n_levels for index_cells in index_iterable),
+        )
+        rules = []
+        n_structural_formatters = 0
+        for formatter in self._hook_formatters["create_cell_level_css"]:
+            if not formatter.implements("create_structural_css"):
+                break
+            formatter_rules = formatter.create_structural_css(layout)
+            if formatter_rules is None:
+                break
+            rules.extend(formatter_rules)
+            n_structural_formatters += 1
+        if n_structural_formatters == 0:
+            return None
+        self._n_structural_formatters = n_structural_formatters
+        self._compile_formatters()
+        if not rules:
+            return None
+        css_string = "\n".join(rules)
+        return Css(css_string=css_string, name="table-rules-" + _digest(css_string))
+
+    def _get_table_id(self) -> str:
+        """Id of the table element, which is unique if its cells are styled by CSS rules scoped to the table."""
+        if not self.structural_css:
+            return "blox_table_id"
+        # Tables with cell ids keep their id when built again, e.g. by a provider
+        return "blox_table_" + _digest(self._id if self.cell_ids is None else self.cell_ids)
+
+    def _write_style_sheet(self, container, style_classes: Optional["_StyleClasses"], resource_deps) -> None:
+        """Register the classes of rows and cells as resource of the document, or write them to the container."""
+        if style_classes is None or not style_classes.class_names:
+            return
+        self._write_css(container, style_classes.style_sheet(self._get_table_id()), resource_deps)
+
+    def _write_body_rows(self, container, render_rows: Callable[[], str], resource_deps=None) -> None:
+        """Write only body rows, rendered by render_rows while the formatters are bound, e.g. rows requested from the
+        server after the table was sent. The classes of their styles are written like for the whole table.
+        """
+        self._bind_formatters()
+        style_classes = self._style_classes = _StyleClasses() if self.css_classes else None
+        try:
+            rows_html = render_rows()
+        finally:
+            self._style_classes = None
+            self._unbind_formatters()
+        self._write_style_sheet(container, style_classes, resource_deps)
+        append_verbatim(container, rows_html, indent=not self.compact)
+
+    def _write_css(self, container, style_sheet: Optional[Css], resource_deps) -> None:
+        """Register stylesheet as resource of the document, or write it to the container."""
+        if style_sheet is None:
+            return
+        if resource_deps is not None:
+            resource_deps.add(style_sheet)
+        else:
+            style_sheet.write(container)
+
+    def _render_template(self, index_iterable: List[List[IndexCell]], row_names: pd.Index, additional_html: str) -> str:
+        model = self._get_template_model(index_iterable, row_names, additional_html)
+        if not self.compact:
+            return _table_tmpl.render(**model)
+        # Body rows are rendered compact on their own, the rest of the template is compacted once rendered
+        render_tbody_rows = model["render_tbody_rows"] or partial(self._render_template_rows, model)
+        head, tail = self._render_template_parts(model)
+        return head + render_tbody_rows() + tail
+
+    def _render_template_parts(self, model: Dict[str, Any]) -> Tuple[str, str]:
+        """Render the template up to and after the body rows, which are left out."""
+        marker = "<!--" + uuid.uuid4().hex + "-->"
+        head, tail = _table_tmpl.render(**dict(model, render_tbody_rows=lambda: marker)).split(marker)
+        if self.compact:
+            return _compact_markup(head), _compact_markup(tail)
+        return head, tail
+
+    def _get_template_model(
+        self,
+        index_iterable: List[List[IndexCell]],
+        row_names: pd.Index,
+        additional_html: str,
+        render_tbody_rows: Optional[Callable[[], str]] = None,
+    ) -> Dict[str, Any]:
+        """Model of the table template. Body rows are rendered by render_tbody_rows, if given."""
+        index_contents = body_contents = None
+        bounds = self._get_row_range_bounds(index_iterable) if render_tbody_rows is None else None
+        if render_tbody_rows is None and self.cell_ids is not None:
+            render_tbody_rows = partial(self._render_tbody_cells, index_iterable, row_names)
+        elif render_tbody_rows is None and (
+            self._get_truncated_rows() is not None or self._get_truncated_columns() is not None
+        ):
+            render_tbody_rows = self._render_truncated_tbody_rows
+        elif render_tbody_rows is None and bounds is not None:
+            render_tbody_rows = partial(self._render_tbody_rows_in_processes, bounds)
+        elif render_tbody_rows is None and self._vectorised_tbody:
+            # Body rows are rendered once the template reaches them, as formatters may depend on the order of calls
+            render_tbody_rows = partial(self._render_tbody_rows, index_iterable, row_names)
+        elif render_tbody_rows is None:
+            index_contents = self._get_index_contents(index_iterable, row_names)
+            body_contents = self._get_body_contents(row_names)
+        return {
+            "table_id": self._get_table_id(),
+            "compact": self.compact,
+            "df": self._get_display_df(0, 0) if self._get_truncated_columns() is not None else self.df,
+            "body_columns": self._get_body_columns(),
+            "body_rows": self._get_body_rows(),
             "header_iterable": self._get_header_iterable(),
-            "index_iterable": self._get_index_iterable(),
-            "insert_additional_html": self.insert_additional_html,
+            "index_iterable": index_iterable,
+            "index_contents": index_contents,
+            "body_contents": body_contents,
+            "render_tbody_rows": render_tbody_rows,
+            "insert_additional_html": lambda: additional_html,
             "create_thead_level_css": self.create_thead_level_css,
             "create_table_level_css": self.create_table_level_css,
             "create_table_level_css_class": self.create_table_level_css_class,
@@ -143,12 +981,555 @@ class HTMLJinjaTableBlock(BaseBlock):
             "create_row_level_css": self.create_row_level_css,
             "create_cell_level_css": self.create_cell_level_css,
             "modify_cell_content": self.modify_cell_content,
+            "attribute_markup": _attribute_markup,
+            "row_start_tag": _row_start_tag,
+            "row_end_tag": _row_end_tag,
+            "cell_markup": _cell_markup,
         }
 
-        table_html = _table_tmpl.render(**model)
-        soup = parse(table_html)
-        table = soup.find("table")
-        container.append(table)
+
+class StreamingHTMLJinjaTableBlock(HTMLJinjaTableBlock):
+    def __init__(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        formatters: Optional[List[TableFormatter]] = None,
+        use_default_formatters: bool = True,
+        merge_vertical: bool = False,
+        css_classes: bool = False,
+        **kwargs,
+    ) -> None:
+        """Create table from consecutive chunks of rows, e.g. pd.read_csv(..., chunksize=n), rendering one at a time.
+
+        Formatters are applied to each chunk on its own, so only one chunk needs to be held in memory. They must
+        support this, see TableFormatter.supports_chunks(). Header and column styles are taken from the first chunk
+        and all chunks must have the same columns once modified. Index cells are not merged across chunks.
+        Chunks are consumed when the table is rendered, so it can only be rendered once.
+
+        Parameters()
+        ----------
+        chunks: 'iterable'
+            DataFrames holding the rows of the table, in order.
+        formatters: 'list'
+            List of formatters, which are objects inheriting from TableFormatter class.
+        css_classes: 'bool'
+            See HTMLJinjaTableBlock.
+        """
+        chunks = iter(chunks)
+        try:
+            first_chunk = next(chunks)
+        except StopIteration:
+            raise ValueError("Streaming table requires at least one chunk") from None
+        # Tables rendered in chunks are not truncated, as the number of rows is only known once all are rendered
+        super().__init__(
+            first_chunk,
+            formatters,
+            use_default_formatters,
+            merge_vertical,
+            css_classes,
+            max_rows=0,
+            max_cols=0,
+            **kwargs,
+        )
+        unsupported = [type(formatter).__name__ for formatter in self.formatters if not formatter.supports_chunks()]
+        if unsupported:
+            raise ValueError("Formatters do not support tables rendered in chunks: " + ", ".join(unsupported))
+        self._chunks: Optional[Iterator[pd.DataFrame]] = chunks
+
+    def iter_table_html(self) -> Iterator[str]:
+        """Render the table piece by piece, e.g. to write it to a file or response without holding all markup.
+
+        Yields the markup up to the body rows, then the rows of each chunk and the end of the table. If css_classes is
+        set, the generated classes are yielded last as <style> element, as they are only known once all rows are done.
+        Compact tables yield the <style> element spacing and padding them first.
+        """
+        style_classes = _StyleClasses() if self.css_classes else None
+        if self.compact:
+            yield str(_COMPACT_STYLE_SHEET.write())
+        yield from self._iter_table_html(style_classes)
+        if style_classes is not None and style_classes.class_names:
+            yield str(style_classes.style_sheet(self._get_table_id()).write())
+
+    def _write_contents(self, container, actual_cfg, *args, **kwargs) -> None:
+        style_classes = _StyleClasses() if self.css_classes else None
+        with self._measure("render_template"):
+            table_html = "".join(self._iter_table_html(style_classes))
+        if self.compact:
+            self._write_css(container, _COMPACT_STYLE_SHEET, kwargs.get("resource_deps"))
+        self._write_style_sheet(container, style_classes, kwargs.get("resource_deps"))
+        with self._measure("parse"):
+            append_verbatim(container, table_html, indent=not self.compact)
+
+    def _iter_table_html(self, style_classes: Optional["_StyleClasses"]) -> Iterator[str]:
+        # The template is rendered for the first chunk without the body rows, split where they are left out
+        tail = ""
+        self._style_classes = style_classes
+        try:
+            for chunk_index, chunk in enumerate(self._iter_chunks()):
+                self.df = chunk
+                index_iterable, row_names = self._bind_formatters()
+                if chunk_index == 0:
+                    # Additional HTML of formatters is left out, as HTMLJinjaTableBlock only keeps the table element
+                    model = self._get_template_model(index_iterable, row_names, "", render_tbody_rows=lambda: "")
+                    head, tail = self._render_template_parts(model)
+                    yield head.lstrip()
+                self.row_index = -1
+                yield self._render_body_rows(index_iterable, row_names)
+            yield tail.rstrip()
+        finally:
+            self._style_classes = None
+            self._unbind_formatters()
+
+    def _iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """Yield chunks modified by the formatters, consuming the chunks of the table."""
+        if self._chunks is None:
+            raise ValueError("Streaming table has already been rendered and its chunks are consumed")
+        chunks, self._chunks = self._chunks, None
+        # The first chunk has been modified on creation of the table
+        columns = self.df.columns
+        yield self.df
+        for chunk in chunks:
+            chunk = self.modify_dataframe(chunk)
+            if not chunk.columns.equals(columns):
+                raise ValueError("Columns of all chunks must be the same as of the first chunk")
+            yield chunk
+
+
+class TableRenderCache:
+    """Rendered tables looked up by fingerprint, see HTMLJinjaTableBlock render_cache. Safe to share between threads.
+
+    Once the markup and stylesheets of all tables exceed max_bytes, the least recently used tables are evicted.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20) -> None:
+        self.max_bytes = max_bytes
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # key -> (rendered table, size in bytes), least recently used first
+        self._entries: OrderedDict[str, Tuple[RenderedTable, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[RenderedTable]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, rendered: RenderedTable) -> None:
+        size = sum(
+            len(text.encode("utf-8"))
+            for text in (rendered.table_html, *(style_sheet.content_string for style_sheet in rendered.style_sheets))
+        )
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.n_bytes -= previous[1]
+            self._entries[key] = (rendered, size)
+            self.n_bytes += size
+            while self.n_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.n_bytes -= evicted_size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.n_bytes = 0
+
+
+# Cache shared by tables created with render_cache=True
+default_render_cache = TableRenderCache()
+
+
+class RenderProfile:
+    """Number of calls and cumulative time of the formatter hooks and rendering stages of a profiled table.
+
+    Formatters are named by class and position in the formatters of the table, e.g. FmtHeatmap[3], and stages by the
+    class of the table. Rows rendered in other processes, see max_workers, are not recorded.
+    """
+
+    def __init__(self) -> None:
+        # (name, hook) -> [calls, seconds]
+        self.timings: Dict[Tuple[str, str], List[float]] = {}
+
+    def add(self, name: str, hook: str, seconds: float) -> None:
+        timing = self.timings.setdefault((name, hook), [0, 0.0])
+        timing[0] += 1
+        timing[1] += seconds
+
+    @contextmanager
+    def measure(self, name: str, hook: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, hook, time.perf_counter() - start)
+
+    def reset(self) -> None:
+        self.timings.clear()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Timings as dataframe with columns name, hook, calls and seconds, slowest first."""
+        df = pd.DataFrame(
+            [(name, hook, int(calls), seconds) for (name, hook), (calls, seconds) in self.timings.items()],
+            columns=["name", "hook", "calls", "seconds"],
+        )
+        return df.sort_values("seconds", ascending=False, kind="mergesort", ignore_index=True)
+
+    def summary(self) -> str:
+        lines = [f"{'name':<32} {'hook':<32} {'calls':>10} {'seconds':>10}"]
+        lines.extend(
+            f"{name:<32} {hook:<32} {calls:>10} {seconds:>10.4f}"
+            for name, hook, calls, seconds in self.to_frame().itertuples(index=False)
+        )
+        return "\n".join(lines)
+
+    def log(self, level: int = logging.INFO) -> None:
+        logger.log(level, "Table render profile:\n%s", self.summary())
+
+
+class _ProfiledFormatter:
+    """Stands in for a formatter of a profiled table, recording the calls of its hooks in a RenderProfile."""
+
+    def __init__(self, formatter: TableFormatter, name: str, profile: RenderProfile) -> None:
+        self._formatter = formatter
+        self._name = name
+        self._profile = profile
+
+    def __getattr__(self, attribute: str) -> Any:
+        if attribute == "_formatter":
+            # Not set yet, e.g. while unpickling
+            raise AttributeError(attribute)
+        value = getattr(self._formatter, attribute)
+        if attribute not in PROFILED_HOOKS:
+            return value
+        # Hook functions are kept by the table, which is pickled if rows are rendered in other processes
+        return partial(_call_timed, self._profile, self._name, attribute, value)
+
+
+def _call_timed(profile: RenderProfile, name: str, hook: str, function: Callable, *args, **kwargs) -> Any:
+    start = time.perf_counter()
+    try:
+        return function(*args, **kwargs)
+    finally:
+        profile.add(name, hook, time.perf_counter() - start)
+
+
+def _render_partition(table: HTMLJinjaTableBlock) -> Tuple[str, Dict[str, str]]:
+    """Render the body rows of a partition of a table, see HTMLJinjaTableBlock._partition_rows().
+
+    Returns the rows and the classes of their styles, if styles are interned as classes.
+    """
+    index_iterable, row_names = table._bind_formatters()
+    style_classes = table._style_classes = _StyleClasses() if table.css_classes else None
+    table.row_index = -1
+    try:
+        rows_html = table._render_body_rows(index_iterable, row_names)
+    finally:
+        table._style_classes = None
+        table._unbind_formatters()
+    return rows_html, style_classes.class_names if style_classes is not None else {}
+
+
+def _row_range_bounds(index_iterable: List[List[IndexCell]], n_ranges: int) -> List[int]:
+    """Bounds of up to n_ranges ranges of rows of about equal size, which do not split index cells spanning rows."""
+    n_rows = len(index_iterable)
+    # A range may end after a row, if no index cell of this or previous rows spans beyond it
+    ends = np.maximum.accumulate(
+        [max((row + cell.span for cell in cells), default=row + 1) for row, cells in enumerate(index_iterable)]
+    )
+    splits = np.flatnonzero(ends[:-1] <= np.arange(1, n_rows)) + 1
+    targets = np.linspace(0, n_rows, max(n_ranges, 1) + 1)[1:-1]
+    positions = np.searchsorted(splits, targets)
+    inner = np.unique(splits[positions[positions < len(splits)]]).tolist()
+    return [0, *inner, n_rows]
+
+
+def _cell_values(df: pd.DataFrame) -> np.ndarray:
+    """Return cell values as 2D object array, holding the same scalar types as rows obtained from df.iterrows().
+
+    Columns backed by Arrow, see ArrowTableBlock, are converted one at a time like by pyarrow.Table.to_pandas(), so
+    e.g. nulls are NaN or None rather than pd.NA.
+    """
+    if any(_is_arrow_backed(dtype) for dtype in df.dtypes):
+        values = np.empty(df.shape, dtype=object)
+        for i in range(df.shape[1]):
+            values[:, i] = _cell_values(_to_numpy_backed(df.iloc[:, i]).to_frame())[:, 0]
+        return values
+    values = df.values
+    if values.dtype.kind in "mM":
+        # Convert to Timestamp/Timedelta rather than integers
+        return pd.DataFrame(values).astype(object).to_numpy()
+    return values.astype(object)
+
+
+def _is_arrow_backed(dtype: Any) -> bool:
+    return isinstance(dtype, getattr(pd, "ArrowDtype", ()))
+
+
+def _to_numpy_backed(series: pd.Series) -> pd.Series:
+    """Convert series backed by Arrow like pyarrow.Table.to_pandas(), other series are returned as is."""
+    if not _is_arrow_backed(series.dtype):
+        return series
+    converted = series.array.__arrow_array__().to_pandas()
+    return pd.Series(converted.array, index=series.index, name=series.name)
+
+
+def _join_css_columns(css_columns: List[np.ndarray], length: int, prefix: Optional[str] = None) -> np.ndarray:
+    """Join CSS of several formatters per element like _join_css_substrings(), skipping None entries.
+
+    Returns the joined CSS as attributes with the given prefix, or as is if prefix is None.
+    """
+    joined = np.full(length, "", dtype=object)
+    has_css = np.zeros(length, dtype=bool)
+    for css in css_columns:
+        is_set = ~np.equal(css, None)
+        if is_set.all():
+            joined = joined + np.where(has_css, "; ", "").astype(object) + css
+        elif is_set.any():
+            separators = np.where(has_css[is_set], "; ", "").astype(object)
+            joined[is_set] = joined[is_set] + separators + css[is_set]
+        has_css |= is_set
+    if prefix is None:
+        return joined
+    return prefix + '="' + joined + '"'
+
+
+class _StyleClasses:
+    """Distinct CSS of table rows and cells, interned as generated classes.
+
+    Class names are derived from the CSS, so tables in the same document share the classes of equal CSS.
+    """
+
+    prefix = "pbs-"
+
+    def __init__(self) -> None:
+        self.class_names: Dict[str, str] = {}
+
+    def class_name(self, css: str) -> str:
+        try:
+            return self.class_names[css]
+        except KeyError:
+            class_name = self.class_names[css] = self.prefix + _digest(css)
+            return class_name
+
+    def attribute(self, css: str) -> str:
+        """Return class attribute for css, which is empty if there is no CSS."""
+        if css == "":
+            return ""
+        return 'class="' + self.class_name(css) + '"'
+
+    def attributes(self, css: np.ndarray) -> np.ndarray:
+        """Vectorised version of attribute(), interning each distinct CSS once."""
+        codes, distinct = pd.factorize(css)
+        return np.array([self.attribute(value) for value in distinct.tolist()], dtype=object)[codes]
+
+    def style_sheet(self, table_id: str) -> Css:
+        """Return rules of all classes within the table as stylesheet, which is named by its content to avoid
+        duplicates.
+        """
+        rules = "\n".join(
+            "#" + table_id + " ." + class_name + "{" + css + "}"
+            for css, class_name in sorted(self.class_names.items(), key=lambda item: item[1])
+        )
+        return Css(css_string=rules, name="table-styles-" + _digest(rules))
+
+
+def _compact_markup(markup: str) -> str:
+    """Markup of table elements without whitespace around their tags, and without empty styles and classes or spans of
+    one row or column. Whitespace within cells is kept.
+    """
+    return _TABLE_TAG.sub(_compact_tag, markup)
+
+
+def _compact_tag(match: "re.Match[str]") -> str:
+    attributes = _DEFAULT_ATTRIBUTE.sub("", match.group(2))
+    attributes = _WHITESPACE.sub(" ", attributes).rstrip()
+    if attributes.endswith("/"):
+        attributes = attributes[:-1].rstrip() + "/"
+    return "<" + match.group(1) + attributes + ">"
+
+
+def _tag_layout(name: str, depth: int, compact: bool) -> Tuple[str, str, str]:
+    """Markup before and after the attributes of the start tag of a table element at depth within the table, and its
+    end tag.
+
+    Elements are laid out like by prettify(), one tag per line indented by depth, so that the table written verbatim is
+    indented as a whole, see pybloqs.html.VerbatimHTML. Compact elements have no whitespace around their tags.
+    """
+    if compact:
+        return "<" + name, ">", "</" + name + ">"
+    indent = _INDENT * depth
+    return indent + "<" + name, ">\n", indent + "</" + name + ">\n"
+
+
+def _attribute_markup(attributes: str, compact: bool) -> str:
+    """Attributes of a start tag following a space, or empty if there are none. Compact tags leave out empty styles and
+    classes.
+    """
+    if attributes == "" or (compact and attributes in _EMPTY_ATTRIBUTES):
+        return ""
+    return " " + attributes
+
+
+def _attributes_markup(attributes: Sequence[str], compact: bool) -> np.ndarray:
+    """Vectorised version of _attribute_markup()."""
+    attributes = np.asarray(attributes, dtype=object)
+    empty = attributes == ""
+    if compact:
+        for empty_attribute in _EMPTY_ATTRIBUTES:
+            empty |= attributes == empty_attribute
+    return np.where(empty, "", " " + attributes)
+
+
+def _span_markup(attributes: str, rowspan: int, colspan: int, compact: bool) -> str:
+    """Attributes of a cell along with its spans, in alphabetical order like written by prettify(). Compact cells leave
+    out spans of one row or column.
+    """
+    spans = (f' colspan="{colspan}"' if colspan != 1 or not compact else "") + (
+        f' rowspan="{rowspan}"' if rowspan != 1 or not compact else ""
+    )
+    attributes = _attribute_markup(attributes, compact)
+    return attributes + spans if attributes < " colspan" else spans + attributes
+
+
+def _with_ids(ids: np.ndarray, attributes: np.ndarray) -> np.ndarray:
+    """Id attributes along with the other attributes of the same elements, in alphabetical order, see _span_markup()."""
+    id_attributes = ' id="' + ids + '"'
+    return np.where(attributes < " id", attributes + id_attributes, id_attributes + attributes)
+
+
+def _markup_contents(contents: Iterable[Any]) -> List[str]:
+    """Cell contents as markup, e.g. "<b>x</b>" is written in bold. Contents with markup or entities are normalised
+    like by parsing them, e.g. "a & b" as "a &amp; b", as written by BeautifulSoup, which parsed rendered tables
+    before they were written verbatim. All such contents are parsed at once, see _parse_contents().
+    """
+    texts = [str(content) for content in contents]
+    positions = [position for position, text in enumerate(texts) if _has_markup(text)]
+    for position, cell in zip(positions, _parse_contents([texts[position] for position in positions])):
+        texts[position] = cell.decode_contents()
+    return texts
+
+
+def _has_markup(content: str) -> bool:
+    return "&" in content or "<" in content or ">" in content
+
+
+def _parse_content(content: str) -> Tag:
+    """Cell holding content parsed like within the rendered table, e.g. a trailing "&" is kept as text."""
+    return parse("<td>" + content + "</td>").td
+
+
+def _parse_contents(contents: Sequence[str]) -> List[Tag]:
+    """Vectorised version of _parse_content(), parsing all contents at once as cells of a single row.
+
+    Contents which would not stay within their cell, e.g. holding tags of rows or cells or an unclosed comment, are
+    parsed one by one instead, see _UNCONTAINED_MARKUP.
+    """
+    if len(contents) <= 1 or any(_UNCONTAINED_MARKUP.search(content) for content in contents):
+        return [_parse_content(content) for content in contents]
+    row = parse("<tr>" + "".join("<td>" + content + "</td>" for content in contents) + "</tr>").tr
+    cells = row.find_all("td", recursive=False)
+    if len(cells) != len(contents):
+        return [_parse_content(content) for content in contents]
+    return cells
+
+
+def _content_line(content: str, compact: bool) -> str:
+    """Content of a cell, see _markup_content_line(), on lines of its own, laid out like by prettify(), or left out if
+    empty. Compact cells keep their content as it is.
+    """
+    if compact:
+        return content
+    if "<" in content:
+        # Escaped text contains no "<"
+        return _element_lines(_parse_content(content))
+    content = content.strip()
+    return _CONTENT_INDENT + content + "\n" if content else ""
+
+
+def _element_lines(cell: Tag) -> str:
+    """Content of a parsed cell holding elements on lines of its own, laid out one tag per line like by prettify()."""
+    lines = render(cell, pretty=True).splitlines(keepends=True)[1:-1]
+    return "".join(_INDENT * _CELL_DEPTH + line for line in lines)
+
+
+def _content_lines(contents: Sequence[str], compact: bool) -> np.ndarray:
+    """Vectorised version of _content_line(), parsing the contents holding elements at once."""
+    contents = np.asarray(contents, dtype=object)
+    if compact:
+        return contents
+    texts = contents.ravel().tolist()
+    positions = [position for position, text in enumerate(texts) if "<" in text]
+    lines = [_content_line(text, compact) if "<" not in text else "" for text in texts]
+    for position, cell in zip(positions, _parse_contents([texts[position] for position in positions])):
+        lines[position] = _element_lines(cell)
+    return np.array(lines, dtype=object).reshape(contents.shape)
+
+
+def _markup_content_line(content: Any, compact: bool) -> str:
+    """Content of a cell as markup, see _content_line(), e.g. "<b>x</b>" is written in bold. Contents with markup or
+    entities are normalised like by parsing them, e.g. "a & b" as "a &amp; b", as written by BeautifulSoup, which
+    parsed rendered tables before they were written verbatim. Such contents are parsed once for both.
+    """
+    text = str(content)
+    if not _has_markup(text):
+        return _content_line(text, compact)
+    return _parsed_content_line(_parse_content(text), compact)
+
+
+def _parsed_content_line(cell: Tag, compact: bool) -> str:
+    """Content of a parsed cell as markup, see _markup_content_line()."""
+    content = cell.decode_contents()
+    return _element_lines(cell) if "<" in content and not compact else _content_line(content, compact)
+
+
+def _markup_content_lines(contents: Iterable[Any], compact: bool) -> List[str]:
+    """Vectorised version of _markup_content_line(), parsing all contents with markup or entities at once."""
+    texts = [str(content) for content in contents]
+    positions = [position for position, text in enumerate(texts) if _has_markup(text)]
+    lines = [text if _has_markup(text) else _content_line(text, compact) for text in texts]
+    for position, cell in zip(positions, _parse_contents([texts[position] for position in positions])):
+        lines[position] = _parsed_content_line(cell, compact)
+    return lines
+
+
+def _cell_markup(
+    name: str,
+    attributes: str,
+    content: Any,
+    compact: bool,
+    rowspan: Optional[int] = None,
+    colspan: Optional[int] = None,
+) -> str:
+    """Markup of a header or body cell with its content, see _tag_layout(). Used by the template."""
+    start, middle, end = _tag_layout(name, _CELL_DEPTH, compact)
+    if rowspan is None:
+        attributes = _attribute_markup(attributes, compact)
+    else:
+        attributes = _span_markup(attributes, rowspan, colspan, compact)
+    return start + attributes + middle + _markup_content_line(content, compact) + end
+
+
+def _row_start_tag(attributes: str, compact: bool) -> str:
+    start, middle, _ = _tag_layout("tr", _ROW_DEPTH, compact)
+    return start + _attribute_markup(attributes, compact) + middle
+
+
+def _row_end_tag(compact: bool) -> str:
+    return _tag_layout("tr", _ROW_DEPTH, compact)[2]
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
 
 
 def multiindex_to_tuples(index: pd.Index) -> List[Tuple]:
@@ -163,70 +1544,106 @@ def index_to_iterable(index: pd.Index, merge_depth: bool = False) -> List[List[I
 
     Each cell is an IndexCell namedtuple representing one <td> tag with:
     * `value`: the content of that cell
-    * `names`: a list of index values over the span of this cell
+    * `names`: the index values over the span of this cell, see IndexNames
     * `span`: the number of index values covered by this cell (rowspan if index, colspan if header)
     * `depth`: the number of MultiIndex levels covered by this cell (colspan if index, rowspan if header)
     """
-    sentinel = object()
-    if isinstance(index, pd.MultiIndex):
-        num_levels = len(index.names)
-
-        # convert index to tuples and reverse the order to help the merging
-        # logic below.
-        values = index.tolist()
-        values = list(reversed(values))
-
-        values.append((sentinel,) * num_levels)
-        carryover = [0] * num_levels
-
-        result = []
-        for rownum, (row, prev_row) in enumerate(zip(values, values[1:])):
-            # find first cell which does not match the cell before it in the
-            # index. only until num_levels-1 because the deepest cell should
-            # never be merged.
-            for depth in range(0, num_levels - 1):
-                if row[depth] == prev_row[depth]:
-                    # keep track of 'carryover': the number of cells that were
-                    # omitted. this will be added to the span of the merged
-                    # cell.
-                    carryover[depth] += 1
-                else:
-                    break
-            else:
-                depth = num_levels - 1
-
-            # generate entries for the remaining cells.
-            cells = []
-            for depth in range(depth, num_levels):
-                cells.append(
-                    IndexCell(
-                        row[depth],
-                        list(reversed(values[rownum - carryover[depth] : rownum + 1])),
-                        carryover[depth] + 1,
-                        1,
-                    )
-                )
-                carryover[depth] = 0
-
-            # merge cells depth-wise (i.e. vertically if header, horizontally
-            # if index) if required.
-            if merge_depth:
-                merged_cells = []
-                merge_count = 0
-                for cell, next_cell in zip(cells[:-1], cells[1:-1] + [IndexCell(sentinel, [], 0, 0)]):
-                    merge_count += 1
-                    if cell.value == next_cell.value and cell.span == next_cell.span:
-                        continue
-                    merged_cells.append(IndexCell(cell.value, cell.names, cell.span, merge_count))
-                    merge_count = 0
-                cells = [*merged_cells, cells[-1]]
-
-            result.append(cells)
-
-        return list(reversed(result))
-    else:
+    if not isinstance(index, pd.MultiIndex):
         return [[IndexCell(value, [value], 1, 1)] for value in index.tolist()]
 
+    values = index.tolist()
+    deepest = index.nlevels - 1
+    spans = _index_spans(index)
+    # Most rows only start a cell of the deepest level, which spans a single row and is never merged. Cells are created
+    # in one pass over the rows, and only rows starting cells of higher levels are created again with all their cells.
+    result = [[IndexCell(row[deepest], [row], 1, 1)] for row in values]
+    first_depths = (spans > 0).argmax(axis=0)
+    positions = np.flatnonzero(first_depths < deepest)
+    for position, first_depth, row_spans in zip(
+        positions.tolist(), first_depths[positions].tolist(), spans[:, positions].T.tolist()
+    ):
+        row = values[position]
+        cells = [
+            IndexCell(row[depth], _names(values, position, row_spans[depth]), row_spans[depth], 1)
+            for depth in range(first_depth, deepest + 1)
+        ]
+        result[position] = _merge_cells_depth_wise(cells) if merge_depth else cells
+    return result
+
+
+def _names(values: List[Tuple], position: int, span: int) -> Sequence[Tuple]:
+    """Names of an index cell starting at position, which refer to the index values if it spans several rows."""
+    return [values[position]] if span == 1 else IndexNames(values, position, position + span)
+
+
+def _index_spans(index: pd.MultiIndex) -> np.ndarray:
+    """Span of the cell starting at each level and position of index, or 0 if the cell above or before continues.
+
+    A cell continues while the values of its level and all levels above are the same, found by run-length detection
+    on the codes of the index. Missing values are never merged.
+    """
+    codes = np.array(index.codes, dtype=np.int64).reshape(index.nlevels, len(index))
+    starts = np.ones(codes.shape, dtype=bool)
+    starts[:, 1:] = (codes[:, 1:] != codes[:, :-1]) | (codes[:, 1:] == -1)
+    starts = np.logical_or.accumulate(starts, axis=0)
+    starts[-1] = True
+    spans = np.zeros(codes.shape, dtype=np.int64)
+    for level_starts, level_spans in zip(starts, spans):
+        positions = np.flatnonzero(level_starts)
+        level_spans[positions] = np.diff(positions, append=len(index))
+    return spans
+
+
+def _merge_cells_depth_wise(cells: List[IndexCell]) -> List[IndexCell]:
+    """Merge consecutive cells of a row with the same value and span (i.e. vertically if header, horizontally if
+    index). The deepest cell is never merged."""
+    sentinel = object()
+    merged_cells = []
+    merge_count = 0
+    for cell, next_cell in zip(cells[:-1], [*cells[1:-1], IndexCell(sentinel, [], 0, 0)]):
+        merge_count += 1
+        if cell.value == next_cell.value and cell.span == next_cell.span:
+            continue
+        merged_cells.append(IndexCell(cell.value, cell.names, cell.span, merge_count))
+        merge_count = 0
+    return [*merged_cells, cells[-1]]
+
+
+class IndexNames(Sequence):
+    """Index values over the span of an index cell.
+
+    Refers to the values of the whole index by position instead of copying them, so the names of all cells take
+    constant memory regardless of their spans. Compares equal to lists of the same values.
+    """
+
+    __slots__ = ("start", "stop", "values")
+
+    def __init__(self, values: Sequence, start: int, stop: int) -> None:
+        self.values = values
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def __getitem__(self, item: Union[int, slice]) -> Any:
+        if isinstance(item, slice):
+            return self.values[self.start : self.stop][item]
+        position = item + len(self) if item < 0 else item
+        if not 0 <= position < len(self):
+            raise IndexError("index names out of range")
+        return self.values[self.start + position]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (IndexNames, list, tuple)):
+            return len(self) == len(other) and all(name == other_name for name, other_name in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
 
 def columns_to_iterable(column_index: pd.Index, merge_depth: bool = False) -> List[List[IndexCell]]:
     """
@@ -235,22 +1652,16 @@ def columns_to_iterable(column_index: pd.Index, merge_depth: bool = False) -> Li
     rendering a table header.
     """
     rows = index_to_iterable(column_index, merge_depth=merge_depth)
-    result = [[] for _ in range(len(column_index.names))]
-
-    # transpose the index iterable from span-major to depth-major order.
-    skips = [0] * len(column_index.names)
-    for distance, row in enumerate(rows):
-        # if a previous cell at this depth had a span that overlaps, then don't
-        # emit a cell at this depth.
-        depth = 0
-        while skips[depth]:
-            skips[depth] -= 1
-            depth += 1
+    n_levels = column_index.nlevels
+    result = [[] for _ in range(n_levels)]
 
+    # transpose the index iterable from span-major to depth-major order. the cells
+    # of each column cover the deepest levels, as cells of the levels above span
+    # over it from a previous column.
+    for row in rows:
+        depth = n_levels - sum(cell.depth for cell in row)
         for cell in row:
             result[depth].append(cell)
-            for skip_index in range(depth, depth + cell.depth):
-                skips[skip_index] = cell.span - 1
             depth += cell.depth
 
     return result
@@ -643,11 +643,8 @@ class CommonTableFormatterBuilder(FormatterBuilder):
         """
         self.add_formatter(
             FormatterType.threshold,
-            pbtf.FmtHighlightText(
-                rows=self._data.loc[self._data[column] > self._data[threshold_column]].index,
-                columns=[column],
-                bold=True,
-                italic=True,
+            pbtf.FmtConditionalText(
+                self._data[column] > self._data[threshold_column], columns=[column], bold=True, italic=True
             ),
         )
         return self
@@ -665,9 +662,7 @@ class CommonTableFormatterBuilder(FormatterBuilder):
         """
         self.add_formatter(
             FormatterType.threshold,
-            pbtf.FmtHighlightText(
-                rows=self._data.loc[self._data[highlight_column]].index, columns=columns, bold=True, italic=True
-            ),
+            pbtf.FmtConditionalText(self._data[highlight_column], columns=columns, bold=True, italic=True),
         )
         return self
 
@@ -714,6 +709,7 @@ class CommonTableFormatterBuilder(FormatterBuilder):
         color: Tuple[float, float, float] = colors.RED,
         rows: Optional[List[str]] = None,
         columns: Optional[List[str]] = None,
+        vectorised: bool = False,
     ) -> "CommonTableFormatterBuilder":
         """
         Colour the cell background conditionally
@@ -726,15 +722,24 @@ class CommonTableFormatterBuilder(FormatterBuilder):
             rows to apply cell background colouring
         :param columns
             columns to apply cell background colouring
+        :param vectorised
+            if True, condition takes the dataframe of the selected cells and returns a boolean dataframe, e.g.
+            lambda df: df < 0, instead of being called per cell
 
         :returns builder
         """
-        rows = rows or self._data.index
-        columns = columns or self._data.columns
-        for column in columns:
-            conditional_data = self._data.loc[rows][column]
-            conditional_rows = conditional_data.loc[conditional_data.apply(condition)].index
-            self.color_background(color=color, rows=conditional_rows, columns=[column])
+        conditional_data = self._data.loc[rows or slice(None), columns or slice(None)]
+        mask = condition(conditional_data) if vectorised else pbtf._pandas_df_map_compat(conditional_data, condition)
+        return self._color_background_where(mask, color)
+
+    def _color_background_where(
+        self, mask: pd.DataFrame, color: Tuple[float, float, float] = colors.RED
+    ) -> "CommonTableFormatterBuilder":
+        """Colour the background of the cells selected by a boolean dataframe"""
+        self.add_formatter(
+            FormatterType.color_background,
+            pbtf.FmtConditionalBackground(mask, color=color, apply_to_header_and_index=False),
+        )
         return self
 
     def color_background_conditionally_matching(
@@ -758,8 +763,7 @@ class CommonTableFormatterBuilder(FormatterBuilder):
 
         :returns builder
         """
-        self.color_background_conditionally(condition=lambda v: v == value, color=color, rows=rows, columns=columns)
-        return self
+        return self._color_background_where(self._data.loc[rows or slice(None), columns or slice(None)] == value, color)
 
     def divider_line_vertical(
         self, column: str, include_header: bool = False, color: Tuple[float, float, float] = colors.BLUE
@@ -1,9 +1,28 @@
+import copy
 import datetime
+import functools
+import hashlib
 import itertools
 import numbers
+import types
+import warnings
 from collections import namedtuple
 from numbers import Number
-from typing import TYPE_CHECKING, Any, Collection, List, Literal, NoReturn, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    NoReturn,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 import pandas as pd
@@ -55,13 +74,38 @@ class TableFormatter:
     _modify_cell_content()
         Is applied to cell value, e.g. divide by 1e6 or convert number to string with specific number format.
 
+    _modify_column_content()
+        Vectorised version of _modify_cell_content(), applied to all index or body cell values of a column at once.
+        Formatters which do not implement it are applied cell by cell instead.
+
     _create_cell_level_css()
         Provides CSS styles to all <th> and <td> HTML tags.
 
+    _create_column_cell_level_css()
+        Vectorised version of _create_cell_level_css(), applied to all index or body cells of a column at once.
+
+    _create_body_row_level_css()
+        Vectorised version of _create_row_level_css(), applied to all body rows at once.
+
     _create_column_level_css()
         Provides CSS styles to all <col> HTML tags.
+
+    _create_structural_css()
+        CSS rules of the table replacing _create_cell_level_css(), for formatters applying the same style to whole
+        columns, alternating rows, or the header and index. See HTMLJinjaTableBlock structural_css.
+
+    Tables are rendered without the Jinja template, if all formatters providing cell or row level CSS implement the
+    vectorised versions of these hooks.
     """
 
+    # Selection lookups precomputed by bind(), as pairs of the bound selection and a dict of name -> is selected
+    _bound_rows: Optional[Tuple[Collection, Dict[Any, bool]]] = None
+    _bound_columns: Optional[Tuple[Collection, Dict[Any, bool]]] = None
+    # Statistics of the dataframe being rendered, shared by all formatters of the table
+    _bound_statistics: Optional["TableStatistics"] = None
+    # Attributes left over from rendering, which do not change the output of the formatter, see fingerprint()
+    _unfingerprinted_attributes: Tuple[str, ...] = ()
+
     def __init__(
         self,
         rows: Optional[Collection[str]] = None,
@@ -92,6 +136,48 @@ class TableFormatter:
             column_index = df.columns.get_loc(column_name)
         return Row_col_index(row_index, column_index)
 
+    def bind(
+        self,
+        df: pd.DataFrame,
+        row_names: Optional[Collection] = None,
+        statistics: Optional["TableStatistics"] = None,
+    ) -> None:
+        """Precompute which rows and columns of the dataframe about to be rendered are selected by this formatter.
+
+        Selection checks during rendering are then dictionary lookups instead of scans through self.rows and
+        self.columns. row_names are the names passed to the hooks for body rows, if they differ from df.index.
+        statistics of df are shared with the other formatters of the table, see get_statistics(). Tables bind copies of
+        their formatters, so formatters may be shared between tables rendered at the same time.
+        """
+        # Names are only iterated for a selection, as tables may have many rows
+        row_names = itertools.chain([HEADER_ROW_NAME], df.index, row_names if row_names is not None else [])
+        self._bound_rows = _bind_selection(self.rows, row_names)
+        self._bound_columns = _bind_selection(self.columns, itertools.chain([INDEX_COL_NAME], df.columns))
+        self._bound_statistics = statistics
+
+    def unbind(self) -> None:
+        """Drop selection lookups and statistics set up by bind()."""
+        self._bound_rows = None
+        self._bound_columns = None
+        self._bound_statistics = None
+
+    def get_statistics(self, df: pd.DataFrame) -> "TableStatistics":
+        """Return statistics of df, shared with the other formatters of the table while it is rendered.
+
+        For any other dataframe, e.g. the one passed to modify_dataframe(), a new TableStatistics is returned.
+        """
+        if self._bound_statistics is not None and self._bound_statistics.df is df:
+            return self._bound_statistics
+        return TableStatistics(df)
+
+    def _row_in_selection(self, row_name: Any) -> bool:
+        """Check if row_name is in self.rows, which must not be None."""
+        return _in_selection(row_name, self.rows, self._bound_rows)
+
+    def _column_in_selection(self, column_name: Any) -> bool:
+        """Check if column_name is in self.columns, which must not be None."""
+        return _in_selection(column_name, self.columns, self._bound_columns)
+
     def _is_selected_cell(self, row_name: str, column_name: str) -> bool:
         if (
             (row_name == HEADER_ROW_NAME)
@@ -103,23 +189,44 @@ class TableFormatter:
             return True
         is_outside_selection = (
             self.columns is not None
-            and column_name not in self.columns
+            and not self._column_in_selection(column_name)
             or self.rows is not None
-            and row_name not in self.rows
+            and not self._row_in_selection(row_name)
         )
         is_selected_cell = not is_outside_selection
         if (not self.apply_to_header) and (
-            row_name == HEADER_ROW_NAME and (self.rows is None or HEADER_ROW_NAME not in self.rows)
+            row_name == HEADER_ROW_NAME and (self.rows is None or not self._row_in_selection(HEADER_ROW_NAME))
         ):
             is_selected_cell = False
         if (not self.apply_to_index) and (
             (column_name == INDEX_COL_NAME)
             and (row_name != HEADER_ROW_NAME)
-            and (self.columns is None or INDEX_COL_NAME not in self.columns)
+            and (self.columns is None or not self._column_in_selection(INDEX_COL_NAME))
         ):
             is_selected_cell = False
         return is_selected_cell
 
+    def _selected_rows_mask(self, row_names: pd.Index, column_name: str) -> np.ndarray:
+        """Return boolean mask of the index or body cells in given column, which are selected by this formatter."""
+        if column_name == INDEX_COL_NAME:
+            if not self.apply_to_index and (self.columns is None or not self._column_in_selection(INDEX_COL_NAME)):
+                return np.zeros(len(row_names), dtype=bool)
+            if self.apply_to_index:
+                return np.ones(len(row_names), dtype=bool)
+        elif self.columns is not None and not self._column_in_selection(column_name):
+            return np.zeros(len(row_names), dtype=bool)
+        if self.rows is None:
+            return np.ones(len(row_names), dtype=bool)
+        return row_names.isin(list(self.rows))
+
+    def _selected_cells_mask(self, row_names: pd.Index, column_name: str, row_positions: np.ndarray) -> np.ndarray:
+        """Return boolean mask of the index or body cells in given column, which are styled by this formatter.
+
+        Like _selected_rows_mask(), with the positions of the rows of the cells for formatters selecting cells by
+        position, see FmtConditional.
+        """
+        return self._selected_rows_mask(row_names, column_name)
+
     def _insert_additional_html(self) -> str:
         """Insert HTML string before table."""
         raise NotImplementedError("_insert_additional_html")
@@ -132,6 +239,10 @@ class TableFormatter:
         """Formatting for cell values, e.g. number formats"""
         raise NotImplementedError("format_value")
 
+    def _modify_column_content(self, series: pd.Series, column_name: str) -> pd.Series:
+        """Formatting for all selected cell values of a column, e.g. number formats"""
+        raise NotImplementedError("format_column_values")
+
     def _create_table_level_css(self) -> NoReturn:
         """Formatting on html-table level"""
         raise NotImplementedError("format_table_css")
@@ -152,10 +263,26 @@ class TableFormatter:
         """Formatting on CSS level, e.g. colors, borders, etc."""
         raise NotImplementedError("format_cell_css")
 
+    def _create_column_cell_level_css(
+        self, series: pd.Series, column_name: str, row_positions: np.ndarray
+    ) -> Union[Optional[str], Sequence[Optional[str]]]:
+        """Formatting on CSS level for all selected cells of a column. A single value applies to all of them."""
+        raise NotImplementedError("format_column_cells_css")
+
+    def _create_body_row_level_css(
+        self, df: pd.DataFrame, row_names: pd.Index
+    ) -> Union[Optional[str], Sequence[Optional[str]]]:
+        """Formatting on CSS level for all body rows. A single value applies to all of them."""
+        raise NotImplementedError("format_body_rows_css")
+
     def _create_table_level_css_class(self) -> str:
         """CSS class of table"""
         raise NotImplementedError("create_table_level_css_class")
 
+    def _create_structural_css(self, layout: "TableLayout") -> Optional[List[str]]:
+        """CSS rules of the table styling all cells selected by this formatter, or None if they cannot be selected"""
+        raise NotImplementedError("create_structural_css")
+
     def insert_additional_html(self) -> str:
         """Inserts additional html (or java-script) before <table>."""
         return self._insert_additional_html()
@@ -171,6 +298,13 @@ class TableFormatter:
         else:
             return data.cell
 
+    def modify_column_content(self, series: pd.Series, column_name: str) -> pd.Series:
+        """Formatting for all cell values of a column at once. Series is indexed by the row names of the cells."""
+        mask = self._selected_rows_mask(series.index, column_name)
+        if not mask.any():
+            return series
+        return _update_masked_values(series, mask, self._modify_column_content(series[mask], column_name))
+
     def create_table_level_css(self) -> str:
         """Formatting on html-table level"""
         return self._create_table_level_css()
@@ -194,10 +328,503 @@ class TableFormatter:
         else:
             return None
 
+    def create_column_cell_level_css(
+        self, series: pd.Series, column_name: str, row_positions: np.ndarray
+    ) -> np.ndarray:
+        """CSS styles for all index or body cells of a column at once, None for cells without style.
+
+        Series holds the cell values and is indexed by the row names of the cells. row_positions are the positions of
+        the rows of the cells within the table body.
+        """
+        css = np.full(len(series), None, dtype=object)
+        mask = self._selected_cells_mask(series.index, column_name, row_positions)
+        if mask.any():
+            css[mask] = self._create_column_cell_level_css(series[mask], column_name, row_positions[mask])
+        return css
+
+    def create_body_row_level_css(self, df: pd.DataFrame, row_names: pd.Index) -> np.ndarray:
+        """CSS styles for all body rows at once, None for rows without style."""
+        css = np.full(len(row_names), None, dtype=object)
+        css[:] = self._create_body_row_level_css(df, row_names)
+        return css
+
     def create_table_level_css_class(self) -> str:
         """CSS class of table"""
         return self._create_table_level_css_class()
 
+    def create_structural_css(self, layout: "TableLayout") -> Optional[List[str]]:
+        """CSS rules of the table taking the place of the cell level CSS of this formatter, or None if not possible.
+
+        Only called for a table about to be rendered, with the formatter bound to it.
+        """
+        return self._create_structural_css(layout)
+
+    def _structural_rules(self, layout: "TableLayout", css: str) -> Optional[List[str]]:
+        """Rule applying css to all selected cells, for formatters with the same CSS for all cells."""
+        selectors = self._structural_selectors(layout)
+        if selectors is None:
+            return None
+        header_selectors, body_selectors = selectors
+        return layout.rules(header_selectors + body_selectors, css)
+
+    def _structural_selectors(self, layout: "TableLayout", rows: str = "n") -> Optional[Tuple[List[str], List[str]]]:
+        """Selectors of the selected header cells and of the selected body and index cells in rows nth-child(rows).
+
+        Returns None if cells are selected by row name, or if selected columns cannot be told apart by position.
+        """
+        if self.rows is not None and (isinstance(self.rows, str) or len(self.rows) > 0):
+            return None
+        # Header cells are either all selected or none, see _is_selected_cell(), and any body row stands for all
+        header_selectors = [layout.header_selector()] if self._is_selected_cell(HEADER_ROW_NAME, None) else []
+        body_selectors = layout.body_selectors(
+            self._is_selected_cell(_ANY_ROW, INDEX_COL_NAME),
+            [self._is_selected_cell(_ANY_ROW, column_name) for column_name in layout.body_columns],
+            rows,
+        )
+        if body_selectors is None:
+            return None
+        return header_selectors, body_selectors
+
+    def implements(self, hook: str) -> bool:
+        """Check if formatter implements hook, e.g. "create_cell_level_css", by overriding the hook function or the
+        underscore function it calls.
+        """
+        return _hook_owner(self, hook) is not None or _hook_owner(self, "_" + hook) is not None
+
+    def vectorises_column_content(self) -> bool:
+        """Check if modify_column_content() can be used instead of applying modify_cell_content() cell by cell.
+
+        This requires the column hook to be implemented at least as specifically as the cell hook, so that a derived
+        class overriding only _modify_cell_content() does not inherit the column hook of its base class.
+        """
+        return self._vectorises("modify_cell_content", "modify_column_content")
+
+    def vectorises_cell_level_css(self) -> bool:
+        """Check if create_column_cell_level_css() can be used instead of calling create_cell_level_css() per cell."""
+        return self._vectorises("create_cell_level_css", "create_column_cell_level_css")
+
+    def vectorises_row_level_css(self) -> bool:
+        """Check if create_body_row_level_css() can be used instead of calling create_row_level_css() per row."""
+        return self._vectorises("create_row_level_css", "create_body_row_level_css")
+
+    def _vectorises(self, hook: str, vectorised_hook: str) -> bool:
+        """Check if vectorised_hook is implemented at least as specifically as hook, see vectorises_column_content()."""
+        vectorised_owner = _most_specific_owner(self, vectorised_hook)
+        if vectorised_owner is None:
+            return False
+        owner = _most_specific_owner(self, hook)
+        if owner is None or vectorised_owner is self:
+            return True
+        return owner is not self and issubclass(vectorised_owner, owner)
+
+    def partition_rows(self, start: int, stop: int) -> "TableFormatter":
+        """Return formatter rendering body rows start:stop of the bound table in another process.
+
+        Partitions of consecutive row ranges are taken in order once the header is rendered, see HTMLJinjaTableBlock
+        max_workers. They are pickled without the bound state and bound to their rows only. Formatters keeping state
+        across rows, or depending on rows outside of the range, override this to hand over that state to the
+        partition and to advance their own state past the range, as if they had rendered it.
+        """
+        partition = copy.copy(self)
+        partition.unbind()
+        return partition
+
+    def take_rows(self, positions: np.ndarray) -> "TableFormatter":
+        """Return formatter rendering the body rows at positions of the bound table, in the given order.
+
+        Used to render a page of rows filtered and sorted on a server. Unlike partitions, these rows are not taken in
+        order, so formatters hand over their state like in partition_rows(), but do not advance it.
+        """
+        partition = copy.copy(self)
+        partition.unbind()
+        return partition
+
+    def fingerprint(self) -> str:
+        """Digest of the type and attributes of the formatter, which is equal for formatters producing equal output.
+
+        Used to look up rendered tables, see HTMLJinjaTableBlock render_cache. Functions, e.g. conditions, are
+        fingerprinted by their code, defaults and the current values of their closure variables. Any other state the
+        output depends on is not part of the fingerprint, e.g. global variables and attributes of objects that
+        functions refer to through them, so changing it does not render tables again. Raises TypeError if an attribute
+        cannot be fingerprinted.
+        """
+        attributes = {
+            name: value
+            for name, value in vars(self).items()
+            if not name.startswith("_bound") and name not in self._unfingerprinted_attributes
+        }
+        return _fingerprint((type(self).__module__, type(self).__qualname__, attributes))
+
+    def supports_chunks(self) -> bool:
+        """Check if formatter can be applied to a table rendered in chunks of rows, see StreamingHTMLJinjaTableBlock.
+
+        Each chunk is modified and rendered on its own, so formatters must not depend on rows of other chunks. By
+        default this excludes formatters modifying the dataframe, which override this if their changes are row-local.
+        """
+        return not self.implements("modify_dataframe")
+
+
+def _bind_selection(selection: Optional[Collection], names: Iterable) -> Optional[Tuple[Collection, Dict[Any, bool]]]:
+    """Return selection together with a dict telling for each of names, whether it is in selection."""
+    if selection is None or (not isinstance(selection, str) and len(selection) == 0):
+        # Nothing to look up, an empty selection is tested for membership as quickly as a dict
+        return None
+    try:
+        # Hash based membership test, unless selection is a string where `in` tests for substrings
+        lookup = selection if isinstance(selection, str) else frozenset(selection)
+        return selection, {name: name in lookup for name in names}
+    except TypeError:
+        # Unhashable names or selection entries, fall back to testing membership on every call
+        return None
+
+
+def _in_selection(name: Any, selection: Collection, bound: Optional[Tuple[Collection, Dict[Any, bool]]]) -> bool:
+    """Check if name is in selection, using lookup precomputed by _bind_selection() if available."""
+    if bound is not None and bound[0] is selection:
+        try:
+            return bound[1][name]
+        except (KeyError, TypeError):
+            pass
+    return name in selection
+
+
+# Name of no row, standing for any body row in selection checks, see TableFormatter._structural_selectors()
+_ANY_ROW = object()
+
+
+class TableLayout:
+    """Layout of a table about to be rendered, for formatters replacing their cell level CSS by CSS rules of the table.
+
+    Rules select header cells as a whole and body and index cells by their position within rows, which is only fixed
+    if index cells are not merged. All selectors have the same specificity, so rules of later formatters take
+    precedence like the inline styles they replace.
+    """
+
+    def __init__(self, table_id: str, n_index_levels: int, body_columns: pd.Index, fixed_positions: bool) -> None:
+        self.table_id = table_id
+        self.n_index_levels = n_index_levels
+        self.body_columns = body_columns
+        # Whether each body row has a cell per index level, i.e. cells of a column are at the same position
+        self.fixed_positions = fixed_positions
+
+    def header_selector(self) -> str:
+        return f"#{self.table_id} > thead > tr:nth-child(n) > th:nth-child(n)"
+
+    def body_selector(self, rows: str = "n", cells: str = "n") -> str:
+        return f"#{self.table_id} > tbody > tr:nth-child({rows}) > td:nth-child({cells})"
+
+    def body_selectors(
+        self, index_selected: bool, columns_selected: List[bool], rows: str = "n"
+    ) -> Optional[List[str]]:
+        """Selectors of index cells, if selected, and cells of the selected body columns, in rows nth-child(rows)."""
+        if index_selected and all(columns_selected):
+            return [self.body_selector(rows)]
+        if not index_selected and not any(columns_selected):
+            return []
+        if not self.fixed_positions:
+            return None
+        n_levels = self.n_index_levels
+        if all(columns_selected):
+            return [self.body_selector(rows, f"n+{n_levels + 1}")]
+        selectors = [self.body_selector(rows, f"-n+{n_levels}")] if index_selected else []
+        return selectors + [
+            self.body_selector(rows, str(n_levels + position + 1))
+            for position, is_selected in enumerate(columns_selected)
+            if is_selected
+        ]
+
+    def rules(self, selectors: List[str], css: str) -> List[str]:
+        """Rule applying css to the cells of selectors, or none if there are no such cells or no CSS."""
+        if not selectors or not css:
+            return []
+        return [",\n".join(selectors) + " {" + css + "}"]
+
+
+class TableStatistics:
+    """Statistics of the cell values of a dataframe, computed when first requested and memoized.
+
+    HTMLJinjaTableBlock creates one instance per render and binds it to all formatters of the table, so statistics
+    needed by several formatters are computed once per table instead of once per formatter or per cell.
+    Returned values are shared and must not be modified.
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        self.df = df
+        self._memo: Dict[Any, Any] = {}
+
+    def _memoize(self, key: Any, compute: Callable[[], Any]) -> Any:
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = compute()
+            return value
+        except TypeError:
+            # Unhashable key, e.g. unhashable operator or column names
+            return compute()
+
+    @property
+    def real_mask(self) -> pd.DataFrame:
+        """Mask of cells for which np.isreal() is True, i.e. of all cells but strings and complex numbers."""
+        return self._memoize("real_mask", lambda: _pandas_df_map_compat(self.df, np.isreal))
+
+    @property
+    def real_values(self) -> pd.DataFrame:
+        """Dataframe with NaN instead of cells which are not real, as used for totals."""
+        return self._memoize("real_values", lambda: self.df[self.real_mask])
+
+    @property
+    def numeric_values(self) -> np.ndarray:
+        """Cell values as 2D float array, with NaN for cells which are not numbers."""
+        return self._memoize("numeric_values", lambda: _numeric_values(self.df))
+
+    @property
+    def na_mask(self) -> np.ndarray:
+        """2D mask of missing cell values, as given by pd.isna()."""
+        return self._memoize("na_mask", lambda: self.df.isna().to_numpy())
+
+    @property
+    def nan_mask(self) -> np.ndarray:
+        """2D mask of cells which are NaN in numeric_values, i.e. cells which are NaN or not numbers."""
+        return self._memoize("nan_mask", lambda: np.isnan(self.numeric_values))
+
+    def aggregate(self, operator: Callable, axis: int, columns: Optional[Collection] = None) -> pd.Series:
+        """Apply operator, e.g. OP_SUM, along axis to real_values, optionally restricted to the given columns."""
+
+        def compute() -> pd.Series:
+            values = self.real_values if columns is None else self.real_values[columns]
+            return operator(values, axis=axis)
+
+        key = ("aggregate", operator, axis, None if columns is None else tuple(columns))
+        return self._memoize(key, compute)
+
+    def min(
+        self, axis: Optional[int] = None, rows: Optional[np.ndarray] = None, columns: Optional[np.ndarray] = None
+    ) -> Union[float, np.ndarray]:
+        """Min of numeric_values ignoring NaN, see _reduce()."""
+        return self._reduce(np.nanmin, axis, rows, columns)
+
+    def max(
+        self, axis: Optional[int] = None, rows: Optional[np.ndarray] = None, columns: Optional[np.ndarray] = None
+    ) -> Union[float, np.ndarray]:
+        """Max of numeric_values ignoring NaN, see _reduce()."""
+        return self._reduce(np.nanmax, axis, rows, columns)
+
+    def sum(
+        self, axis: Optional[int] = None, rows: Optional[np.ndarray] = None, columns: Optional[np.ndarray] = None
+    ) -> Union[float, np.ndarray]:
+        """Sum of numeric_values ignoring NaN, see _reduce()."""
+        return self._reduce(np.nansum, axis, rows, columns)
+
+    def mean(
+        self, axis: Optional[int] = None, rows: Optional[np.ndarray] = None, columns: Optional[np.ndarray] = None
+    ) -> Union[float, np.ndarray]:
+        """Mean of numeric_values ignoring NaN, see _reduce()."""
+        return self._reduce(np.nanmean, axis, rows, columns)
+
+    def _reduce(
+        self, func: Callable, axis: Optional[int], rows: Optional[np.ndarray], columns: Optional[np.ndarray]
+    ) -> Union[float, np.ndarray]:
+        """Reduce numeric_values with func to a scalar for axis None, an array by column for axis 0 or by row for 1.
+
+        rows and columns are optional boolean masks of the cells taken into account. Rows or columns without
+        numbers give NaN, or 0 for sums.
+        """
+
+        def compute() -> Union[float, np.ndarray]:
+            values = self.numeric_values
+            if rows is not None:
+                values = values[rows]
+            if columns is not None:
+                values = values[:, columns]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", category=RuntimeWarning)
+                return func(values, axis=axis)
+
+        key = (func.__name__, axis, _mask_key(rows), _mask_key(columns))
+        return self._memoize(key, compute)
+
+
+def _mask_key(mask: Optional[np.ndarray]) -> Optional[bytes]:
+    return None if mask is None else np.asarray(mask, dtype=bool).tobytes()
+
+
+class _HeatmapRange:
+    """Min and max values heatmap colors are relative to, computed once per rendered table.
+
+    Depending on axis, these are the min and max of all selected cells, or of each row or column.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        row_names: Optional[Collection],
+        rows: Optional[Collection],
+        columns: Optional[Collection],
+        axis: Any,
+        statistics: Optional[TableStatistics] = None,
+    ) -> None:
+        self.df = df
+        self.statistics = TableStatistics(df) if statistics is None else statistics
+        self.row_names = df.index if row_names is None else row_names
+        self.rows = rows
+        self.columns = columns
+        self.axis = axis if axis in (0, 1) else None
+        self._min_max = None
+
+    @property
+    def min_max(self) -> Tuple[Any, Any]:
+        """Min and max as scalars, or as dicts by row (axis=0) or column name (axis=1)."""
+        if self._min_max is None:
+            statistics = self.statistics
+            if self.axis == 0:
+                columns = self._columns_mask()
+                self._min_max = _min_max_by_name(
+                    statistics.min(axis=1, columns=columns), statistics.max(axis=1, columns=columns), self.row_names
+                )
+            elif self.axis == 1:
+                rows = self._rows_mask()
+                self._min_max = _min_max_by_name(
+                    statistics.min(axis=0, rows=rows), statistics.max(axis=0, rows=rows), self.df.columns
+                )
+            else:
+                rows, columns = self._rows_mask(), self._columns_mask()
+                self._min_max = (
+                    statistics.min(rows=rows, columns=columns),
+                    statistics.max(rows=rows, columns=columns),
+                )
+        return self._min_max
+
+    def partition_rows(self, start: int, stop: int) -> "_HeatmapRange":
+        """Range of body rows start:stop, holding the min and max of the whole table instead of the dataframe."""
+        return self.take_rows(slice(start, stop))
+
+    def take_rows(self, positions: Union[slice, np.ndarray]) -> "_HeatmapRange":
+        """Range of the body rows at positions, holding the min and max of the whole table instead of the dataframe."""
+        partition = copy.copy(self)
+        min_value, max_value = self.min_max
+        partition.row_names = np.asarray(self.row_names, dtype=object)[positions]
+        if self.axis == 0:
+            names = set(partition.row_names.tolist())
+            min_value = {name: value for name, value in min_value.items() if name in names}
+            max_value = {name: value for name, value in max_value.items() if name in names}
+        partition._min_max = (min_value, max_value)
+        partition.df = partition.statistics = None
+        return partition
+
+    def _rows_mask(self) -> np.ndarray:
+        if self.rows is None:
+            return np.ones(len(self.df), dtype=bool)
+        rows = list(self.rows)
+        # If multi-index, match full index tuples from ORG_ROW_NAMES column
+        if len(rows) > 0 and isinstance(rows[0], tuple):
+            return pd.Index(self.df[ORG_ROW_NAMES].to_numpy(), dtype=object, tupleize_cols=False).isin(rows)
+        return self.df.index.isin(rows)
+
+    def _columns_mask(self) -> np.ndarray:
+        if self.columns is None:
+            return np.ones(len(self.df.columns), dtype=bool)
+        return self.df.columns.isin(list(self.columns))
+
+    def of_cell(self, row_name: Any, column_name: Any) -> Tuple[float, float]:
+        """Min and max for a single cell. Raises KeyError for names, which were not precomputed."""
+        min_value, max_value = self.min_max
+        if self.axis is None:
+            return min_value, max_value
+        name = row_name if self.axis == 0 else column_name
+        return min_value[name], max_value[name]
+
+    def of_column(self, column_name: Any, row_positions: np.ndarray) -> Tuple[Any, Any]:
+        """Min and max for the cells of a column in the given rows, as scalars or arrays."""
+        min_value, max_value = self.min_max
+        if self.axis == 0:
+            row_names = np.asarray(self.row_names, dtype=object)[row_positions]
+            return (
+                np.array([min_value[name] for name in row_names], dtype=float),
+                np.array([max_value[name] for name in row_names], dtype=float),
+            )
+        if self.axis == 1:
+            return min_value[column_name], max_value[column_name]
+        return min_value, max_value
+
+
+def _numeric_values(df: pd.DataFrame) -> np.ndarray:
+    """Return cell values as 2D float array, with NaN for cells which are not numbers."""
+    values = np.full(df.shape, np.nan)
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        if column.dtype.kind in "biuf":
+            values[:, i] = column.to_numpy(dtype=float, na_value=np.nan)
+        else:
+            cells = pd.Series(column.to_numpy(dtype=object), dtype=object)
+            is_number = _is_instance_mask(cells, numbers.Number)
+            values[is_number, i] = cells[is_number].to_numpy(dtype=float)
+    return values
+
+
+def _min_max_by_name(min_values: np.ndarray, max_values: np.ndarray, names: Collection) -> Tuple[Dict, Dict]:
+    """Min and max of rows or columns as dicts by name. Rows or columns with the same name are aggregated."""
+    min_by_name: Dict[Any, float] = {}
+    max_by_name: Dict[Any, float] = {}
+    for name, min_value, max_value in zip(names, min_values.tolist(), max_values.tolist()):
+        if name in min_by_name:
+            min_value = np.fmin(min_by_name[name], min_value)
+            max_value = np.fmax(max_by_name[name], max_value)
+        min_by_name[name] = min_value
+        max_by_name[name] = max_value
+    return min_by_name, max_by_name
+
+
+def _heatmap_css(
+    values: np.ndarray,
+    is_max: np.ndarray,
+    is_min: np.ndarray,
+    max_alphas: np.ndarray,
+    min_alphas: np.ndarray,
+    min_color,
+    max_color,
+    center_color,
+) -> np.ndarray:
+    """Background color CSS of heatmap cells: max_color or min_color with given alpha, or center_color otherwise."""
+    is_min = is_min & ~is_max
+    css = np.full(len(values), CSS_BACKGROUND_COLOR + colors.css_color(center_color), dtype=object)
+    for mask, alphas, color in ((is_max, max_alphas, max_color), (is_min, min_alphas, min_color)):
+        if mask.any():
+            alphas = np.broadcast_to(alphas, values.shape)[mask]
+            css[mask] = [CSS_BACKGROUND_COLOR + css for css in colors.css_colors_from_alphas(color, alphas)]
+    return css
+
+
+# Results of pd.api.types.infer_dtype(), for which all values are numbers.Number instances
+_NUMERIC_INFERRED_TYPES = ("integer", "floating", "mixed-integer-float", "boolean", "complex")
+
+
+# Default hook implementations, used to find out which hooks a formatter overrides.
+_DEFAULT_HOOKS = dict(vars(TableFormatter))
+
+
+def _hook_owner(formatter: TableFormatter, name: str) -> Any:
+    """Return the formatter itself or its class defining function `name`. None if it is a TableFormatter default."""
+    if name in vars(formatter):
+        return formatter
+    for cls in type(formatter).__mro__:
+        if name in vars(cls):
+            if cls is TableFormatter and vars(cls)[name] is _DEFAULT_HOOKS.get(name):
+                return None
+            return cls
+    return None
+
+
+def _most_specific_owner(formatter: TableFormatter, hook: str) -> Any:
+    """Return the most derived owner of either the hook function or the underscore function it calls."""
+    owners = [
+        owner for owner in (_hook_owner(formatter, hook), _hook_owner(formatter, "_" + hook)) if owner is not None
+    ]
+    if formatter in owners:
+        return formatter
+    if not owners:
+        return None
+    return owners[0] if len(owners) == 1 or issubclass(owners[0], owners[1]) else owners[1]
+
 
 #
 # Formatter specialisations
@@ -222,6 +849,10 @@ class FmtToString(TableFormatter):
         """Change cell value to string formatted by fmt_string"""
         return self.fmt_string.format(data.cell)
 
+    def _modify_column_content(self, series: pd.Series, column_name: str) -> pd.Series:
+        """Change cell values to strings formatted by fmt_string"""
+        return series.map(self.fmt_string.format)
+
 
 class FmtNumbers(FmtToString):
     """Apply formatting string if cell content is number. Changes cell content from number to string."""
@@ -243,6 +874,11 @@ class FmtNumbers(FmtToString):
         else:
             return data.cell
 
+    def _modify_column_content(self, series: pd.Series, column_name: str) -> pd.Series:
+        """Change cell values from numbers to strings formatted by fmt_string"""
+        is_number = _is_instance_mask(series, numbers.Number)
+        return _update_masked_values(series, is_number, super()._modify_column_content(series[is_number], column_name))
+
 
 class FmtDecimals(FmtNumbers):
     """Change cell value from float to string and apply number format to n decimals. Uses FmtNumbers."""
@@ -308,6 +944,11 @@ class FmtDates(FmtToString):
         else:
             return data.cell
 
+    def _modify_column_content(self, series: pd.Series, column_name: str) -> pd.Series:
+        """Change cell values from dates to strings formatted by fmt_string"""
+        is_date = _is_instance_mask(series, (pd.Timestamp, datetime.datetime))
+        return _update_masked_values(series, is_date, super()._modify_column_content(series[is_date], column_name))
+
 
 class FmtYYYYMMDD(FmtDates):
     """Change cell value from date formats to string, format as e.g. 2001-12-01. Uses FmtDates."""
@@ -357,7 +998,7 @@ class FmtMultiplyCellValue(TableFormatter):
         if (
             data.row_name == HEADER_ROW_NAME
             and isinstance(data.cell, str)
-            and (self.columns is None or data.column_name in self.columns)
+            and (self.columns is None or self._column_in_selection(data.column_name))
         ):
             return data.cell + self.suffix
 
@@ -366,6 +1007,11 @@ class FmtMultiplyCellValue(TableFormatter):
         else:
             return data.cell
 
+    def _modify_column_content(self, series: pd.Series, column_name: str) -> pd.Series:
+        """Divide cell values by number"""
+        is_number = _is_instance_mask(series, numbers.Number)
+        return _update_masked_values(series, is_number, series[is_number].to_numpy(dtype=object) * self.d)
+
 
 class FmtValueToMillion(FmtMultiplyCellValue):
     """Divide cell values by 1e6 and add suffix to column name (if it is a string)."""
@@ -431,6 +1077,10 @@ class FmtReplaceNaN(TableFormatter):
         else:
             return df.fillna(self.value)
 
+    def supports_chunks(self) -> bool:
+        """Values are replaced cell by cell."""
+        return True
+
 
 class FmtFontsize(TableFormatter):
     """Set fontsize in table cells."""
@@ -452,6 +1102,14 @@ class FmtFontsize(TableFormatter):
         """Set fontsize for cell as CSS format."""
         return "font-size:" + str(self.fontsize) + self.unit
 
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all cells."""
+        return self._create_cell_level_css(None)
+
+    def _create_structural_css(self, layout: "TableLayout") -> Optional[List[str]]:
+        """Same CSS for all cells."""
+        return self._structural_rules(layout, self._create_cell_level_css(None))
+
 
 class FmtHighlightText(TableFormatter):
     """Change font formatting to highlight text in cell."""
@@ -473,14 +1131,11 @@ class FmtHighlightText(TableFormatter):
 
     def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> str:
         """Font style and color"""
-        css_substrings = [CSS_COLOR + colors.css_color(self.font_color)]
-        if self.bold:
-            css_substrings.append(CSS_BOLD)
-        else:
-            css_substrings.append("font-weight:normal")
-        if self.italic:
-            css_substrings.append("font-style:italic")
-        return "; ".join(css_substrings)
+        return _highlight_text_css(self.bold, self.italic, self.font_color)
+
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all cells."""
+        return self._create_cell_level_css(None)
 
 
 class FmtHighlightBackground(TableFormatter):
@@ -501,6 +1156,215 @@ class FmtHighlightBackground(TableFormatter):
         """Set background color"""
         return CSS_BACKGROUND_COLOR + colors.css_color(self.color)
 
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all cells."""
+        return self._create_cell_level_css(None)
+
+
+class FmtConditional(TableFormatter):
+    """Base class of formatters styling the cells selected by a boolean mask, e.g. by a condition on their values.
+
+    The mask is evaluated once when the formatter is bound to the table, so checking whether a cell is styled is an
+    array lookup instead of evaluating a condition per cell. Derived classes provide the CSS of the selected cells.
+    """
+
+    def __init__(
+        self,
+        mask: Union[pd.DataFrame, pd.Series, Callable[[pd.DataFrame], Union[pd.DataFrame, np.ndarray]]],
+        rows: Optional[Collection[str]] = None,
+        columns: Optional[Collection[str]] = None,
+        apply_to_header_and_index: Union[bool, Tuple[bool, bool]] = False,
+    ) -> None:
+        """mask selects the cells to style within rows and columns. Header cells are selected by rows and columns only.
+
+        mask: 'DataFrame'
+            Boolean frame of cells aligned to the table by row and column names. Cells missing from it are not styled.
+            Index cells are styled by its column INDEX_COL_NAME. A boolean Series selects whole rows instead.
+            May also be a function returning such frame, or an array of the same shape, from the values of the table,
+            e.g. lambda df: df < 0.
+        """
+        super().__init__(rows, columns, apply_to_header_and_index)
+        self.mask = mask
+        self._bound_mask: Optional[_BoundMask] = None
+        # Mask of the whole table, if the formatter renders a partition of its rows, see partition_rows()
+        self._partition_mask: Optional[_BoundMask] = None
+
+    def bind(
+        self,
+        df: pd.DataFrame,
+        row_names: Optional[Collection] = None,
+        statistics: Optional[TableStatistics] = None,
+    ) -> None:
+        super().bind(df, row_names, statistics)
+        row_names = pd.Index(row_names if row_names is not None else df.index, tupleize_cols=False)
+        if self._partition_mask is not None:
+            self._bound_mask = self._partition_mask.with_row_names(row_names)
+            return
+        self._bound_mask = _BoundMask.evaluate(self.mask, df, row_names)
+
+    def unbind(self) -> None:
+        super().unbind()
+        self._bound_mask = None
+
+    def partition_rows(self, start: int, stop: int) -> TableFormatter:
+        """The partition takes the rows start:stop of the mask evaluated on the whole table.
+
+        The partition does not keep the mask given, as it is not evaluated again and functions such as lambdas can not
+        be pickled to other processes, see HTMLJinjaTableBlock.max_workers.
+        """
+        partition = super().partition_rows(start, stop)
+        partition._partition_mask = self._bound_mask.take_rows(slice(start, stop))
+        partition.mask = None
+        return partition
+
+    def take_rows(self, positions: np.ndarray) -> TableFormatter:
+        """The rows taken keep their values of the mask evaluated on the whole table, like by partition_rows()."""
+        partition = super().take_rows(positions)
+        partition._partition_mask = self._bound_mask.take_rows(positions)
+        partition.mask = None
+        return partition
+
+    def create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> Optional[str]:
+        if self._bound_mask is None and data.row_name != HEADER_ROW_NAME:
+            # Not bound to a table, e.g. if called directly, the mask is evaluated on the dataframe of the cell
+            self.bind(data.df)
+            try:
+                return super().create_cell_level_css(data)
+            finally:
+                self.unbind()
+        return super().create_cell_level_css(data)
+
+    def _is_selected_cell(self, row_name: str, column_name: str) -> bool:
+        if not super()._is_selected_cell(row_name, column_name):
+            return False
+        return row_name == HEADER_ROW_NAME or (
+            self._bound_mask is not None and self._bound_mask.of_cell(row_name, column_name)
+        )
+
+    def _selected_cells_mask(self, row_names: pd.Index, column_name: str, row_positions: np.ndarray) -> np.ndarray:
+        mask = self._selected_rows_mask(row_names, column_name)
+        if self._bound_mask is not None and mask.any():
+            mask &= self._bound_mask.of_column(column_name, row_positions)
+        return mask
+
+
+class _BoundMask:
+    """Mask of FmtConditional evaluated on the table being rendered.
+
+    values holds a column per entry of columns, which maps column names to positions, or a single column for all
+    columns if columns is None. Rows are the body rows of the table, which are looked up by name for cell by cell
+    rendering.
+    """
+
+    def __init__(self, values: np.ndarray, columns: Optional[Dict[Any, int]], row_names: Optional[pd.Index]) -> None:
+        self.values = values
+        self.columns = columns
+        self.row_names = row_names
+        self._row_positions: Optional[Dict[Any, int]] = None
+
+    @classmethod
+    def evaluate(cls, mask: Any, df: pd.DataFrame, row_names: pd.Index) -> "_BoundMask":
+        if callable(mask):
+            mask = mask(df.loc[:, df.columns.get_level_values(0) != ORG_ROW_NAMES])
+        if isinstance(mask, pd.Series):
+            return cls(_align_mask_rows(mask.to_frame(), df, row_names), None, row_names)
+        if isinstance(mask, pd.DataFrame):
+            columns = {column: position for position, column in enumerate(mask.columns)}
+            return cls(_align_mask_rows(mask, df, row_names), columns, row_names)
+        values = np.asarray(mask, dtype=bool)
+        body_columns = df.columns[df.columns.get_level_values(0) != ORG_ROW_NAMES]
+        if values.shape != (len(df), len(body_columns)):
+            raise ValueError(
+                f"Mask of shape {values.shape} does not match table of shape {(len(df), len(body_columns))}"
+            )
+        return cls(values, {column: position for position, column in enumerate(body_columns)}, row_names)
+
+    def take_rows(self, positions: Union[slice, np.ndarray]) -> "_BoundMask":
+        """Mask of the rows at positions, whose names are set once bound to them, see with_row_names()."""
+        return _BoundMask(self.values[positions], self.columns, None)
+
+    def with_row_names(self, row_names: pd.Index) -> "_BoundMask":
+        return _BoundMask(self.values, self.columns, row_names)
+
+    def of_column(self, column_name: Any, row_positions: np.ndarray) -> np.ndarray:
+        """Mask of the cells of a column at the positions of their rows."""
+        position = 0 if self.columns is None else self.columns.get(column_name)
+        if position is None:
+            return np.zeros(len(row_positions), dtype=bool)
+        return self.values[row_positions, position]
+
+    def of_cell(self, row_name: Any, column_name: Any) -> bool:
+        position = 0 if self.columns is None else self.columns.get(column_name)
+        if position is None:
+            return False
+        if self._row_positions is None:
+            # Rows are only looked up by name if rendered cell by cell. For duplicate names the last row is used
+            self._row_positions = {name: row_position for row_position, name in enumerate(self.row_names)}
+        row_position = self._row_positions.get(row_name)
+        return row_position is not None and bool(self.values[row_position, position])
+
+
+def _align_mask_rows(mask: pd.DataFrame, df: pd.DataFrame, row_names: pd.Index) -> np.ndarray:
+    """Values of mask for the body rows of df, by position if mask has the index of df, otherwise by row names."""
+    values = mask.to_numpy(dtype=bool, na_value=False)
+    if mask.index.equals(df.index):
+        return values
+    if mask.index.is_unique:
+        positions = mask.index.get_indexer(row_names)
+        aligned = values[positions]
+        aligned[positions == -1] = False
+        return aligned
+    # A row is selected if any row of mask with its name is
+    return np.column_stack([row_names.isin(mask.index[column]) for column in values.T])
+
+
+class FmtConditionalBackground(FmtConditional):
+    """Set background color of the cells selected by a mask, see FmtConditional."""
+
+    def __init__(
+        self,
+        mask: Union[pd.DataFrame, pd.Series, Callable[[pd.DataFrame], Union[pd.DataFrame, np.ndarray]]],
+        color=colors.RED,
+        rows: Optional[Collection[str]] = None,
+        columns: Optional[Collection[str]] = None,
+        apply_to_header_and_index: Union[bool, Tuple[bool, bool]] = False,
+    ) -> None:
+        super().__init__(mask, rows, columns, apply_to_header_and_index)
+        self.color = color
+
+    def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> str:
+        return CSS_BACKGROUND_COLOR + colors.css_color(self.color)
+
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all selected cells."""
+        return self._create_cell_level_css(None)
+
+
+class FmtConditionalText(FmtConditional):
+    """Change font formatting to highlight text in the cells selected by a mask, see FmtConditional."""
+
+    def __init__(
+        self,
+        mask: Union[pd.DataFrame, pd.Series, Callable[[pd.DataFrame], Union[pd.DataFrame, np.ndarray]]],
+        bold: bool = True,
+        italic: bool = True,
+        font_color=colors.BLUE,
+        rows: Optional[Collection[str]] = None,
+        columns: Optional[Collection[str]] = None,
+        apply_to_header_and_index: Union[bool, Tuple[bool, bool]] = False,
+    ) -> None:
+        super().__init__(mask, rows, columns, apply_to_header_and_index)
+        self.bold = bold
+        self.italic = italic
+        self.font_color = font_color
+
+    def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> str:
+        return _highlight_text_css(self.bold, self.italic, self.font_color)
+
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all selected cells."""
+        return self._create_cell_level_css(None)
+
 
 class FmtBold(TableFormatter):
     """Set bold font in table cells."""
@@ -517,6 +1381,14 @@ class FmtBold(TableFormatter):
     def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> str:
         return CSS_BOLD
 
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all cells."""
+        return self._create_cell_level_css(None)
+
+    def _create_structural_css(self, layout: "TableLayout") -> Optional[List[str]]:
+        """Same CSS for all cells."""
+        return self._structural_rules(layout, self._create_cell_level_css(None))
+
 
 class FmtAlignCellContents(TableFormatter):
     """Align cell contents. Possible alignment values: left, center, right."""
@@ -535,6 +1407,14 @@ class FmtAlignCellContents(TableFormatter):
     def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> str:
         return "text-align:" + self.alignment
 
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all cells."""
+        return self._create_cell_level_css(None)
+
+    def _create_structural_css(self, layout: "TableLayout") -> Optional[List[str]]:
+        """Same CSS for all cells."""
+        return self._structural_rules(layout, self._create_cell_level_css(None))
+
 
 class FmtVerticalAlignCellContents(TableFormatter):
     """Align cell contents. Possible alignment values: top, middle, bottom."""
@@ -553,6 +1433,14 @@ class FmtVerticalAlignCellContents(TableFormatter):
     def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> str:
         return "vertical-align:" + self.alignment
 
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all cells."""
+        return self._create_cell_level_css(None)
+
+    def _create_structural_css(self, layout: "TableLayout") -> Optional[List[str]]:
+        """Same CSS for all cells."""
+        return self._structural_rules(layout, self._create_cell_level_css(None))
+
 
 class FmtHeader(TableFormatter):
     """Set various header formatting. Fixes table width."""
@@ -590,7 +1478,7 @@ class FmtHeader(TableFormatter):
         return "; ".join(css_substrings)
 
     def _create_column_level_css(self, data) -> str:
-        if self.columns is None or data.column_name in self.columns:
+        if self.columns is None or self._column_in_selection(data.column_name):
             css_substrings = []
             if data.column_name == INDEX_COL_NAME and self.index_width is not None:
                 css_substrings.append(CSS_WIDTH + self.index_width)
@@ -600,7 +1488,7 @@ class FmtHeader(TableFormatter):
 
     def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> Optional[str]:
         """Set a lot of css tags to rotate the text in the table header."""
-        if data.row_name == HEADER_ROW_NAME and (self.columns is None or data.column_name in self.columns):
+        if data.row_name == HEADER_ROW_NAME and (self.columns is None or self._column_in_selection(data.column_name)):
             css_substrings = []
             if self.rotate_deg != 0:
                 css_substrings.append("-webkit-transform-origin:0% 100%")
@@ -619,10 +1507,16 @@ class FmtHeader(TableFormatter):
         else:
             return None
 
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> None:
+        """Only header cells are formatted."""
+        return None
+
 
 class FmtStripeBackground(TableFormatter):
     """Set alternating cell background colors."""
 
+    _unfingerprinted_attributes = ("row_colors",)
+
     def __init__(
         self,
         first_color=colors.LIGHT_GREY,
@@ -637,15 +1531,39 @@ class FmtStripeBackground(TableFormatter):
         self.second_color = colors.css_color(second_color)
         self.header_color = colors.css_color(header_color)
         self.current_color = self.second_color
+        # Colors of all body rows, set by _create_body_row_level_css()
+        self.row_colors: Optional[np.ndarray] = None
         return
 
+    def _next_color(self, color: str) -> str:
+        return self.second_color if color == self.first_color else self.first_color
+
     def _create_row_level_css(self, data) -> None:
         if data.name == HEADER_ROW_NAME:
             return
-        if self.current_color == self.first_color:
-            self.current_color = self.second_color
-        else:
-            self.current_color = self.first_color
+        self.current_color = self._next_color(self.current_color)
+
+    def _create_body_row_level_css(self, df: pd.DataFrame, row_names: pd.Index) -> None:
+        """Alternate colors of all body rows, continuing from the current color like _create_row_level_css()."""
+        first_row_color = self._next_color(self.current_color)
+        second_row_color = self._next_color(first_row_color)
+        self.row_colors = np.where(np.arange(len(row_names)) % 2 == 0, first_row_color, second_row_color).astype(object)
+        if len(self.row_colors) > 0:
+            self.current_color = self.row_colors[-1]
+
+    def partition_rows(self, start: int, stop: int) -> TableFormatter:
+        """The partition continues with the current color, which is advanced past its rows."""
+        partition = super().partition_rows(start, stop)
+        partition.row_colors = None
+        if (stop - start) % 2 == 1:
+            self.current_color = self._next_color(self.current_color)
+        return partition
+
+    def take_rows(self, positions: np.ndarray) -> TableFormatter:
+        """The rows taken start with the current color."""
+        partition = super().take_rows(positions)
+        partition.row_colors = None
+        return partition
 
     def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> str:
         color = self.current_color
@@ -653,6 +1571,29 @@ class FmtStripeBackground(TableFormatter):
             color = self.header_color
         return CSS_BACKGROUND_COLOR + color
 
+    def _create_column_cell_level_css(
+        self, series: pd.Series, column_name: str, row_positions: np.ndarray
+    ) -> Union[str, np.ndarray]:
+        if self.row_colors is None:
+            return CSS_BACKGROUND_COLOR + self.current_color
+        return CSS_BACKGROUND_COLOR + self.row_colors[row_positions]
+
+    def _create_structural_css(self, layout: "TableLayout") -> Optional[List[str]]:
+        """Colors of odd and even body rows, starting with the color following the current one."""
+        selectors = self._structural_selectors(layout)
+        if selectors is None:
+            return None
+        header_selectors = selectors[0]
+        first_row_color = self._next_color(self.current_color)
+        return (
+            layout.rules(header_selectors, CSS_BACKGROUND_COLOR + self.header_color)
+            + layout.rules(self._structural_selectors(layout, "odd")[1], CSS_BACKGROUND_COLOR + first_row_color)
+            + layout.rules(
+                self._structural_selectors(layout, "even")[1],
+                CSS_BACKGROUND_COLOR + self._next_color(first_row_color),
+            )
+        )
+
 
 class FmtAlignTable(TableFormatter):
     """Set table alignment on page. Possible alignment paramters: left, center, right."""
@@ -700,8 +1641,45 @@ class FmtHeatmap(TableFormatter):
         self.max_color = max_color
         self.threshold = threshold
         self.cache = cache
+        self._heatmap_range: Optional[_HeatmapRange] = None
+        # Range of the whole table, if the formatter renders a partition of its rows, see partition_rows()
+        self._partition_range: Optional[_HeatmapRange] = None
         return
 
+    def bind(
+        self,
+        df: pd.DataFrame,
+        row_names: Optional[Collection] = None,
+        statistics: Optional[TableStatistics] = None,
+    ) -> None:
+        super().bind(df, row_names, statistics)
+        if self._partition_range is not None:
+            self._heatmap_range = self._partition_range
+            return
+        self._heatmap_range = _HeatmapRange(
+            df, row_names, self.rows, self.columns, self.axis, statistics=self.get_statistics(df)
+        )
+
+    def unbind(self) -> None:
+        super().unbind()
+        self._heatmap_range = None
+
+    def partition_rows(self, start: int, stop: int) -> TableFormatter:
+        """Colours of the partition are relative to the range of the whole table."""
+        partition = super().partition_rows(start, stop)
+        partition._partition_range = self._heatmap_range.partition_rows(start, stop)
+        return partition
+
+    def take_rows(self, positions: np.ndarray) -> TableFormatter:
+        """Colours of the rows taken are relative to the range of the whole table."""
+        partition = super().take_rows(positions)
+        partition._partition_range = self._heatmap_range.take_rows(positions)
+        return partition
+
+    def supports_chunks(self) -> bool:
+        """Colour range spans all rows, unless it is computed per row (axis=0)."""
+        return self.axis == 0
+
     def _get_selected_cell_values(self, rows, columns, df) -> Any:
         """Return all cell values within selected rows/columns range."""
         if rows is None:
@@ -732,19 +1710,27 @@ class FmtHeatmap(TableFormatter):
                 self.cache[cache_key] = (np.nanmin(cell_values), np.nanmax(cell_values))
             return self.cache[cache_key]
 
+    def _get_min_max_of_cell(self, data: "HTMLJinjaTableBlock.FormatterData") -> Tuple[float, float]:
+        """Returns min and max of the cells the color of given cell is relative to, precomputed while rendering."""
+        if self._heatmap_range is not None:
+            try:
+                return self._heatmap_range.of_cell(data.row_name, data.column_name)
+            except KeyError:
+                pass
+        # Get selected cells. If axis is specified, get only data from the same row (axis=0) or column (axis=1)
+        rows = self.rows
+        columns = self.columns
+        if self.axis == 0:
+            rows = [data.row_name]
+        elif self.axis == 1:
+            columns = [data.column_name]
+        return self._get_min_max_from_selected_cell_values(rows, columns, data.df)
+
     def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> Optional[str]:
         """Create heatmap with ranges from min to (-threshold) and from threshold to max."""
         if isinstance(data.cell, numbers.Number):
-            # Get selected cells. If axis is specified, get only data from the same row (axis=0) or column (axis=1)
-            rows = self.rows
-            columns = self.columns
-            if self.axis == 0:
-                rows = [data.row_name]
-            elif self.axis == 1:
-                columns = [data.column_name]
-
             # Get min max values from selected cells
-            (min_value, max_value) = self._get_min_max_from_selected_cell_values(rows, columns, data.df)
+            (min_value, max_value) = self._get_min_max_of_cell(data)
 
             # Create color with alpha according to value / (min or max)
             if data.cell > self.threshold:
@@ -759,6 +1745,28 @@ class FmtHeatmap(TableFormatter):
         else:
             return None
 
+    def _create_column_cell_level_css(
+        self, series: pd.Series, column_name: str, row_positions: np.ndarray
+    ) -> np.ndarray:
+        """Create heatmap colors of all numeric cells of a column at once."""
+        is_number = _is_instance_mask(series, numbers.Number)
+        css = np.full(len(series), None, dtype=object)
+        if is_number.any():
+            values = series[is_number].to_numpy(dtype=float)
+            min_values, max_values = self._heatmap_range.of_column(column_name, row_positions[is_number])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                css[is_number] = _heatmap_css(
+                    values,
+                    values > self.threshold,
+                    values < -self.threshold,
+                    values / max_values,
+                    values / min_values,
+                    self.min_color,
+                    self.max_color,
+                    colors.WHITE,
+                )
+        return css
+
 
 class FmtAppendTotalsRow(TableFormatter):
     """Add another row at table bottom containing sum/mean/etc. of specified columns"""
@@ -796,8 +1804,8 @@ class FmtAppendTotalsRow(TableFormatter):
         else:
             columns = self.total_columns
         if self.operator is not OP_NONE:
-            df_calculated = df[columns]
-            last_row = self.operator(df_calculated[_pandas_df_map_compat(df_calculated, np.isreal)], axis=0)
+            statistics = self.get_statistics(df)
+            last_row = statistics.aggregate(self.operator, axis=0, columns=columns)
             last_row = last_row.fillna(0.0)
             last_row = last_row._append(pd.Series("", index=df.columns.difference(last_row.index)))
         else:
@@ -861,7 +1869,7 @@ class FmtAppendTotalsColumn(TableFormatter):
         else:
             rows = self.total_rows
         if self.operator is not OP_NONE:
-            new_column = self.operator(df[_pandas_df_map_compat(df, np.isreal)], axis=1)
+            new_column = self.get_statistics(df).aggregate(self.operator, axis=1)
             new_column = new_column.fillna(0.0)
             new_column[~new_column.index.isin(rows)] = ""
         else:
@@ -870,6 +1878,10 @@ class FmtAppendTotalsColumn(TableFormatter):
         df_mod[self.column_name] = new_column
         return df_mod
 
+    def supports_chunks(self) -> bool:
+        """Totals are aggregated per row, so they can be appended to each chunk."""
+        return True
+
     def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> Optional[str]:
         """Set fontsize for cell as CSS format."""
         if data.column_name != self.column_name:
@@ -892,6 +1904,9 @@ class FmtAppendTotalsColumn(TableFormatter):
 class FmtExpandMultiIndex(TableFormatter):
     """Expand multi-indexed table into single index table, grouping by index level with optional sum/mean/etc."""
 
+    # Highest index level, precomputed by bind() for the rendered table
+    _max_index_level: Optional[int] = None
+
     def __init__(
         self,
         total_columns=None,
@@ -918,6 +1933,30 @@ class FmtExpandMultiIndex(TableFormatter):
         self.level_text_colors = level_text_colors
         return
 
+    def bind(
+        self,
+        df: pd.DataFrame,
+        row_names: Optional[Collection] = None,
+        statistics: Optional[TableStatistics] = None,
+    ) -> None:
+        super().bind(df, row_names, statistics)
+        self._max_index_level = max(self.index_level, default=None)
+
+    def unbind(self) -> None:
+        super().unbind()
+        self._max_index_level = None
+
+    def partition_rows(self, start: int, stop: int) -> TableFormatter:
+        """The partition continues from the current index_counter, which is advanced past its rows.
+
+        index_level is kept for the whole table, so it is still indexed by row position and bind() finds the highest
+        level of all rows.
+        """
+        partition = super().partition_rows(start, stop)
+        if stop > start and self.index_level:
+            self.index_counter = (self.index_counter + stop - start) % len(self.index_level)
+        return partition
+
     def _modify_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """Create single index dataframe inserting grouping rows for higher levels."""
         if self.total_columns == []:
@@ -925,42 +1964,71 @@ class FmtExpandMultiIndex(TableFormatter):
         else:
             columns = self.total_columns
 
-        flat_row_list = []
         n_ix_levels = len(df.index.levels)
-
-        # For each row compare index tuple to previous one and see if it changed on any level.
-        previous_tuple = [""] * n_ix_levels
-        for level_k, index_tuple in enumerate(df.index):
-            for level_i, sub_index in enumerate(index_tuple):
-                if index_tuple[: level_i + 1] != previous_tuple[: level_i + 1]:
-                    if level_i == n_ix_levels - 1:
-                        # If we are on lowest level, add entire row to flat_df
-                        data_rows = df.iloc[[level_k], :].copy()
-                    else:
-                        # If we are on higher level, add row filled with operator on lower level data
-                        if self.operator is OP_NONE:
-                            # For operator None fill row with empty string for each column
-                            data_rows = pd.DataFrame("", columns=df.columns, index=[sub_index])
-                        else:
-                            df_subset = df.loc[index_tuple[: level_i + 1]]
-                            data_rows = (
-                                self.operator(df_subset[_pandas_df_map_compat(df_subset, np.isreal)], axis=0)
-                                .to_frame()
-                                .T
-                            )
-                            data_rows = data_rows.fillna(0.0)
-                            data_rows.loc[:, ~data_rows.columns.isin(columns)] = ""
-                    n_rows = len(data_rows)
-                    data_rows.index = [sub_index] * n_rows
-                    data_rows.loc[:, ORG_ROW_NAMES] = pd.Series([index_tuple[: level_i + 1]], index=data_rows.index)
-                    flat_row_list.append(data_rows)
-                    # Need to address index_level with i instead of sub_index, because sub_index can repeat many times.
-                    self.index_level += [level_i] * n_rows
-            previous_tuple = index_tuple
-        flat_df = pd.concat(flat_row_list)
+        index_tuples = list(df.index)
+        # Row k starts a group on level i, if its index tuple differs from the one of the previous row up to level i.
+        # On the lowest level, this means the row itself is added, i.e. rows repeating the previous index are dropped.
+        codes = np.array(df.index.codes, dtype=np.int64).reshape(n_ix_levels, -1)
+        starts_group = np.ones(codes.shape, dtype=bool)
+        starts_group[:, 1:] = np.logical_or.accumulate(codes[:, 1:] != codes[:, :-1], axis=0)
+        # Rows of the flat dataframe in order, as positions in df and index levels
+        row_positions, row_levels = np.nonzero(starts_group.T)
+
+        # Stack one row per group and level followed by df, then interleave them with a single positional take.
+        # Group rows come first like in the flat dataframe, as the resulting dtypes may depend on the order.
+        pieces = []
+        take = np.empty(len(row_positions), dtype=np.int64)
+        offset = 0
+        values = df if self.operator is OP_NONE else self.get_statistics(df).real_values
+        for level_i in range(n_ix_levels - 1):
+            levels = list(range(level_i + 1)) if level_i > 0 else 0
+            grouped = values.groupby(level=levels, sort=False, dropna=False)
+            pieces.append(self._aggregate_groups(grouped, df.columns, columns))
+            is_level = row_levels == level_i
+            take[is_level] = offset + grouped.ngroup().to_numpy()[row_positions[is_level]]
+            offset += grouped.ngroups
+        pieces.append(df)
+        is_level = row_levels == n_ix_levels - 1
+        take[is_level] = offset + row_positions[is_level]
+
+        rows = list(zip(row_positions.tolist(), row_levels.tolist()))
+        flat_df = pd.concat(pieces).iloc[take]
+        flat_df = flat_df.set_axis(pd.Index([index_tuples[k][i] for k, i in rows]), axis=0)
+        org_row_names = np.empty(len(flat_df), dtype=object)
+        org_row_names[:] = [index_tuples[k][: i + 1] for k, i in rows]
+        flat_df[ORG_ROW_NAMES] = org_row_names
+        # Need to address index_level with i instead of sub_index, because sub_index can repeat many times.
+        self.index_level += row_levels.tolist()
         flat_df.index.name = ""
         return flat_df
 
+    def _aggregate_groups(self, grouped: Any, df_columns: pd.Index, total_columns: Collection) -> pd.DataFrame:
+        """Return one row per group, filled with self.operator applied to the group's columns in total_columns."""
+        if self.operator is OP_NONE:
+            # For operator None fill row with empty string for each column
+            return pd.DataFrame("", columns=df_columns, index=range(grouped.ngroups))
+        if self.operator in (OP_SUM, OP_MEAN) and all(dtype in (np.int64, np.float64) for dtype in grouped.obj.dtypes):
+            values = _sum_or_mean_by_group(
+                grouped.obj, grouped.ngroup().to_numpy(), grouped.ngroups, mean=self.operator is OP_MEAN
+            )
+        else:
+            values = np.array([_align_to(self.operator(group, axis=0), df_columns) for _, group in grouped])
+        # Like the operator applied to a single group, which returns one series, all columns share one dtype
+        aggregated = pd.DataFrame(values, columns=df_columns)
+        if values.dtype.kind == "O":
+            # Aggregates are only converted to a common type per column, if that is not object in the flat dataframe
+            aggregated = aggregated.where(aggregated.notna(), 0.0)
+            aggregated = pd.DataFrame(
+                {
+                    i: column if dtype.kind == "O" else column.infer_objects()
+                    for i, ((_, column), dtype) in enumerate(zip(aggregated.items(), grouped.obj.dtypes))
+                }
+            ).set_axis(df_columns, axis=1)
+        else:
+            aggregated = aggregated.fillna(0.0)
+        aggregated.loc[:, ~aggregated.columns.isin(total_columns)] = ""
+        return aggregated
+
     def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> Optional[str]:
         if data.row_name == HEADER_ROW_NAME:
             return None
@@ -975,7 +2043,8 @@ class FmtExpandMultiIndex(TableFormatter):
             indent = self.indent_px * self.index_level[self.index_counter]
             css_substrings.append("padding-left:" + str(indent) + "px")
 
-        if self.index_level[self.index_counter] != max(self.index_level):
+        max_index_level = self._max_index_level if self._max_index_level is not None else max(self.index_level)
+        if self.index_level[self.index_counter] != max_index_level:
             if self.bold:
                 css_substrings.append(CSS_BOLD)
             if self.hline_color is not None:
@@ -1024,6 +2093,14 @@ class FmtAddCellPadding(TableFormatter):
                 css_substrings.append("padding-" + side + ":" + str(value) + self.length_unit)
         return "; ".join(css_substrings)
 
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all cells."""
+        return self._create_cell_level_css(None)
+
+    def _create_structural_css(self, layout: "TableLayout") -> Optional[List[str]]:
+        """Same CSS for all cells."""
+        return self._structural_rules(layout, self._create_cell_level_css(None))
+
 
 class FmtAddCellBorder(TableFormatter):
     """Add border on around table cells. For each side with border, specify border width, 'each' takes precedence."""
@@ -1069,6 +2146,10 @@ class FmtAddCellBorder(TableFormatter):
                 )
         return "; ".join(css_substrings)
 
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all cells."""
+        return self._create_cell_level_css(None)
+
 
 class FmtFontFamily(TableFormatter):
     """Set the font family, see below for suggested family combinations. Please note the use of single and doule quotes.
@@ -1093,6 +2174,14 @@ class FmtFontFamily(TableFormatter):
     def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> str:
         return f"font-family: {self.font_family}"
 
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all cells."""
+        return self._create_cell_level_css(None)
+
+    def _create_structural_css(self, layout: "TableLayout") -> Optional[List[str]]:
+        """Same CSS for all cells."""
+        return self._structural_rules(layout, self._create_cell_level_css(None))
+
 
 class FmtHideCells(TableFormatter):
     """Prevents rows and columns from being displayed, but they will still influence e.g. sum operations."""
@@ -1114,12 +2203,12 @@ class FmtHideCells(TableFormatter):
             and (
                 self.rows is None
                 and self.columns is not None
-                and data.column_name not in self.columns
+                and not self._column_in_selection(data.column_name)
                 or self.rows is not None
                 and self.columns is None
-                and data.row_name not in self.rows
+                and not self._row_in_selection(data.row_name)
                 or (self.rows is not None and self.columns is not None)
-                and (data.column_name not in self.columns or data.row_name not in self.rows)
+                and (not self._column_in_selection(data.column_name) or not self._row_in_selection(data.row_name))
             )
         )
 
@@ -1176,6 +2265,10 @@ class FmtPageBreak(TableFormatter):
         if self.no_break:
             return "page-break-inside:avoid;"
 
+    def _create_body_row_level_css(self, df: pd.DataFrame, row_names: pd.Index) -> Optional[str]:
+        """Same CSS for all rows."""
+        return self._create_row_level_css(None)
+
 
 class FmtColumnMultiIndexBasic(TableFormatter):
     """Fine grained control of CSS output for column multi-index.
@@ -1288,6 +2381,10 @@ class FmtTruncateContentsWithEllipsis(TableFormatter):
         css_substrings = ["white-space:nowrap", "overflow:hidden", "text-overflow:ellipsis"]
         return "; ".join(css_substrings)
 
+    def _create_column_cell_level_css(self, series: pd.Series, column_name: str, row_positions: np.ndarray) -> str:
+        """Same CSS for all cells."""
+        return self._create_cell_level_css(None)
+
 
 class FmtHeatmapWithCenter(TableFormatter):
     """Color cell background by value. For column-wise or row-wise min/max coloring, set axis parameter.
@@ -1315,8 +2412,45 @@ class FmtHeatmapWithCenter(TableFormatter):
         self.threshold = threshold
         self.cache = cache
         self.center = center
+        self._heatmap_range: Optional[_HeatmapRange] = None
+        # Range of the whole table, if the formatter renders a partition of its rows, see partition_rows()
+        self._partition_range: Optional[_HeatmapRange] = None
         return
 
+    def bind(
+        self,
+        df: pd.DataFrame,
+        row_names: Optional[Collection] = None,
+        statistics: Optional[TableStatistics] = None,
+    ) -> None:
+        super().bind(df, row_names, statistics)
+        if self._partition_range is not None:
+            self._heatmap_range = self._partition_range
+            return
+        self._heatmap_range = _HeatmapRange(
+            df, row_names, self.rows, self.columns, self.axis, statistics=self.get_statistics(df)
+        )
+
+    def unbind(self) -> None:
+        super().unbind()
+        self._heatmap_range = None
+
+    def partition_rows(self, start: int, stop: int) -> TableFormatter:
+        """Colours of the partition are relative to the range of the whole table."""
+        partition = super().partition_rows(start, stop)
+        partition._partition_range = self._heatmap_range.partition_rows(start, stop)
+        return partition
+
+    def take_rows(self, positions: np.ndarray) -> TableFormatter:
+        """Colours of the rows taken are relative to the range of the whole table."""
+        partition = super().take_rows(positions)
+        partition._partition_range = self._heatmap_range.take_rows(positions)
+        return partition
+
+    def supports_chunks(self) -> bool:
+        """Colour range spans all rows, unless it is computed per row (axis=0)."""
+        return self.axis == 0
+
     def _get_selected_cell_values(
         self, rows: Optional[List[str]], columns: Optional[List[str]], df: pd.DataFrame
     ) -> Any:
@@ -1351,19 +2485,27 @@ class FmtHeatmapWithCenter(TableFormatter):
                 self.cache[cache_key] = (np.nanmin(cell_values), np.nanmax(cell_values))
             return self.cache[cache_key]
 
+    def _get_min_max_of_cell(self, data: "HTMLJinjaTableBlock.FormatterData") -> Tuple[float, float]:
+        """Returns min and max of the cells the color of given cell is relative to, precomputed while rendering."""
+        if self._heatmap_range is not None:
+            try:
+                return self._heatmap_range.of_cell(data.row_name, data.column_name)
+            except KeyError:
+                pass
+        # Get selected cells. If axis is specified, get only data from the same row (axis=0) or column (axis=1)
+        rows = self.rows
+        columns = self.columns
+        if self.axis == 0:
+            rows = [data.row_name]
+        elif self.axis == 1:
+            columns = [data.column_name]
+        return self._get_min_max_from_selected_cell_values(rows, columns, data.df)
+
     def _create_cell_level_css(self, data: "HTMLJinjaTableBlock.FormatterData") -> Optional[str]:
         """Create heatmap with ranges from min to (center-threshold) and from (center+threshold) to max."""
         if isinstance(data.cell, numbers.Number):
-            # Get selected cells. If axis is specified, get only data from the same row (axis=0) or column (axis=1)
-            rows = self.rows
-            columns = self.columns
-            if self.axis == 0:
-                rows = [data.row_name]
-            elif self.axis == 1:
-                columns = [data.column_name]
-
             # Get min max values from selected cells
-            (min_value, max_value) = self._get_min_max_from_selected_cell_values(rows, columns, data.df)
+            (min_value, max_value) = self._get_min_max_of_cell(data)
 
             # Create color with alpha according to value / (min or max)
             if data.cell - self.center > self.threshold:
@@ -1378,6 +2520,28 @@ class FmtHeatmapWithCenter(TableFormatter):
         else:
             return None
 
+    def _create_column_cell_level_css(
+        self, series: pd.Series, column_name: str, row_positions: np.ndarray
+    ) -> np.ndarray:
+        """Create heatmap colors of all numeric cells of a column at once."""
+        is_number = _is_instance_mask(series, numbers.Number)
+        css = np.full(len(series), None, dtype=object)
+        if is_number.any():
+            values = series[is_number].to_numpy(dtype=float) - self.center
+            min_values, max_values = self._heatmap_range.of_column(column_name, row_positions[is_number])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                css[is_number] = _heatmap_css(
+                    values,
+                    values > self.threshold,
+                    values < -self.threshold,
+                    values / (max_values - self.center),
+                    values / (min_values - self.center),
+                    self.min_color,
+                    self.max_color,
+                    self.center_color,
+                )
+        return css
+
 
 class FmtHideInsignificant(TableFormatter):
     """Replace zero values with blank strings in columns specified"""
@@ -1406,6 +2570,44 @@ class FmtHideInsignificant(TableFormatter):
 #
 
 
+def _align_to(series: pd.Series, index: pd.Index) -> np.ndarray:
+    """Return values of series in the order of index."""
+    if not series.index.equals(index):
+        series = series.reindex(index)
+    return series.to_numpy()
+
+
+def _sum_or_mean_by_group(df: pd.DataFrame, group_ids: np.ndarray, n_groups: int, mean: bool) -> np.ndarray:
+    """Return array of np.sum() or np.mean() along axis 0 of the rows of each group of a dataframe.
+
+    df must only have int64 and float64 columns. Rows are sorted by group, so numpy adds up the values of each group
+    in the same order as for the group on its own, giving identical results.
+    """
+    order = np.argsort(group_ids, kind="stable")
+    bounds = np.searchsorted(group_ids[order], np.arange(n_groups + 1))
+    is_float = (df.dtypes == np.float64).to_numpy()
+    result = np.empty((n_groups, df.shape[1]), dtype=np.float64 if mean or is_float.any() else np.int64)
+    for columns in (is_float, ~is_float):
+        if not columns.any():
+            continue
+        values = np.ascontiguousarray(df.iloc[:, columns].to_numpy()[order].T)
+        if columns is is_float:
+            # NaN are skipped, i.e. added as zero and not counted
+            is_nan = np.isnan(values)
+            values = np.where(is_nan, 0.0, values)
+            counts = np.add.reduceat(~is_nan, bounds[:-1], axis=1).T if n_groups else None
+        else:
+            counts = np.diff(bounds)[:, np.newaxis]
+            if mean:
+                values = values.astype(np.float64)
+        sums = np.array([values[:, start:end].sum(axis=1) for start, end in zip(bounds[:-1], bounds[1:])])
+        if mean and n_groups:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                sums = sums / counts
+        result[:, columns] = sums.reshape(n_groups, -1)
+    return result
+
+
 def _pandas_df_map_compat(df: pd.DataFrame, func) -> pd.DataFrame:
     """Apply function element-wise to DataFrame with pandas version compatibility to prevent deprecation warnings.
     pandas 2.1+ uses DataFrame.map(), older versions use DataFrame.applymap().
@@ -1416,6 +2618,31 @@ def _pandas_df_map_compat(df: pd.DataFrame, func) -> pd.DataFrame:
         return df.applymap(func)
 
 
+def _highlight_text_css(bold: bool, italic: bool, font_color) -> str:
+    css_substrings = [CSS_COLOR + colors.css_color(font_color)]
+    if bold:
+        css_substrings.append(CSS_BOLD)
+    else:
+        css_substrings.append("font-weight:normal")
+    if italic:
+        css_substrings.append("font-style:italic")
+    return "; ".join(css_substrings)
+
+
+def _is_instance_mask(series: pd.Series, types) -> np.ndarray:
+    """Return boolean mask of the values in series, which are instances of the given type(s)."""
+    if types is numbers.Number and pd.api.types.infer_dtype(series, skipna=False) in _NUMERIC_INFERRED_TYPES:
+        return np.ones(len(series), dtype=bool)
+    return np.fromiter((isinstance(value, types) for value in series.to_numpy()), dtype=bool, count=len(series))
+
+
+def _update_masked_values(series: pd.Series, mask: np.ndarray, new_values) -> pd.Series:
+    """Return copy of series with the values selected by (positional) mask replaced by new_values."""
+    values = series.to_numpy(dtype=object, copy=True)
+    values[mask] = np.asarray(new_values, dtype=object)
+    return pd.Series(values, index=series.index, name=series.name, dtype=object)
+
+
 #
 # Definition of default formatters
 #
@@ -1444,3 +2671,108 @@ DEFAULT_FORMATTERS = [
     fmt_page_break,
 ]
 DEFAULT_DECIMALS_FORMATTER = [fmt_decimals_2]
+
+
+# Formatters referring to each other in cycles cannot be fingerprinted
+_MAX_FINGERPRINT_DEPTH = 32
+# Values fingerprinted by their representation, which is the same for equal values
+_REPR_FINGERPRINTED_TYPES = (
+    bool,
+    numbers.Number,
+    str,
+    bytes,
+    np.generic,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    slice,
+    range,
+)
+
+
+def _fingerprint(value: Any) -> str:
+    """Digest of value, e.g. attributes of a formatter, which is stable across processes.
+
+    See TableFormatter.fingerprint(). Raises TypeError for values which cannot be fingerprinted.
+    """
+    return _nested_fingerprint(value, 0)
+
+
+def _update_value_types(digest: Any, values: Union[pd.Index, pd.Series]) -> None:
+    """Add the types of object values, which hash_pandas_object() hashes by their string representation only.
+
+    Otherwise values of different types with the same string representation, e.g. 1 and "1", have the same digest.
+    """
+    if isinstance(values, pd.MultiIndex):
+        for level in range(values.nlevels):
+            _update_value_types(digest, values.get_level_values(level))
+    elif isinstance(values.dtype, pd.CategoricalDtype):
+        _update_value_types(digest, values.dtype.categories)
+    elif values.dtype == object:
+        codes, value_types = pd.factorize(np.array([type(item) for item in values.tolist()], dtype=object))
+        digest.update(codes.tobytes())
+        digest.update(repr([f"{item.__module__}.{item.__qualname__}" for item in value_types]).encode())
+
+
+def _nested_fingerprint(value: Any, depth: int) -> str:
+    digest = hashlib.sha256()
+    _update_fingerprint(digest, value, depth)
+    return digest.hexdigest()
+
+
+def _update_fingerprint(digest: Any, value: Any, depth: int) -> None:
+    if depth > _MAX_FINGERPRINT_DEPTH:
+        raise TypeError("Value is nested too deeply to be fingerprinted")
+    depth += 1
+    digest.update(f"<{type(value).__module__}.{type(value).__qualname__}>".encode())
+    if value is None or value is Ellipsis or isinstance(value, _REPR_FINGERPRINTED_TYPES):
+        digest.update(repr(value).encode())
+    elif isinstance(value, (list, tuple)):
+        digest.update(str(len(value)).encode())
+        for item in value:
+            _update_fingerprint(digest, item, depth)
+    elif isinstance(value, (set, frozenset)):
+        digest.update("".join(sorted(_nested_fingerprint(item, depth) for item in value)).encode())
+    elif isinstance(value, dict):
+        digest.update("".join(sorted(_nested_fingerprint(item, depth) for item in value.items())).encode())
+    elif isinstance(value, pd.Index):
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+        digest.update(repr((value.dtype, value.names)).encode())
+        _update_value_types(digest, value)
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        # Rows are hashed along with their index values, values of object columns by their string representation
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+        digest.update(repr((value.index.dtype, value.index.names)).encode())
+        _update_value_types(digest, value.index)
+        if isinstance(value, pd.DataFrame):
+            _update_fingerprint(digest, value.columns, depth)
+            digest.update(repr(value.dtypes.tolist()).encode())
+            for _, column in value.items():
+                _update_value_types(digest, column)
+        else:
+            digest.update(repr((value.dtype, value.name)).encode())
+            _update_value_types(digest, value)
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype, value.shape)).encode())
+        if value.dtype == object:
+            _update_fingerprint(digest, value.tolist(), depth)
+        else:
+            digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, functools.partial):
+        _update_fingerprint(digest, (value.func, value.args, value.keywords), depth)
+    elif isinstance(value, types.FunctionType):
+        closure = tuple(cell.cell_contents for cell in value.__closure__ or ())
+        _update_fingerprint(
+            digest, (value.__module__, value.__qualname__, value.__code__, value.__defaults__, closure), depth
+        )
+    elif isinstance(value, types.CodeType):
+        digest.update(value.co_code)
+        _update_fingerprint(digest, (value.co_consts, value.co_names), depth)
+    elif isinstance(value, type):
+        digest.update(f"{value.__module__}.{value.__qualname__}".encode())
+    elif isinstance(value, (types.BuiltinFunctionType, np.ufunc)):
+        digest.update(f"{getattr(value, '__module__', None)}.{value.__name__}".encode())
+    elif hasattr(value, "__dict__"):
+        _update_fingerprint(digest, vars(value), depth)
+    else:
+        raise TypeError(f"Cannot fingerprint {type(value).__name__}")
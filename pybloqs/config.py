@@ -14,6 +14,8 @@ user_config = {
     "pdf_converter": "wkhtmltopdf",  # options: wkhtmltopdf or chrome_headless
     "image_converter": "wkhtmltoimage",
     "id_precision": 10,  # Number of digits to use from the id hash
+    "table_max_rows": None,  # Tables with more rows only show head and tail rows, None shows all rows
+    "table_max_cols": None,  # Tables with more columns only show first and last columns, None shows all columns
 }
 
 
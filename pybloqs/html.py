@@ -1,8 +1,10 @@
 import uuid
 from functools import partial
-from typing import Callable, Generator, Iterator, Optional
+from typing import Callable, Generator, Iterator, Optional, Union
 
 import bs4
+from bs4.dammit import EntitySubstitution
+from bs4.formatter import HTMLFormatter
 
 # Use the default python parser as this is lenient and does not
 # wrap content in extra tags
@@ -38,15 +40,30 @@ def root(tag_name: str = "html", doctype: Optional[str] = None, **kwargs) -> bs4
     return tag
 
 
-def render(item: bs4.Tag, pretty: bool = True, encoding: str = "utf-8") -> str:
+def render(item: Union[bs4.Tag, bs4.NavigableString], pretty: bool = True, encoding: str = "utf-8") -> str:
     """
     Renders the given element into a string.
 
-    :param item: Item to render. Must be an element or soup instance.
+    :param item: Item to render. Must be an element, soup instance or string, e.g. verbatim HTML.
     :param pretty: Toggles pretty formatting of the resulting string.
     :return: Rendered content.
     """
-    return item.prettify(encoding=encoding).decode("utf-8") if pretty else str(item)
+    if isinstance(item, bs4.NavigableString):
+        return item.output_ready()
+    if not pretty:
+        return str(item)
+    return item.prettify(encoding=encoding, formatter=_PrettyFormatter(item)).decode("utf-8")
+
+
+class _PrettyFormatter(HTMLFormatter):
+    """
+    Same as the "minimal" formatter used by prettify(), which also holds the element rendered,
+    so that verbatim HTML can be indented to its depth below it.
+    """
+
+    def __init__(self, item: bs4.Tag) -> None:
+        super().__init__(entity_substitution=EntitySubstitution.substitute_xml)
+        self.item = item
 
 
 def append_to(parent: bs4.PageElement, tag, **kwargs) -> bs4.Tag:
@@ -73,6 +90,49 @@ def append_to(parent: bs4.PageElement, tag, **kwargs) -> bs4.Tag:
     return new_tag
 
 
+class VerbatimHTML(bs4.element.PreformattedString):
+    """
+    Pre-rendered HTML, which is written out as is when the document is rendered,
+    instead of being parsed into a tree of elements first.
+
+    If indent is set, the HTML is laid out like by prettify() and its lines are indented
+    to the depth of the element when the document is rendered pretty.
+    """
+
+    PREFIX = ""
+    SUFFIX = ""
+    indent = False
+
+    def output_ready(self, formatter=None) -> str:
+        # Unlike the base class, skip running the formatter, which would scan the whole string for entities
+        if not self.indent or not isinstance(formatter, _PrettyFormatter):
+            return self
+        depth = 0
+        for parent in self.parents:
+            depth += 1
+            if parent is formatter.item:
+                if parent.hidden:
+                    # The children of a document are not indented, as the document itself is not written
+                    depth -= 1
+                return self.replace("\n", "\n" + getattr(formatter, "indent", " ") * depth)
+        return self
+
+
+def append_verbatim(parent: bs4.PageElement, html: str, indent: bool = False) -> VerbatimHTML:
+    """
+    Append pre-rendered HTML to the supplied parent without parsing it.
+
+    :param parent: Parent to append to.
+    :param html: HTML string, written out unchanged when the document is rendered.
+    :param indent: Whether html is laid out like by prettify(), see VerbatimHTML.
+    :return: New element.
+    """
+    element = VerbatimHTML(html)
+    element.indent = indent
+    parent.append(element)
+    return element
+
+
 def construct_element(
     container: Optional[bs4.Tag] = None,
     content: Optional[str] = None,
@@ -10,13 +10,16 @@ import pybloqs
 from pybloqs.block.base import default_css_main
 from pybloqs.html import append_to, id_generator, render, root
 from pybloqs.server.provider import BloqsProvider
+from pybloqs.server.registry import add_block_endpoint
 from pybloqs.static import DependencyTracker, script_block_core, script_inflate
 from pybloqs.util import Cfg
 
 
 def _getapp() -> Flask:
     if "app" not in globals():
-        globals()["app"] = Flask(__name__)
+        app = Flask(__name__)
+        add_block_endpoint(app)
+        globals()["app"] = app
     return globals()["app"]
 
 
@@ -1,3 +1,6 @@
+from pybloqs.server.block.data_tables import ServerSideDataTable  # noqa: F401
+from pybloqs.server.block.incremental_poll import IncrementalPoll  # noqa: F401
+from pybloqs.server.block.paginated_table import PaginatedTable  # noqa: F401
 from pybloqs.server.block.poll import Poll  # noqa: F401
 from pybloqs.server.block.refresh import Refresh  # noqa: F401
 from pybloqs.server.block.select import Select  # noqa: F401
@@ -0,0 +1,203 @@
+import copy
+import json
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+from bs4.element import Tag
+from flask import Response, request
+
+from pybloqs.block.data_tables import DataTablesHTMLJinjaTableBlock, _StyleIndex, _write_initialisation
+from pybloqs.block.table_formatters import TableFormatter
+from pybloqs.server.registry import block_registry
+
+# Page lengths offered, except for showing all rows at once
+_LENGTH_MENU = [10, 25, 50, 100, 250, 500, 1000]
+
+
+class ServerSideDataTable(DataTablesHTMLJinjaTableBlock):
+    server_side = True
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        formatters: Optional[List[TableFormatter]] = None,
+        use_default_formatters: bool = False,
+        paging: bool = True,
+        searching: bool = True,
+        info: bool = True,
+        **kwargs,
+    ) -> None:
+        """DataTables table, which is filtered, sorted and paged on the server by the DataTables server-side protocol.
+
+        The table is written without body rows. DataTables requests the rows shown from an endpoint of the server,
+        which filters and sorts the values of the dataframe and renders only the requested page. Formatters are bound
+        to the whole table, so e.g. heatmap colors are the same as if all rows were rendered. Index cells are not
+        merged across rows. Rows are served by the endpoint shared by all tables, see BlockRegistry, so the table may
+        also be created while the server handles requests, e.g. by a provider.
+
+        Parameters
+        ----------
+        df: 'DataFrame'
+            The DF from which the values are taken.
+        formatters: 'list'
+            List of formatters, which are objects inheriting from TableFormatter class.
+        paging, searching, info: 'bool'
+            Toggle the DataTables controls, see DataTablesHTMLJinjaTableBlock.
+        """
+        # Rows are paged by DataTables, cells are styled inline as the rows are sent without a stylesheet
+        super().__init__(
+            df, formatters, use_default_formatters, paging, searching, info, max_rows=0, max_cols=0, **kwargs
+        )
+        self._search_text: Optional[List[np.ndarray]] = None
+        self.url = block_registry.add(self)
+
+    def serve_request(self) -> Response:
+        """Answer the requests of DataTables with the requested rows as JSON, see BlockRegistry."""
+        return Response(json.dumps(self._get_page_data(request.args)), mimetype="application/json")
+
+    def _get_page_data(self, params: Mapping[str, str]) -> Dict[str, Any]:
+        """Rows requested by parameters of the DataTables server-side protocol, along with the number of rows."""
+        draw = 0
+        try:
+            draw = int(params.get("draw", 0))
+            positions = self._sort_rows(self._filter_rows(params), params)
+            start = max(int(params.get("start", 0)), 0)
+            length = int(params.get("length", -1))
+        except (KeyError, ValueError) as e:
+            return {"draw": draw, "error": f"Invalid request: {e}"}
+        page = positions[start:] if length < 0 else positions[start : start + length]
+        return {
+            "draw": draw,
+            "recordsTotal": len(self.df),
+            "recordsFiltered": len(positions),
+            "data": self._get_rows_data(page),
+        }
+
+    def _filter_rows(self, params: Mapping[str, str]) -> np.ndarray:
+        """Positions of the rows matching the global and column searches, which are case-insensitive.
+
+        Like DataTables, a row matches the global search, if each word is found in one of its searchable columns.
+        """
+        search_text = self._get_search_text()
+        mask = np.ones(len(self.df), dtype=bool)
+        searchable = [params.get(f"columns[{i}][searchable]", "true") == "true" for i in range(len(search_text))]
+        for word in params.get("search[value]", "").lower().split():
+            mask &= np.logical_or.reduce(
+                [_contains(text, word) for text, is_searchable in zip(search_text, searchable) if is_searchable],
+                initial=False,
+            )
+        for i, text in enumerate(search_text):
+            value = params.get(f"columns[{i}][search][value]", "").lower()
+            if value and searchable[i]:
+                mask &= _contains(text, value)
+        return np.flatnonzero(mask)
+
+    def _sort_rows(self, positions: np.ndarray, params: Mapping[str, str]) -> np.ndarray:
+        """Positions sorted by the requested columns. The order of rows with equal values is kept."""
+        keys = {}
+        ascending = []
+        while f"order[{len(keys)}][column]" in params:
+            n = len(keys)
+            column = int(params[f"order[{n}][column]"])
+            if not 0 <= column < self._get_row_width():
+                raise ValueError(f"no column {column} to order by")
+            keys[n] = pd.Series(self._get_column_values(column)[positions])
+            ascending.append(params.get(f"order[{n}][dir]", "asc") == "asc")
+        if not keys:
+            return positions
+        try:
+            order = pd.DataFrame(keys).sort_values(list(keys), ascending=ascending, kind="mergesort").index
+        except TypeError:
+            # Values of mixed types are compared as text
+            keys = {n: key.astype(str) if key.dtype == object else key for n, key in keys.items()}
+            order = pd.DataFrame(keys).sort_values(list(keys), ascending=ascending, kind="mergesort").index
+        return positions[order.to_numpy()]
+
+    def _get_column_values(self, column: int) -> np.ndarray:
+        """Values of a column as displayed, counting index levels first."""
+        n_levels = self.df.index.nlevels
+        if column < n_levels:
+            return self.df.index.get_level_values(column).to_numpy()
+        return self._get_body_df().iloc[:, column - n_levels].to_numpy()
+
+    def _get_search_text(self) -> List[np.ndarray]:
+        """Lower case text of the values of each column searched by DataTables, computed once."""
+        if self._search_text is None:
+            self._search_text = [
+                pd.Series(self._get_column_values(column), dtype=object).astype(str).str.lower().to_numpy()
+                for column in range(self._get_row_width())
+            ]
+        return self._search_text
+
+    def _get_rows_data(self, positions: np.ndarray) -> List[Dict[str, Any]]:
+        """Rows at positions rendered by the formatters of the whole table, as row objects of DataTables.
+
+        Cell contents are keyed by column position. Styles of rows and cells are taken from the formatters without
+        rendering the rows, and set on the elements created by DataTables, see _write_contents().
+        """
+        # Requests may be handled at the same time, so each binds the formatters for a copy of the table
+        table = copy.copy(self)
+        table._bind_formatters()
+        try:
+            rows = table._take_rows(positions)
+        finally:
+            table._unbind_formatters()
+        index_iterable, row_names = rows._bind_formatters()
+        # Style hooks return positions of distinct styles, like for rows embedded as JSON data
+        style_index = rows._style_classes = _StyleIndex()
+        rows.row_index = -1
+        try:
+            row_styles, cell_styles, contents = rows._get_body_cells(index_iterable, row_names)
+        finally:
+            rows._style_classes = None
+            rows._unbind_formatters()
+        styles = style_index.styles()
+        rows_data = []
+        for row_style, row_cell_styles, row_contents in zip(row_styles, cell_styles, contents):
+            row = {str(i): content.strip() for i, content in enumerate(row_contents)}
+            row["DT_RowAttr"] = {"style": styles[row_style]}
+            row["cell_attrs"] = [{"style": styles[cell_style]} for cell_style in row_cell_styles]
+            rows_data.append(row)
+        return rows_data
+
+    def _partition(self, df: pd.DataFrame, formatters: List[TableFormatter]) -> DataTablesHTMLJinjaTableBlock:
+        partition = super()._partition(df, formatters)
+        # Partitions render the rows taken, see _renders_rows_in_partitions()
+        partition.url = None
+        return partition
+
+    def _renders_rows_in_partitions(self) -> bool:
+        return self.url is not None
+
+    def _get_template_model(self, *args, **kwargs) -> Dict[str, Any]:
+        model = super()._get_template_model(*args, **kwargs)
+        if self.url is not None:
+            # Rows are requested by DataTables once initialised
+            model["render_tbody_rows"] = lambda: ""
+        return model
+
+    def _write_contents(self, container: Tag, actual_cfg, *args, **kwargs) -> None:
+        super()._write_contents(container, actual_cfg, *args, **kwargs)
+        options = {
+            "serverSide": True,
+            "ajax": self.url,
+            "columns": [{"data": str(i)} for i in range(self._get_row_width())],
+            "lengthMenu": _LENGTH_MENU,
+        }
+        _write_initialisation(
+            container,
+            f"table{self._id}",
+            options,
+            """
+                options.createdRow = function (row, data) {
+                    $(row).children("td").each(function (i) {
+                        $(this).attr(data.cell_attrs[i]);
+                    });
+                };
+            """,
+        )
+
+
+def _contains(text: np.ndarray, value: str) -> np.ndarray:
+    return pd.Series(text, dtype=object).str.contains(value, regex=False).to_numpy(dtype=bool)
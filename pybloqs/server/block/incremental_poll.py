@@ -0,0 +1,162 @@
+import copy
+import threading
+import uuid
+from collections import OrderedDict, namedtuple
+from typing import List, Optional
+
+import numpy as np
+from bs4.element import Tag
+from flask import Response, request
+
+import pybloqs
+from pybloqs.block.table import HTMLJinjaTableBlock
+from pybloqs.html import append_to, id_generator, render, root
+from pybloqs.server import BloqsProvider
+from pybloqs.server.provider import _render_new_resources
+from pybloqs.server.registry import block_registry
+from pybloqs.server.static import HTMX
+from pybloqs.static import DependencyTracker
+from pybloqs.util import Cfg
+
+# Markup of a table sent to a page, without its body rows, the start tags of the rows, markup of the cells and end tag
+# of the rows
+_SentTable = namedtuple("_SentTable", ["skeleton", "row_tags", "cell_html", "row_end"])
+
+
+class IncrementalPoll(pybloqs.BaseBlock):
+    resource_deps = (HTMX,)
+
+    def __init__(self, provider: BloqsProvider, frequency: str = "10s", max_versions: int = 16, **kwargs) -> None:
+        """Block reloading a table provided every frequency, replacing only the rows and cells which changed.
+
+        Body rows and cells of the table get ids by position, see HTMLJinjaTableBlock.cell_ids. The markup sent is
+        kept by version, which the page sends along with each poll. If the table has the same shape and markup
+        outside its body rows as the version shown, only changed rows and cells are sent as out-of-band swaps, which
+        replace the elements with the same ids. Otherwise, e.g. for the first poll or if the version was evicted, the
+        whole block is sent like by Poll. Blocks provided other than tables are always sent whole.
+
+        Parameters
+        ----------
+        provider: 'BloqsProvider'
+            Provider of the table. It is called by the endpoint shared by all blocks answering requests, see
+            BlockRegistry.
+        frequency: 'str'
+            Interval of polls, e.g. "10s".
+        max_versions: 'int'
+            Number of versions kept, i.e. pages polling at the same time without reloading the whole block.
+        """
+        super().__init__(**kwargs)
+        self.provider = provider
+        self.frequency = frequency
+        self.max_versions = max_versions
+        self.url = block_registry.add(self)
+        self._cell_ids = f"cells{self._id}"
+        self._versions: OrderedDict[str, _SentTable] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def _version_id(self) -> str:
+        return f"poll{self._id}-version"
+
+    def _write_contents(self, container: Tag, actual_cfg, id_gen, resource_deps=None, static_output=None) -> None:
+        container["hx-get"] = self.url
+        container["hx-trigger"] = f"load, every {self.frequency}"
+        container["hx-swap"] = "innerHTML"
+        container["hx-include"] = f"#{self._version_id}"
+
+    def serve_request(self) -> Response:
+        """Answer a poll with the changed rows and cells of the version shown, or the whole block."""
+        block = self.provider()
+        if isinstance(block, HTMLJinjaTableBlock):
+            block = self._with_cell_ids(block)
+        resource_deps = DependencyTracker()
+        container = root("div")
+        block._write_block(container, Cfg(), id_generator(), resource_deps)
+        # Not indented, so that the markup of the body rows is found as rendered
+        block_html = "".join(render(child, pretty=False) for child in container.children)
+        rendered_cells = block.rendered_cells if isinstance(block, HTMLJinjaTableBlock) else None
+        if rendered_cells is None:
+            return self._full_response(block_html, resource_deps)
+        table = _SentTable(
+            block_html.replace(rendered_cells.rows_html, ""),
+            rendered_cells.row_tags,
+            rendered_cells.cell_html,
+            rendered_cells.row_end,
+        )
+
+        with self._lock:
+            shown = self._versions.get(request.args.get("version", ""))
+            if shown is None or shown.skeleton != table.skeleton or shown.cell_html.shape != table.cell_html.shape:
+                return self._full_response(block_html, resource_deps, self._add_version(table))
+            changed_rows = shown.row_tags != table.row_tags
+            changed_cells = (shown.cell_html != table.cell_html) & ~changed_rows[:, None]
+            if not changed_rows.any() and not changed_cells.any():
+                return Response(status=204)
+            # Unchanged cells refer to the markup already kept, so that versions share it
+            version = self._add_version(
+                table._replace(
+                    cell_html=np.where(changed_cells | changed_rows[:, None], table.cell_html, shown.cell_html)
+                )
+            )
+        response = Response(
+            _render_swaps(table, changed_rows, changed_cells) + self._render_version(version, oob=True),
+            mimetype="text/html",
+        )
+        # The rows and cells swapped out of band replace elements of the table shown
+        response.headers["HX-Reswap"] = "none"
+        return response
+
+    def _with_cell_ids(self, table: HTMLJinjaTableBlock) -> HTMLJinjaTableBlock:
+        """Copy of the table with ids of rows and cells."""
+        table = copy.copy(table)
+        table.cell_ids = self._cell_ids
+        table.max_rows = table.max_cols = 0
+        return table
+
+    def _add_version(self, table: _SentTable) -> str:
+        version = uuid.uuid4().hex
+        self._versions[version] = table
+        while len(self._versions) > self.max_versions:
+            self._versions.popitem(last=False)
+        return version
+
+    def _full_response(
+        self, block_html: str, resource_deps: DependencyTracker, version: Optional[str] = None
+    ) -> Response:
+        already_sent_resources = request.headers.get("Blox-Resources", "").split(",")
+        html = _render_new_resources(resource_deps, already_sent_resources)
+        if version is not None:
+            html += self._render_version(version)
+        response = Response(html + block_html, mimetype="text/html")
+        response.headers["HX-Reswap"] = "innerHTML"
+        return response
+
+    def _render_version(self, version: str, oob: bool = False) -> str:
+        version_input = append_to(root("div"), "input", type="hidden", name="version", value=version)
+        version_input["id"] = self._version_id
+        if oob:
+            version_input["hx-swap-oob"] = "true"
+        return render(version_input)
+
+
+def _render_swaps(table: _SentTable, changed_rows: np.ndarray, changed_cells: np.ndarray) -> str:
+    """Changed rows and cells of a table, swapped out of band by their ids.
+
+    Rows and cells are wrapped in templates, as they are only parsed within a table or template.
+    """
+    templates: List[str] = []
+    rows = np.flatnonzero(changed_rows)
+    if len(rows):
+        templates.append(
+            "".join(
+                _oob(table.row_tags[row], "<tr ") + "".join(table.cell_html[row].tolist()) + table.row_end
+                for row in rows.tolist()
+            )
+        )
+    if changed_cells.any():
+        templates.append("".join(_oob(cell, "<td ") for cell in table.cell_html[changed_cells].tolist()))
+    return "".join(f"<template>\n{markup}</template>\n" for markup in templates)
+
+
+def _oob(markup: str, start_tag: str) -> str:
+    return markup.replace(start_tag, start_tag + 'hx-swap-oob="true" ', 1)
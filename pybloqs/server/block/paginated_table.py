@@ -0,0 +1,159 @@
+import copy
+from typing import Any, Callable, Dict, List, Optional
+from uuid import uuid4
+
+import pandas as pd
+from bs4.element import Tag
+
+import pybloqs
+from pybloqs.block.table import HTMLJinjaTableBlock, IndexCell
+from pybloqs.block.table_formatters import TableFormatter
+from pybloqs.html import append_to
+from pybloqs.server import BloqsProvider
+from pybloqs.server.registry import block_registry
+from pybloqs.server.static import HTMX
+
+
+class PaginatedTable(HTMLJinjaTableBlock):
+    resource_deps = (HTMX,)
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        formatters: Optional[List[TableFormatter]] = None,
+        use_default_formatters: bool = True,
+        page_size: int = 100,
+        infinite_scroll: bool = True,
+        **kwargs,
+    ) -> None:
+        """Table showing its first page of rows, which pulls further pages from an endpoint of the server.
+
+        Pages are rendered with the formatters bound to the whole table, so e.g. heatmap ranges and totals are the
+        same on every page as if the table was rendered at once. Pages are served by the endpoint shared by all
+        tables, see BlockRegistry, so the table may also be created while the server handles requests, e.g. by a
+        provider.
+
+        Parameters
+        ----------
+        df: 'DataFrame'
+            The DF from which the values are taken.
+        formatters: 'list'
+            List of formatters, which are objects inheriting from TableFormatter class.
+        page_size: 'int'
+            Number of rows per page.
+        infinite_scroll: 'bool'
+            If True, the rows of the next page are appended once the end of the table is scrolled into view.
+            Otherwise, previous and next buttons below the table replace it with the adjacent page.
+        kwargs:
+            Passed through to HTMLJinjaTableBlock, e.g. css_classes or max_cols.
+        """
+        if page_size < 1:
+            raise ValueError(f"page_size must be positive, got {page_size}")
+        # Rows are never truncated, but split into pages
+        super().__init__(df, formatters, use_default_formatters, max_rows=0, **kwargs)
+        self.page_size = page_size
+        self.infinite_scroll = infinite_scroll
+        # Page shown by the table, None for its partitions, see _partition()
+        self.page: Optional[int] = 0
+        self.provider = BloqsProvider(self._get_page)
+        self.provider.url = self.url = block_registry.add(self)
+
+    @property
+    def n_pages(self) -> int:
+        return max(-(-len(self.df) // self.page_size), 1)
+
+    def page_url(self, page: int) -> str:
+        return f"{self.url}?page={page}"
+
+    def serve_request(self) -> str:
+        """Answer a request of the endpoint with the requested page, see BlockRegistry."""
+        return self.provider.get_fragment()
+
+    def _get_page(self, page: str = "0") -> pybloqs.BaseBlock:
+        """Block sent by the endpoint for the requested page, i.e. its rows or the whole table showing it.
+
+        Pages out of range are clamped to the first or last page, the first page is sent if page is not a number.
+        """
+        try:
+            page_number = int(page)
+        except (TypeError, ValueError):
+            page_number = 0
+        table = copy.copy(self)
+        table.page = min(max(page_number, 0), self.n_pages - 1)
+        if self.infinite_scroll:
+            return _PageRows(table)
+        return table
+
+    def _write_contents(self, container: Tag, actual_cfg, *args, **kwargs) -> None:
+        super()._write_contents(container, actual_cfg, *args, **kwargs)
+        if not self.infinite_scroll:
+            self._write_pager(container)
+
+    def _write_pager(self, container: Tag) -> None:
+        # The buttons replace the whole block, including themselves, by the adjacent page
+        container_uid = f"table{uuid4()}"
+        container["id"] = container_uid
+        pager = append_to(container, "div")
+        pager["style"] = "margin: 0.4em;"
+        for label, page in (("Previous", self.page - 1), ("Next", self.page + 1)):
+            button = append_to(pager, "button")
+            button.string = label
+            if 0 <= page < self.n_pages:
+                button["hx-get"] = self.page_url(page)
+                button["hx-target"] = f"#{container_uid}"
+                button["hx-swap"] = "outerHTML"
+                button["aria-controls"] = container_uid
+            else:
+                button["disabled"] = "disabled"
+        status = append_to(pager, "span")
+        status.string = f"Page {self.page + 1} of {self.n_pages}"
+
+    def _partition(self, df: pd.DataFrame, formatters: List[TableFormatter]) -> HTMLJinjaTableBlock:
+        partition = super()._partition(df, formatters)
+        # Partitions render all their rows, like a table which is not paginated
+        partition.page = None
+        return partition
+
+    def _renders_rows_in_partitions(self) -> bool:
+        return self.page is not None
+
+    def _get_template_model(
+        self,
+        index_iterable: List[List[IndexCell]],
+        row_names: pd.Index,
+        additional_html: str,
+        render_tbody_rows: Optional[Callable[[], str]] = None,
+    ) -> Dict[str, Any]:
+        if render_tbody_rows is None and self.page is not None:
+            render_tbody_rows = self._render_page_rows
+        return super()._get_template_model(index_iterable, row_names, additional_html, render_tbody_rows)
+
+    def _render_page_rows(self) -> str:
+        """Render the body rows of the current page, see _render_row_range().
+
+        The formatters are bound for each page, so rows are the same whichever pages were requested before. With
+        infinite scroll, a row loading the next page is appended once it is revealed.
+        """
+        n_rows = len(self.df)
+        start = self.page * self.page_size
+        stop = min(start + self.page_size, n_rows)
+        rows_html = self._render_row_range(start, stop)
+        if self.infinite_scroll and stop < n_rows:
+            rows_html += self._row_markup(
+                f'hx-get="{self.page_url(self.page + 1)}" hx-trigger="revealed" hx-swap="outerHTML"',
+                [("td", f'colspan="{self._get_row_width()}"', "Loading...")],
+            )
+        return rows_html
+
+
+class _PageRows(pybloqs.BaseBlock):
+    """Body rows of a page of a PaginatedTable, which replace the row requesting them."""
+
+    container_tag = None
+
+    def __init__(self, table: PaginatedTable) -> None:
+        super().__init__()
+        self.table = table
+
+    def _write_contents(self, container: Tag, actual_cfg, id_gen, resource_deps=None, static_output=None) -> None:
+        self.table._write_body_rows(container, self.table._render_page_rows, resource_deps)
@@ -3,7 +3,7 @@ import urllib.parse
 from copy import deepcopy
 from functools import partial
 from io import BytesIO
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 
 from bs4.element import Tag
 from flask import request
@@ -69,34 +69,7 @@ class BloqsProvider(pybloqs.BaseBlock):
 
         # Write children into the output
         output = BytesIO()
-
-        head_container = root("div")
-        head_container["hx-swap-oob"] = "beforeend:head"
-        resources_added = []
-        for dependency in resource_deps:
-            if dependency.name not in already_sent_resources:
-                dependency.write(head_container)
-                resources_added.append(dependency.name)
-        if resources_added:
-            sentinel_js = append_to(head_container, "script")
-            sentinel_js["type"] = "text/javascript"
-            sentinel_js.string = f"""
-                headers = JSON.parse(
-                  document
-                    .querySelector('body')
-                    .getAttribute('hx-headers') || "{{}}"
-                );
-                headers['Blox-Resources'] =
-                  (headers['Blox-Resources'] || "")
-                  + ",{','.join(resources_added)}";
-                document
-                  .querySelector('body')
-                  .setAttribute(
-                    'hx-headers',
-                    JSON.stringify(headers)
-                  );
-            """
-        output.write(render(head_container).encode("utf-8"))
+        output.write(_render_new_resources(resource_deps, already_sent_resources).encode("utf-8"))
 
         for child in container.children:
             output.write(render(child).encode("utf-8"))
@@ -133,7 +106,44 @@ class BloqsProvider(pybloqs.BaseBlock):
         else:
             raise ValueError(f"Cannot write block with missing parameters {unbound_parameters} {self.inner}")
 
-    def poll(self, frequency: str = "10s") -> pybloqs.BaseBlock:
-        from pybloqs.server.block import Poll
+    def poll(self, frequency: str = "10s", incremental: bool = False) -> pybloqs.BaseBlock:
+        """Block reloading the block provided every frequency, see Poll.
+
+        If incremental, only the changed rows and cells of a provided table are replaced, see IncrementalPoll.
+        """
+        from pybloqs.server.block import IncrementalPoll, Poll
 
+        if incremental:
+            return IncrementalPoll(self, frequency)
         return Poll(self, frequency)
+
+
+def _render_new_resources(resource_deps: DependencyTracker, already_sent_resources: List[str]) -> str:
+    """Resources not sent to the page yet, swapped into its head, with a script adding them to the sent resources."""
+    head_container = root("div")
+    head_container["hx-swap-oob"] = "beforeend:head"
+    resources_added = []
+    for dependency in resource_deps:
+        if dependency.name not in already_sent_resources:
+            dependency.write(head_container)
+            resources_added.append(dependency.name)
+    if resources_added:
+        sentinel_js = append_to(head_container, "script")
+        sentinel_js["type"] = "text/javascript"
+        sentinel_js.string = f"""
+            headers = JSON.parse(
+              document
+                .querySelector('body')
+                .getAttribute('hx-headers') || "{{}}"
+            );
+            headers['Blox-Resources'] =
+              (headers['Blox-Resources'] || "")
+              + ",{",".join(resources_added)}";
+            document
+              .querySelector('body')
+              .setAttribute(
+                'hx-headers',
+                JSON.stringify(headers)
+              );
+        """
+    return render(head_container)
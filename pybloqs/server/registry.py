@@ -0,0 +1,62 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from flask import Flask, abort
+from flask.typing import ResponseReturnValue
+
+import pybloqs
+
+# Route of the endpoint, which passes requests on to the block registered with the id in the route
+BLOCK_ROUTE = "/pybloqs-block/<block_id>"
+
+
+class BlockRegistry:
+    def __init__(self, max_blocks: int = 1024) -> None:
+        """Blocks answering requests after they were sent, e.g. tables sending further rows, by their id.
+
+        Blocks are kept until more than max_blocks were registered since, as they may be requested any time after
+        they were sent, e.g. tables created by providers. Requests to the blocks dropped are answered with 404.
+        Requesting a block keeps it like registering it again.
+
+        Parameters
+        ----------
+        max_blocks: 'int'
+            Number of blocks kept at most.
+        """
+        if max_blocks < 1:
+            raise ValueError(f"max_blocks must be positive, got {max_blocks}")
+        self.max_blocks = max_blocks
+        self._blocks: OrderedDict[str, pybloqs.BaseBlock] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, block: pybloqs.BaseBlock) -> str:
+        """Register a block answering requests by its serve_request() method, and return its URL."""
+        with self._lock:
+            self._blocks[block._id] = block
+            self._blocks.move_to_end(block._id)
+            while len(self._blocks) > self.max_blocks:
+                self._blocks.popitem(last=False)
+        return BLOCK_ROUTE.replace("<block_id>", block._id)
+
+    def get(self, block_id: str) -> Optional[pybloqs.BaseBlock]:
+        with self._lock:
+            block = self._blocks.get(block_id)
+            if block is not None:
+                self._blocks.move_to_end(block_id)
+        return block
+
+
+block_registry = BlockRegistry()
+
+
+def add_block_endpoint(app: Flask) -> None:
+    """Register the endpoint of the blocks in block_registry with an app, which is done once when the app is created."""
+    app.add_url_rule(BLOCK_ROUTE, endpoint="pybloqs_block", view_func=_serve_block)
+
+
+def _serve_block(block_id: str) -> ResponseReturnValue:
+    block = block_registry.get(block_id)
+    if block is None:
+        abort(404)
+    return block.serve_request()
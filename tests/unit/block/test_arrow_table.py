@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pybloqs.block.table_formatters as tf
+import pytest
+from pybloqs import Block
+from pybloqs.block.arrow_table import ArrowTableBlock
+from pybloqs.block.table import HTMLJinjaTableBlock
+
+pa = pytest.importorskip("pyarrow")
+
+
+def _tbody(html):
+    return html[html.find("<tbody") :]
+
+
+@pytest.fixture
+def table():
+    return pa.table(
+        {
+            "a": [1.5, None, 3.0],
+            "b": ["x", None, "z"],
+            "c": [1, 2, 3],
+            "d": pd.to_datetime(["2020-01-01", None, "2020-01-03"]),
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "formatters",
+    [
+        lambda: None,
+        lambda: [tf.FmtHeatmap(), tf.FmtDecimals(1), tf.FmtStripeBackground()],
+    ],
+)
+def test_ArrowTableBlock_matches_pandas(table, formatters):
+    expected = HTMLJinjaTableBlock(table.to_pandas(), formatters(), use_default_formatters=False).render_html()
+    block = ArrowTableBlock(table, formatters(), use_default_formatters=False)
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in block.df.dtypes)
+    assert _tbody(block.render_html()) == _tbody(expected)
+
+
+@pytest.mark.parametrize(
+    "formatters",
+    [
+        lambda: [tf.FmtAppendTotalsRow(), tf.FmtHeatmap()],
+        lambda: [tf.FmtReplaceNaN("-")],
+    ],
+)
+def test_ArrowTableBlock_modify_dataframe(table, formatters):
+    table = table.select(["a", "c"])
+    expected = HTMLJinjaTableBlock(table.to_pandas(), formatters(), use_default_formatters=False).render_html()
+    block = ArrowTableBlock(table, formatters(), use_default_formatters=False)
+    assert not any(isinstance(dtype, pd.ArrowDtype) for dtype in block.df.dtypes)
+    assert _tbody(block.render_html()) == _tbody(expected)
+
+
+def test_ArrowTableBlock_block_types(table):
+    assert isinstance(Block(table), ArrowTableBlock)
+    assert isinstance(Block(table.to_batches()[0]), ArrowTableBlock)
+
+
+def test_ArrowTableBlock_polars(table):
+    pl = pytest.importorskip("polars")
+    frame = pl.from_arrow(table)
+    assert isinstance(Block(frame), ArrowTableBlock)
+    expected = ArrowTableBlock(table, use_default_formatters=False).render_html()
+    assert _tbody(ArrowTableBlock(frame, use_default_formatters=False).render_html()) == _tbody(expected)
+
+
+def test_ArrowTableBlock_large_truncated():
+    table = pa.table({"a": np.arange(100_000.0)})
+    html = ArrowTableBlock(table, max_rows=4).render_html()
+    assert "99,999" in html or "99999" in html
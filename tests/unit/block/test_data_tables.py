@@ -0,0 +1,70 @@
+import json
+import re
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pybloqs.block.table_formatters as tf
+import pytest
+from pybloqs.block.data_tables import DataTablesHTMLJinjaTableBlock
+from pybloqs.html import parse
+from pybloqs.static import JScript
+
+
+def _rows_from_html(html):
+    """Style of each body row, and styles and contents of its cells."""
+    tbody = parse(html).find("tbody")
+    rows = []
+    for tr in tbody.find_all("tr"):
+        cells = tr.find_all("td")
+        rows.append(
+            (
+                tr.get("style", ""),
+                [td.get("style", "") for td in cells],
+                ["".join(str(content) for content in td.contents).strip() for td in cells],
+            )
+        )
+    return rows
+
+
+def _rows_from_json(html):
+    with_data = re.search(r"var rows = (\{.*?\});\n", html, re.DOTALL)
+    data = json.loads(with_data.group(1).replace("<\\/", "</"))
+    styles = data["styles"]
+    return [
+        (styles[row_style], [styles[style] for style in cell_styles], contents)
+        for row_style, cell_styles, contents in zip(data["rowStyles"], data["cellStyles"], data["data"])
+    ]
+
+
+@pytest.mark.parametrize(
+    "formatters",
+    [
+        lambda: None,
+        lambda: [tf.FmtHeatmap(), tf.FmtStripeBackground(), tf.FmtDecimals(1)],
+        # Not vectorised, styles are collected cell by cell
+        lambda: [tf.FmtAppendTotalsRow(), tf.FmtHeatmap()],
+    ],
+)
+def test_DataTablesHTMLJinjaTableBlock_json_data(formatters):
+    df = pd.DataFrame(np.arange(24.0).reshape(8, 3), columns=["a", "b", "c"])
+    expected = _rows_from_html(DataTablesHTMLJinjaTableBlock(df, formatters()).render_html())
+
+    with patch.object(JScript, "global_encode", False):
+        html = DataTablesHTMLJinjaTableBlock(df, formatters(), json_data=True).render_html()
+    assert "deferRender" in html
+    assert re.search(r"<tbody>\s*</tbody>", html)
+    assert _rows_from_json(html) == expected
+
+
+def test_DataTablesHTMLJinjaTableBlock_json_data_compressed():
+    df = pd.DataFrame({"a": range(1000)})
+    html = DataTablesHTMLJinjaTableBlock(df, json_data=True).render_html()
+    assert "dt-json-data" in html
+    assert "RawDeflate.inflate" in html
+    assert len(html) < len(DataTablesHTMLJinjaTableBlock(df).render_html()) / 2
+
+
+def test_DataTablesHTMLJinjaTableBlock_json_data_css_classes():
+    with pytest.raises(ValueError):
+        DataTablesHTMLJinjaTableBlock(pd.DataFrame({"a": [1]}), json_data=True, css_classes=True)
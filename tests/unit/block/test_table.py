@@ -2,9 +2,12 @@ from unittest.mock import MagicMock, patch
 
 import numpy as np
 import pandas as pd
+import pytest
 
 import pybloqs.block.table as abt
 import pybloqs.block.table_formatters as abtf
+from pybloqs.html import VerbatimHTML, parse, render, root
+from pybloqs.static import Css, DependencyTracker
 
 df = pd.DataFrame(
     np.arange(9, dtype=float).reshape(3, 3),
@@ -113,6 +116,55 @@ def test_HTMLJinjaTableBlock_modify_cell_content_not_implemented(mock_formatter)
     assert res == 42.0
 
 
+def test_HTMLJinjaTableBlock_modify_cell_content_not_called():
+    formatter = abtf.TableFormatter()
+    table = abt.HTMLJinjaTableBlock(
+        df,
+        formatters=[formatter],
+        use_default_formatters=False,
+    )
+    # Formatters not implementing the hook are never called
+    assert table._hook_functions["modify_cell_content"] == []
+    res = table.modify_cell_content(42.0, None, None)
+    assert res == 42.0
+
+
+def test_HTMLJinjaTableBlock_modify_column_content():
+    table = abt.HTMLJinjaTableBlock(
+        df,
+        formatters=[abtf.FmtMultiplyCellValue(10, ""), abtf.FmtDecimals(1)],
+        use_default_formatters=False,
+    )
+    series = pd.Series([1.0, "x"], index=["a", "b"], dtype=object)
+    res = table.modify_column_content(series, "aa")
+    assert res.tolist() == ["10.0", "x"]
+
+
+def test_HTMLJinjaTableBlock_modify_column_content_falls_back_to_cells():
+    formatter = abtf.TableFormatter(rows=["b"])
+    formatter._modify_cell_content = MagicMock(side_effect=lambda data: f"{data.row_name}:{data.cell}")
+    table = abt.HTMLJinjaTableBlock(
+        df,
+        formatters=[formatter, abtf.TableFormatter()],
+        use_default_formatters=False,
+    )
+    series = pd.Series([1.0, 2.0], index=["a", "b"], dtype=object)
+    res = table.modify_column_content(series, "aa")
+    assert res.tolist() == [1.0, "b:2.0"]
+    assert formatter._modify_cell_content.call_count == 1
+
+
+def test_HTMLJinjaTableBlock_modify_column_content_not_implemented():
+    formatter = abtf.FmtDecimals(1)
+    formatter.modify_column_content = MagicMock(side_effect=NotImplementedError)
+    formatter.modify_cell_content = MagicMock(side_effect=NotImplementedError)
+    table = abt.HTMLJinjaTableBlock(df, formatters=[formatter], use_default_formatters=False)
+    series = pd.Series([1.0, 2.0], index=["a", "b"], dtype=object)
+    res = table.modify_column_content(series, "aa")
+    assert res.tolist() == [1.0, 2.0]
+    assert formatter.modify_column_content.call_count == 1
+
+
 def test__aggregate_css_formatters_no_args():
     dummy_css = "dummy_css"
     formatter = abtf.TableFormatter()
@@ -154,6 +206,32 @@ def test__aggregate_css_formatters_not_implemented():
     assert res == 'style=""'
 
 
+def test__aggregate_css_formatters_not_called():
+    formatter1 = abtf.TableFormatter()
+    formatter2 = abtf.TableFormatter()
+    formatter2.dummy_function = MagicMock(return_value="dummy_css")
+    table = abt.HTMLJinjaTableBlock(
+        df,
+        formatters=[formatter1, formatter2],
+        use_default_formatters=False,
+    )
+    res = table._aggregate_css_formatters("dummy_function")
+    assert res == 'style="dummy_css"'
+    res = table._aggregate_css_formatters("create_table_level_css")
+    assert res == 'style=""'
+
+
+def test__compile_formatters():
+    formatters = [abtf.FmtDecimals(2), abtf.FmtHeatmap(), abtf.FmtPageBreak(), abtf.FmtHideCells(rows=["a"])]
+    table = abt.HTMLJinjaTableBlock(df, formatters=formatters, use_default_formatters=False)
+    assert table._hook_formatters["modify_dataframe"] == []
+    assert table._hook_formatters["modify_cell_content"] == [formatters[0], formatters[3]]
+    assert table._hook_formatters["create_cell_level_css"] == [formatters[1], formatters[3]]
+    assert table._hook_formatters["create_row_level_css"] == [formatters[2]]
+    assert table._hook_formatters["create_thead_level_css"] == [formatters[2]]
+    assert table._column_content_formatters == [(formatters[0], True), (formatters[3], False)]
+
+
 def test__aggregate_css_formatters_concatenation():
     css1 = "aaaaa"
     formatter1 = abtf.TableFormatter()
@@ -231,6 +309,709 @@ def test__jinja_header_row_name():
     assert names[2] == "second"
 
 
+def test__jinja_binds_formatters_while_rendering():
+    df = pd.DataFrame([[1, 2], [3, 4]], columns=["a", "b"], index=["x", "y"])
+
+    formatter = abtf.FmtBold(rows=["y"], columns=["b"], apply_to_header_and_index=False)
+    selected = []
+    table = abt.HTMLJinjaTableBlock(df, formatters=[formatter], use_default_formatters=False)
+    # The table is rendered by a bound copy of the formatter, which may be shared with other tables
+    formatter._create_cell_level_css = MagicMock(
+        side_effect=lambda data: selected.append(
+            (data.row_name, data.column_name, table.formatters[0] is not formatter, table.formatters[0]._bound_rows[0])
+        )
+    )
+
+    table._write_contents(MagicMock(), MagicMock())
+
+    assert selected == [("y", "b", True, ["y"])]
+    assert table.formatters == [formatter]
+    assert formatter._bound_rows is None and formatter._bound_columns is None
+
+
+def test__jinja_shared_formatters_render_tables_at_the_same_time():
+    formatters = [abtf.FmtHeatmap(), abtf.FmtStripeBackground(), abtf.FmtDecimals(1)]
+    other = abt.HTMLJinjaTableBlock(pd.DataFrame({"a": [10.0, -5.0]}, index=["p", "q"]), formatters)
+
+    class FmtRenderOther(abtf.TableFormatter):
+        def _create_row_level_css(self, data):
+            if data.name == "y":
+                # Like another thread rendering a table with the same formatters meanwhile
+                other.render_html()
+
+    df = pd.DataFrame({"a": [1.0, 2.0, 3.0]}, index=["x", "y", "z"])
+    expected = abt.HTMLJinjaTableBlock(df, formatters + [abtf.TableFormatter()], use_default_formatters=False)
+    table = abt.HTMLJinjaTableBlock(df, formatters + [FmtRenderOther()], use_default_formatters=False)
+    expected._vectorised_tbody = False
+
+    assert not table._vectorised_tbody
+    assert str(parse(table.render_html()).table) == str(parse(expected.render_html()).table)
+
+
+@pytest.mark.parametrize("vectorised_tbody", [True, False])
+def test__jinja_shared_stripes_start_in_every_table(vectorised_tbody):
+    stripes = abtf.FmtStripeBackground(first_color="#111111", second_color="#222222")
+
+    def row_colors(df):
+        table = abt.HTMLJinjaTableBlock(df, formatters=[stripes], use_default_formatters=False)
+        table._vectorised_tbody = vectorised_tbody
+        return [row.find_all("td")[-1]["style"] for row in parse(table.render_html()).tbody.find_all("tr")]
+
+    # An odd number of rows, so that a table continuing from the previous one would start with the second color
+    first = row_colors(pd.DataFrame({"a": [1.0, 2.0, 3.0]}))
+    second = row_colors(pd.DataFrame({"a": [4.0, 5.0]}))
+
+    assert first[0] == second[0] and "#111111" in second[0]
+    assert "#222222" in second[1]
+    assert stripes.current_color == stripes.second_color
+
+
+def test__jinja_shares_statistics_between_formatters():
+    df = pd.DataFrame([[1, 2], [3, 4]], columns=["a", "b"], index=["x", "y"])
+    formatters = [abtf.FmtHeatmap(), abtf.FmtHeatmap(axis=0)]
+    table = abt.HTMLJinjaTableBlock(df, formatters=formatters, use_default_formatters=False)
+
+    with patch.object(abtf.FmtHeatmap, "bind", autospec=True, side_effect=abtf.FmtHeatmap.bind) as bind:
+        table._write_contents(MagicMock(), MagicMock())
+
+    assert table.statistics.df is table.df
+    assert len(bind.call_args_list) == len(formatters)
+    for (formatter, _, _, statistics), _ in bind.call_args_list:
+        assert formatter not in formatters
+        assert statistics is table.statistics
+
+
+def test__get_body_rows():
+    df = pd.DataFrame({"a": [1.0, 2.0], "b": [pd.Timestamp("2020-01-01"), pd.NaT]}, index=["x", "y"])
+    table = abt.HTMLJinjaTableBlock(df, formatters=[abtf.FmtBold()], use_default_formatters=False)
+    (label, row, cells), _ = list(table._get_body_rows())
+    assert label == "x"
+    assert isinstance(row, np.ndarray) and row.tolist() == [1.0, pd.Timestamp("2020-01-01")]
+    assert cells == [1.0, pd.Timestamp("2020-01-01")]
+
+    table = abt.HTMLJinjaTableBlock(df, formatters=[abtf.FmtStripeBackground()], use_default_formatters=False)
+    (label, row, cells), _ = list(table._get_body_rows())
+    pd.testing.assert_series_equal(row, next(df.iterrows())[1])
+
+
+def test__org_row_names_looked_up_by_row_index():
+    index = pd.MultiIndex.from_tuples([("x", 1), ("x", 2)])
+    df = pd.DataFrame({"a": [1.0, 2.0]}, index=index)
+    formatter = abtf.FmtBold()
+    formatter._create_cell_level_css = MagicMock(return_value=None)
+    table = abt.HTMLJinjaTableBlock(
+        df, formatters=[abtf.FmtExpandMultiIndex(), formatter], use_default_formatters=False
+    )
+    assert table._org_row_names.tolist() == [("x",), ("x", 1), ("x", 2)]
+    table.row_index = 1
+    table.create_cell_level_css(1.0, "ignored", "a")
+    (data,), _ = formatter._create_cell_level_css.call_args
+    assert data.row_name == ("x", 1)
+
+
+def test__write_contents_appends_rendered_table_verbatim():
+    df = pd.DataFrame([[1, 2]], columns=["a", "b"], index=["x"])
+    table = abt.HTMLJinjaTableBlock(df, use_default_formatters=False)
+    container = MagicMock()
+
+    table._write_contents(container, MagicMock())
+
+    (element,), _ = container.append.call_args
+    assert isinstance(element, VerbatimHTML)
+    assert element.startswith("<table") and element.endswith("</table>")
+    assert parse(element).find("td", string=lambda s: s.strip() == "x") is not None
+
+
+def test__write_contents_drops_additional_html():
+    df = pd.DataFrame([[1, 2]], columns=["a", "b"], index=["x"])
+    formatter = abtf.TableFormatter()
+    formatter._insert_additional_html = MagicMock(return_value="<script>var a;</script>")
+    table = abt.HTMLJinjaTableBlock(df, formatters=[formatter], use_default_formatters=False)
+    container = MagicMock()
+
+    table._write_contents(container, MagicMock())
+
+    (element,), _ = container.append.call_args
+    assert element.name == "table"
+    assert "script" not in str(element)
+
+
+def _vectorisable_formatters():
+    return [
+        abtf.FmtFontsize(14),
+        abtf.FmtStripeBackground(),
+        abtf.FmtAlignCellContents("right", apply_to_header_and_index=False),
+        abtf.FmtBold(rows=[], columns=[]),
+        abtf.FmtHighlightBackground(rows=["y"], columns=["b"]),
+        abtf.FmtPageBreak(),
+        abtf.FmtDecimals(2),
+    ]
+
+
+def test__render_tbody_rows_matches_template():
+    index = pd.MultiIndex.from_tuples([("x", 1), ("x", 2), ("y", 1)])
+    df = pd.DataFrame([[1.0, "a"], [np.nan, "b"], [3.5, None]], columns=["a", "b"], index=index)
+    vectorised = abt.HTMLJinjaTableBlock(df, formatters=_vectorisable_formatters(), use_default_formatters=False)
+    templated = abt.HTMLJinjaTableBlock(df, formatters=_vectorisable_formatters(), use_default_formatters=False)
+    templated._vectorised_tbody = False
+    assert vectorised._vectorised_tbody
+
+    for _ in range(2):
+        # Rendering twice checks that alternating row colors start in the same way again
+        vectorised_container, templated_container = MagicMock(), MagicMock()
+        vectorised._write_contents(vectorised_container, MagicMock())
+        templated._write_contents(templated_container, MagicMock())
+        assert vectorised_container.append.call_args == templated_container.append.call_args
+
+
+def test__write_contents_css_classes():
+    df = pd.DataFrame([[1.0, 2.0], [3.0, 4.0]], columns=["a", "b"], index=["x", "y"])
+    inline = abt.HTMLJinjaTableBlock(df, formatters=_vectorisable_formatters(), use_default_formatters=False)
+    classes = abt.HTMLJinjaTableBlock(
+        df, formatters=_vectorisable_formatters(), use_default_formatters=False, css_classes=True
+    )
+    templated = abt.HTMLJinjaTableBlock(
+        df, formatters=_vectorisable_formatters(), use_default_formatters=False, css_classes=True
+    )
+    templated._vectorised_tbody = False
+
+    containers = [MagicMock(), MagicMock(), MagicMock()]
+    resource_deps = [DependencyTracker(), DependencyTracker(), DependencyTracker()]
+    for table, container, deps in zip([inline, classes, templated], containers, resource_deps):
+        table._write_contents(container, MagicMock(), MagicMock(), resource_deps=deps)
+    inline_html, classes_html, templated_html = [container.append.call_args[0][0] for container in containers]
+
+    assert list(resource_deps[0]) == []
+    (style_sheet,) = list(resource_deps[1])
+    assert isinstance(style_sheet, Css)
+    assert list(resource_deps[2]) == [style_sheet]
+    assert classes_html == templated_html
+    # Every inline style of rows and cells is replaced by a class with the same declarations
+    inline_soup, classes_soup = parse(inline_html), parse(classes_html)
+    rules = dict(rule.rstrip("}").split("{") for rule in style_sheet.content_string.splitlines())
+    for inline_tag, classes_tag in zip(
+        inline_soup.find_all(["tr", "th", "td"]), classes_soup.find_all(["tr", "th", "td"])
+    ):
+        assert "style" not in classes_tag.attrs
+        style = inline_tag["style"]
+        if style:
+            (class_name,) = classes_tag["class"]
+            assert rules[f"#{classes._get_table_id()} .{class_name}"] == style
+        else:
+            assert "class" not in classes_tag.attrs
+
+
+def test__write_contents_css_classes_without_resource_deps():
+    df = pd.DataFrame([[1.0]], columns=["a"], index=["x"])
+    table = abt.HTMLJinjaTableBlock(df, css_classes=True)
+    container = root("div")
+
+    table._write_contents(container, MagicMock())
+
+    html = str(container)
+    # Classes are defined in a <style> element preceding the table
+    assert html.startswith(f'<div><style type="text/css">#{table._get_table_id()} .pbs-')
+    assert '<td class="pbs-' in html
+
+
+def test__write_contents_structural_css():
+    df = pd.DataFrame([[1.0, 2.0], [3.0, 4.0]], columns=["a", "b"], index=pd.Index(["x", "y"], name="i"))
+    table = abt.HTMLJinjaTableBlock(df, structural_css=True)
+    container = MagicMock()
+    resource_deps = DependencyTracker()
+
+    table._write_contents(container, MagicMock(), MagicMock(), resource_deps=resource_deps)
+
+    html = container.append.call_args[0][0]
+    (style_sheet,) = list(resource_deps)
+    rules = style_sheet.content_string
+    table_id = table._get_table_id()
+    assert parse(html).find("table")["id"] == table_id
+    # All cell styles of the default formatters are rules of the table
+    assert {cell["style"] for cell in parse(html).find_all(["th", "td"])} == {""}
+    assert f"#{table_id} > tbody > tr:nth-child(odd) > td:nth-child(n) {{background-color:" in rules
+    assert f"#{table_id} > tbody > tr:nth-child(n) > td:nth-child(n+2) {{text-align:right}}" in rules
+    assert f"#{table_id} > tbody > tr:nth-child(n) > td:nth-child(-n+1) {{font-weight:bold}}" in rules
+    # Cells are styled inline again once rendered
+    assert table._n_structural_formatters == 0
+    assert len(table._hook_formatters["create_cell_level_css"]) == 6
+
+
+def test__bind_structural_css_keeps_order_of_formatters():
+    df = pd.DataFrame([[1.0, 2.0], [3.0, 4.0]], columns=["a", "b"])
+    formatters = [abtf.FmtFontsize(10), abtf.FmtHeatmap(), abtf.FmtBold()]
+    table = abt.HTMLJinjaTableBlock(df, formatters, use_default_formatters=False, structural_css=True)
+    index_iterable, _ = table._bind_formatters()
+    try:
+        rules = table._bind_structural_css(index_iterable).content_string
+        # Bold must apply after the heatmap, which styles cells inline, so it is inline as well
+        assert "font-size:10px" in rules and "bold" not in rules
+        assert table._hook_formatters["create_cell_level_css"] == table.formatters[1:]
+    finally:
+        table._unbind_formatters()
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [{"max_rows": 1}, {"max_workers": 2}, {"structural_css": False}],
+)
+def test__bind_structural_css_not_applied(kwargs):
+    df = pd.DataFrame([[1.0, 2.0], [3.0, 4.0]], columns=["a", "b"])
+    table = abt.HTMLJinjaTableBlock(df, **{"structural_css": True, **kwargs})
+    index_iterable, _ = table._bind_formatters()
+    try:
+        assert table._bind_structural_css(index_iterable) is None
+    finally:
+        table._unbind_formatters()
+
+
+def test__bind_structural_css_merged_index():
+    index = pd.MultiIndex.from_tuples([("x", 1), ("x", 2)])
+    df = pd.DataFrame([[1.0, 2.0], [3.0, 4.0]], columns=["a", "b"], index=index)
+    formatters = [abtf.FmtFontsize(10), abtf.FmtAlignCellContents("right", apply_to_header_and_index=False)]
+    table = abt.HTMLJinjaTableBlock(df, formatters, use_default_formatters=False, structural_css=True)
+    index_iterable, _ = table._bind_formatters()
+    try:
+        rules = table._bind_structural_css(index_iterable).content_string
+        # Body cells are not at fixed positions, as the merged index cell only starts the first row
+        assert "font-size:10px" in rules and "text-align" not in rules
+    finally:
+        table._unbind_formatters()
+
+
+def test_HTMLJinjaTableBlock_render_cache():
+    df = pd.DataFrame([[1.0, 2.0], [3.0, 4.0]], columns=["a", "b"])
+    cache = abt.TableRenderCache()
+    expected = abt.HTMLJinjaTableBlock(df, [abtf.FmtHeatmap()], css_classes=True).render_html()
+    assert (
+        abt.HTMLJinjaTableBlock(df, [abtf.FmtHeatmap()], css_classes=True, render_cache=cache).render_html() == expected
+    )
+
+    # Tables of equal data and formatters are taken from the cache without rendering
+    table = abt.HTMLJinjaTableBlock(df.copy(), [abtf.FmtHeatmap()], css_classes=True, render_cache=cache)
+    with patch.object(table, "_render_table", side_effect=AssertionError):
+        assert table.render_html() == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Changed values or formatter parameters are rendered
+    abt.HTMLJinjaTableBlock(df + 1, [abtf.FmtHeatmap()], css_classes=True, render_cache=cache).render_html()
+    abt.HTMLJinjaTableBlock(df, [abtf.FmtHeatmap(axis=0)], css_classes=True, render_cache=cache).render_html()
+    assert (cache.hits, cache.misses, len(cache)) == (1, 3, 3)
+
+
+def test_HTMLJinjaTableBlock_render_cache_not_fingerprinted():
+    df = pd.DataFrame({"a": [1.0]})
+    cache = abt.TableRenderCache()
+    formatter = abtf.FmtDecimals(1)
+    formatter.unfingerprinted = iter([])
+    assert abt.HTMLJinjaTableBlock(df, [formatter], render_cache=cache)._get_render_cache_key() is None
+    assert abt.HTMLJinjaTableBlock(df, render_cache=True).render_cache is abt.default_render_cache
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"css_classes": True},
+        {"compact": True},
+        {"cell_ids": "cells"},
+        {"max_rows": 1},
+        # Not vectorised, rows are rendered by the template
+        {"formatters": [abtf.FmtHideCells(rows=["j"], columns=["b"])]},
+    ],
+)
+def test_HTMLJinjaTableBlock_markup_contents(kwargs):
+    df = pd.DataFrame({"R&D": ["a & b", "x < y"], "b": [1.0, 2.0]}, index=pd.Index(["<i>j</i>", "j"], name="n&m"))
+    html = abt.HTMLJinjaTableBlock(df, **kwargs).render_html()
+    # Contents are markup, text is escaped like by BeautifulSoup
+    for text in ("R&amp;D", "a &amp; b", "n&amp;m", "<i>"):
+        assert text in html
+    if "max_rows" not in kwargs:
+        assert "x &lt; y" in html
+
+
+def test_HTMLJinjaTableBlock_markup_contents_unchanged():
+    df = pd.DataFrame({"a": ['<a href="https://example.com/?x=1&y=2">link</a>', "<b>x</b>"]}, index=["r & s", "t"])
+    html = abt.HTMLJinjaTableBlock(df, use_default_formatters=False).render_html()
+    # Same as when the rendered table was parsed and written by BeautifulSoup
+    expected = """\
+   <table border="0" cellpadding="1" cellspacing="0" class="" id="blox_table_id" style="">
+    <colgroup>
+     <col style=""/>
+     <col style=""/>
+    </colgroup>
+    <thead style="">
+     <tr style="">
+      <th style="">
+      </th>
+      <th colspan="1" rowspan="1" style="">
+       a
+      </th>
+     </tr>
+    </thead>
+    <tbody>
+     <tr style="">
+      <td colspan="1" rowspan="1" style="">
+       r &amp; s
+      </td>
+      <td style="">
+       <a href="https://example.com/?x=1&amp;y=2">
+        link
+       </a>
+      </td>
+     </tr>
+     <tr style="">
+      <td colspan="1" rowspan="1" style="">
+       t
+      </td>
+      <td style="">
+       <b>
+        x
+       </b>
+      </td>
+     </tr>
+    </tbody>
+   </table>
+"""
+    assert expected in html
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test__markup_content_lines(compact):
+    contents = ["<b>x</b>", "a & b", "plain", "", "<b>unclosed", "a &", "&#", "<!--", "<td>cell</td>", "</tr>row", 1.5]
+    # Same as normalising the markup and laying it out separately, each content on its own
+    expected = [abt._content_line(abt._parse_content(str(content)).decode_contents(), compact) for content in contents]
+    assert [abt._markup_content_line(content, compact) for content in contents] == expected
+    assert abt._markup_content_lines(contents, compact) == expected
+    assert abt._content_lines(abt._markup_contents(contents), compact).tolist() == expected
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"css_classes": True}, {"cell_ids": "cells"}, {"max_rows": 2, "max_cols": 1}])
+def test_HTMLJinjaTableBlock_prettified_markup(kwargs):
+    index = pd.MultiIndex.from_tuples([("x", 1), ("x", 2), ("y", 1), ("y", 2)], names=["l", None])
+    df = pd.DataFrame([[1.0, " a "], [np.nan, ""], [3.5, None], [4.0, "d"]], columns=["a", "b"], index=index)
+    for formatters in ([], [abtf.FmtHideCells(rows=[("y", 1)])]):
+        html = abt.HTMLJinjaTableBlock(df, formatters, **kwargs).render_html()
+        # Written verbatim in the same layout and attribute order as by prettify(), so the document is unchanged by it
+        assert render(parse(html)) == html
+
+
+@pytest.mark.parametrize("formatters", [lambda: None, lambda: [abtf.FmtAppendTotalsRow(), abtf.FmtHeatmap()]])
+def test_HTMLJinjaTableBlock_cell_ids(formatters):
+    df = pd.DataFrame(
+        np.arange(6.0).reshape(3, 2),
+        columns=["a", "b"],
+        index=pd.MultiIndex.from_tuples([("x", 1), ("x", 2), ("y", 1)]),
+    )
+    table = abt.HTMLJinjaTableBlock(df, formatters(), cell_ids="cells", max_rows=1)
+    tbody = parse(table.render_html()).find("tbody")
+    rows = tbody.find_all("tr")
+    assert [row["id"] for row in rows] == [f"cells-{i}" for i in range(len(rows))]
+    # Rows are not truncated, index cells are not merged across rows
+    assert len(rows) == len(table.df)
+    cells = rows[1].find_all("td")
+    assert [cell["id"] for cell in cells] == [f"cells-1-{j}" for j in range(len(cells))]
+    assert "x" in cells[0].get_text()
+
+    rendered = table.rendered_cells
+    assert rendered.cell_html.shape == (len(rows), len(cells))
+    assert rendered.row_tags[1].strip() == str(rows[1]).split(">")[0] + ">"
+    assert table._get_render_cache_key() is None
+
+
+def _table_markup(html):
+    return html[html.index("<table") : html.index("</table>") + len("</table>")]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"css_classes": True},
+        {"max_rows": 2, "max_cols": 1},
+        {"cell_ids": "cells"},
+        # Not vectorised, rows are rendered by the template and compacted
+        {"formatters": [abtf.FmtAppendTotalsRow(), abtf.FmtHeatmap()], "use_default_formatters": False},
+    ],
+)
+def test_HTMLJinjaTableBlock_compact(kwargs):
+    # An even number of rows, so that the shared default formatters alternate row colors the same way for both tables
+    index = pd.MultiIndex.from_tuples([("x", 1), ("x", 2), ("y", 1), ("y", 2)])
+    df = pd.DataFrame([[1.0, "a"], [np.nan, "b"], [3.5, None], [4.0, "d"]], columns=["a", "b"], index=index)
+    expected = abt._compact_markup(_table_markup(abt.HTMLJinjaTableBlock(df, **kwargs).render_html()))
+    html = abt.HTMLJinjaTableBlock(df, compact=True, **kwargs).render_html()
+
+    table = _table_markup(html)
+    assert "\n" not in table
+    assert table.replace(f' class="{abt.COMPACT_TABLE_CLASS}"', "") == expected.replace(
+        ' border="0" cellpadding="1" cellspacing="0"', ""
+    )
+    assert 'style=""' not in table and 'rowspan="1"' not in table
+    assert abt._COMPACT_STYLE_SHEET.content_string in html
+
+
+def test_HTMLJinjaTableBlock_compact_streaming():
+    df = pd.DataFrame(np.arange(20, dtype=float).reshape(10, 2), columns=["a", "b"])
+    chunks = (df.iloc[start : start + 3] for start in range(0, 10, 3))
+    streaming = abt.StreamingHTMLJinjaTableBlock(chunks, compact=True)
+    assert streaming.render_html() == abt.HTMLJinjaTableBlock(df, compact=True).render_html()
+
+
+def test__compact_markup():
+    html = '<table class="">\n    <tr style="">\n        <td style="a"\n            rowspan="2" colspan="1">\n            <b>x</b> y\n        </td>\n    </tr>\n</table>'
+    assert abt._compact_markup(html) == '<table><tr><td style="a" rowspan="2"><b>x</b> y</td></tr></table>'
+
+
+def test_TableRenderCache_evicts_least_recently_used():
+    cache = abt.TableRenderCache(max_bytes=10)
+    cache.put("a", abt.RenderedTable("aaaa", False, ()))
+    cache.put("b", abt.RenderedTable("bbbb", False, ()))
+    assert cache.get("a").table_html == "aaaa"
+    cache.put("c", abt.RenderedTable("cccc", False, ()))
+    assert cache.get("b") is None
+    assert len(cache) == 2 and cache.n_bytes == 8
+    # Tables larger than the cache are not kept
+    cache.put("d", abt.RenderedTable("d" * 11, False, ()))
+    assert cache.get("d") is None
+    cache.clear()
+    assert len(cache) == 0 and cache.n_bytes == 0
+
+
+def test__StyleClasses():
+    style_classes = abt._StyleClasses()
+    assert style_classes.attribute("") == ""
+    attribute = style_classes.attribute("color:red; font-weight:bold")
+    assert attribute == 'class="' + style_classes.class_name("color:red; font-weight:bold") + '"'
+    attributes = style_classes.attributes(np.array(["color:red; font-weight:bold", "", "color:blue"], dtype=object))
+    assert attributes[0] == attribute and attributes[1] == ""
+    assert len(style_classes.class_names) == 2
+    style_sheet = style_classes.style_sheet("table")
+    # Rules take precedence by being scoped to the table, declarations are kept as given
+    assert "#table .pbs-" in style_sheet.content_string
+    assert "{color:red; font-weight:bold}" in style_sheet.content_string
+    assert style_sheet == abt._StyleClasses.style_sheet(style_classes, "table")
+    # Values containing semicolons are not split into declarations
+    style_classes.attribute('background:url("data:image/png;base64,AA")')
+    assert '{background:url("data:image/png;base64,AA")}' in style_classes.style_sheet("table").content_string
+
+
+def test_HTMLJinjaTableBlock_max_workers():
+    index = pd.MultiIndex.from_product([["x", "y", "z"], [1, 2, 3]])
+    df = pd.DataFrame(np.arange(18, dtype=float).reshape(9, 2), index=index, columns=["a", "b"])
+    for formatters in (
+        lambda: [*_vectorisable_formatters(), abtf.FmtHeatmap(axis=0), abtf.FmtHeatmapWithCenter()],
+        lambda: [abtf.FmtExpandMultiIndex(), abtf.FmtStripeBackground(), abtf.FmtHideCells(rows=[("y", 2)])],
+    ):
+        for css_classes in (False, True):
+            kwargs = {"use_default_formatters": False, "css_classes": css_classes}
+            table = abt.HTMLJinjaTableBlock(df, formatters=formatters(), **kwargs)
+            parallel = abt.HTMLJinjaTableBlock(df, formatters=formatters(), max_workers=2, **kwargs)
+            # Rendering twice checks that formatter state is advanced past the rows rendered by other processes
+            for _ in range(2):
+                assert parallel.render_html() == table.render_html()
+
+
+def test_HTMLJinjaTableBlock_max_workers_single_range():
+    df = pd.DataFrame(np.arange(6, dtype=float).reshape(3, 2), columns=["a", "b"])
+    formatters = [abtf.FmtHideCells(rows=[1])]
+    kwargs = {"use_default_formatters": False}
+    expected = abt.HTMLJinjaTableBlock(df, formatters=formatters, **kwargs).render_html()
+    # A single range of rows is rendered in this process, also by formatters rendering cell by cell
+    assert abt.HTMLJinjaTableBlock(df, formatters=formatters, max_workers=1, **kwargs).render_html() == expected
+    one_group = df.set_index(pd.MultiIndex.from_product([["x"], [1, 2, 3]]))
+    expected = abt.HTMLJinjaTableBlock(one_group, formatters=formatters, **kwargs).render_html()
+    assert abt.HTMLJinjaTableBlock(one_group, formatters=formatters, max_workers=2, **kwargs).render_html() == expected
+
+
+def test_HTMLJinjaTableBlock_max_workers_mask_function():
+    df = pd.DataFrame(np.arange(-4, 4, dtype=float).reshape(4, 2), columns=["a", "b"])
+    kwargs = {"use_default_formatters": False}
+    expected = abt.HTMLJinjaTableBlock(df, [abtf.FmtConditionalBackground(lambda df: df < 0)], **kwargs).render_html()
+    # Partitions rendered by other processes take the evaluated mask, as the lambda can not be pickled
+    formatters = [abtf.FmtConditionalBackground(lambda df: df < 0)]
+    assert abt.HTMLJinjaTableBlock(df, formatters, max_workers=2, **kwargs).render_html() == expected
+
+
+def test__row_range_bounds():
+    index_iterable = abt.index_to_iterable(pd.MultiIndex.from_product([["x", "y", "z"], [1, 2]]))
+    # Ranges only end where no index cell spans beyond
+    assert abt._row_range_bounds(index_iterable, 2) == [0, 4, 6]
+    assert abt._row_range_bounds(index_iterable, 10) == [0, 2, 4, 6]
+    assert abt._row_range_bounds(abt.index_to_iterable(pd.Index(range(6))), 3) == [0, 2, 4, 6]
+    assert abt._row_range_bounds([], 2) == [0, 0]
+
+
+def _tbody_rows(html):
+    return [str(row) for row in parse(html).find("tbody").find_all("tr")]
+
+
+def test_HTMLJinjaTableBlock_max_rows():
+    df = pd.DataFrame(np.arange(20, dtype=float).reshape(10, 2), columns=["a", "b"])
+    formatters = [abtf.FmtHeatmap(), abtf.FmtStripeBackground()]
+    table = abt.HTMLJinjaTableBlock(df, formatters=formatters, use_default_formatters=False)
+    truncated = abt.HTMLJinjaTableBlock(df, formatters=formatters, use_default_formatters=False, max_rows=4)
+
+    full_rows = _tbody_rows(table.render_html())
+    truncated_rows = _tbody_rows(truncated.render_html())
+
+    # Heatmap colors are relative to all rows and stripes continue after the elision row
+    assert truncated_rows[:2] == full_rows[:2]
+    assert truncated_rows[3:] == full_rows[-2:]
+    assert [cell.text.strip() for cell in parse(truncated_rows[2]).find_all("td")] == [abt.ELISION] * 3
+
+
+def test_HTMLJinjaTableBlock_max_rows_max_workers():
+    df = pd.DataFrame(np.arange(20, dtype=float).reshape(10, 2), columns=["a", "b"])
+
+    # Truncated rows are rendered in this process
+    html = abt.HTMLJinjaTableBlock(df, max_rows=4, max_workers=2).render_html()
+
+    assert html == abt.HTMLJinjaTableBlock(df, max_rows=4).render_html()
+
+
+def test_HTMLJinjaTableBlock_max_cols():
+    columns = pd.MultiIndex.from_product([["x", "y"], ["a", "b"]])
+    df = pd.DataFrame(np.arange(8, dtype=float).reshape(2, 4), columns=columns)
+    table = abt.HTMLJinjaTableBlock(df, max_cols=3)
+
+    soup = parse(table.render_html())
+
+    header_cells = [cell.text.strip() for cell in soup.find("thead").find_all("tr")[-1].find_all("th")]
+    assert header_cells == ["", "a", "b", abt.ELISION, "b"]
+    body_cells = [cell.text.strip() for cell in soup.find("tbody").find("tr").find_all("td")]
+    assert body_cells == ["0.00", "0.00", "1.00", abt.ELISION, "3.00"]
+
+
+def test_HTMLJinjaTableBlock_max_rows_and_cols_one():
+    df = pd.DataFrame(np.arange(120, dtype=float).reshape(40, 3), columns=["a", "b", "c"])
+
+    rows = _tbody_rows(abt.HTMLJinjaTableBlock(df, max_rows=1).render_html())
+    assert len(rows) == 2
+    assert [cell.text.strip() for cell in parse(rows[0]).find_all("td")] == ["0.00", "0.00", "1.00", "2.00"]
+    assert [cell.text.strip() for cell in parse(rows[1]).find_all("td")] == [abt.ELISION] * 4
+
+    soup = parse(abt.HTMLJinjaTableBlock(df, max_rows=0, max_cols=1).render_html())
+    header_cells = [cell.text.strip() for cell in soup.find("thead").find_all("th")]
+    assert header_cells == ["", "a", abt.ELISION]
+    assert len(soup.find("tbody").find_all("tr")) == 40
+    body_cells = [cell.text.strip() for cell in soup.find("tbody").find("tr").find_all("td")]
+    assert body_cells == ["0.00", "0.00", abt.ELISION]
+
+
+def test_HTMLJinjaTableBlock_max_rows_user_config():
+    df = pd.DataFrame({"a": np.arange(10.0)})
+    with patch.dict(abt.user_config, {"table_max_rows": 4}):
+        assert len(_tbody_rows(abt.HTMLJinjaTableBlock(df).render_html())) == 5
+        assert len(_tbody_rows(abt.HTMLJinjaTableBlock(df, max_rows=0).render_html())) == 10
+
+
+def test_HTMLJinjaTableBlock_profile():
+    df = pd.DataFrame(np.arange(20, dtype=float).reshape(10, 2), columns=["a", "b"])
+    formatters = [abtf.FmtReplaceNaN(0), abtf.FmtStripeBackground(), abtf.FmtDecimals(1)]
+    expected = abt.HTMLJinjaTableBlock(df, formatters, use_default_formatters=False).render_html()
+    table = abt.HTMLJinjaTableBlock(df, formatters, use_default_formatters=False, profile=True)
+    assert table.render_html() == expected
+
+    report = table.render_profile.to_frame()
+    assert list(report.columns) == ["name", "hook", "calls", "seconds"]
+    calls = report.set_index(["name", "hook"])["calls"]
+    assert calls["HTMLJinjaTableBlock", "render_template"] == 1
+    assert calls["HTMLJinjaTableBlock", "parse"] == 1
+    assert calls["FmtReplaceNaN[0]", "modify_dataframe"] == 1
+    assert calls["FmtStripeBackground[1]", "create_body_row_level_css"] == 1
+    # Index and body columns
+    assert calls["FmtDecimals[2]", "modify_column_content"] == 3
+    assert "render_template" in table.render_profile.summary()
+
+    # Cell level CSS is created per header cell and per index and body column
+    table = abt.HTMLJinjaTableBlock(df, [abtf.FmtHeatmap()], use_default_formatters=False, profile=True)
+    table.render_html()
+    assert table.render_profile.timings["FmtHeatmap[0]", "create_cell_level_css"][0] == 3
+    assert table.render_profile.timings["FmtHeatmap[0]", "create_column_cell_level_css"][0] == 3
+
+
+def test_HTMLJinjaTableBlock_profile_partitions():
+    df = pd.DataFrame({"a": np.arange(10.0)})
+    table = abt.HTMLJinjaTableBlock(df, [abtf.FmtDecimals(1)], False, max_rows=4, profile=True)
+    table.render_html()
+    # Head and tail are rendered by partitions of the table, which share its profile, by index and body column
+    assert table.render_profile.timings["FmtDecimals[0]", "modify_column_content"][0] == 4
+    table.render_profile.reset()
+    assert table.render_profile.to_frame().empty
+
+    # Rows rendered in other processes are not recorded
+    parallel = abt.HTMLJinjaTableBlock(df, [abtf.FmtDecimals(1)], False, max_workers=2, profile=True)
+    assert parallel.render_html() == abt.HTMLJinjaTableBlock(df, [abtf.FmtDecimals(1)], False).render_html()
+
+
+def test_HTMLJinjaTableBlock_not_profiled():
+    table = abt.HTMLJinjaTableBlock(pd.DataFrame({"a": [1.0]}))
+    assert table.render_profile is None
+    assert all(
+        isinstance(formatter, abtf.TableFormatter) for formatter in table._hook_formatters["create_cell_level_css"]
+    )
+
+
+def test_StreamingHTMLJinjaTableBlock_matches_table():
+    df = pd.DataFrame(np.arange(20, dtype=float).reshape(10, 2), columns=["a", "b"])
+    df.iloc[3, 1] = np.nan
+    for formatters in (
+        [*_vectorisable_formatters(), abtf.FmtReplaceNaN(0), abtf.FmtAppendTotalsColumn()],
+        [abtf.FmtStripeBackground(), abtf.FmtHideCells(rows=[4])],
+    ):
+        for css_classes in (False, True):
+            table = abt.HTMLJinjaTableBlock(df, formatters=formatters, css_classes=css_classes)
+            chunks = (df.iloc[start : start + 3] for start in range(0, 10, 3))
+            streaming = abt.StreamingHTMLJinjaTableBlock(chunks, formatters=formatters, css_classes=css_classes)
+            assert streaming.render_html() == table.render_html()
+
+
+def test_StreamingHTMLJinjaTableBlock_iter_table_html():
+    df = pd.DataFrame([[1.0, 2.0], [3.0, 4.0]], columns=["a", "b"], index=["x", "y"])
+    table = abt.StreamingHTMLJinjaTableBlock(iter([df.iloc[:1], df.iloc[1:]]), css_classes=True)
+
+    pieces = list(table.iter_table_html())
+
+    assert pieces[0].startswith("<table") and pieces[0].endswith("<tbody>\n")
+    assert [piece.count("<tr") for piece in pieces[1:3]] == [1, 1]
+    assert pieces[3] == " </tbody>\n</table>"
+    # Classes are only known once all rows are rendered
+    assert pieces[4].startswith(f'<style type="text/css">#{table._get_table_id()} .pbs-')
+    with pytest.raises(ValueError, match="already been rendered"):
+        table.render_html()
+
+
+def test_StreamingHTMLJinjaTableBlock_invalid():
+    df = pd.DataFrame([[1.0, 2.0]], columns=["a", "b"])
+    with pytest.raises(ValueError, match="at least one chunk"):
+        abt.StreamingHTMLJinjaTableBlock([])
+    with pytest.raises(ValueError, match="FmtHeatmap"):
+        abt.StreamingHTMLJinjaTableBlock([df], formatters=[abtf.FmtHeatmap()])
+    table = abt.StreamingHTMLJinjaTableBlock([df, df[["a"]]])
+    with pytest.raises(ValueError, match="Columns of all chunks"):
+        table.render_html()
+
+
+def test__vectorised_tbody_falls_back_to_template():
+    formatter = abtf.TableFormatter()
+    formatter._create_cell_level_css = MagicMock(return_value=None)
+    table = abt.HTMLJinjaTableBlock(df, formatters=[formatter], use_default_formatters=False)
+    assert not table._vectorised_tbody
+    df_multiindex = pd.DataFrame([[1.0]], columns=["a"], index=pd.MultiIndex.from_tuples([("x", "y")]))
+    table = abt.HTMLJinjaTableBlock(
+        df_multiindex, formatters=[abtf.FmtExpandMultiIndex()], use_default_formatters=False
+    )
+    assert not table._vectorised_tbody
+    assert abt.HTMLJinjaTableBlock(df)._vectorised_tbody
+
+
+def test__join_css_columns():
+    css = abt._join_css_columns(
+        [np.array(["a", None, None], dtype=object), np.array(["b", "c", None], dtype=object)], 3, "style"
+    )
+    assert css.tolist() == ['style="a; b"', 'style="c"', 'style=""']
+
+
 def test__get_header_iterable_multiindex():
     df = pd.DataFrame(np.arange(12, dtype=float).reshape(3, 4), index=["a", "b", "c"], columns=["aa", "bb", "cc", "aa"])
     df["grouping"] = "g"
@@ -299,6 +1080,27 @@ def test__get_index_iterable_multiindex():
     assert result == expected
 
 
+def test__index_to_iterable_names_refer_to_index():
+    index = pd.MultiIndex.from_product([["x", "y"], range(1000)])
+    result = abt.index_to_iterable(index)
+    names = result[0][0].names
+    assert isinstance(names, abt.IndexNames)
+    assert len(names) == 1000
+    assert names[0] == ("x", 0) and names[-1] == ("x", 999) and names[1:3] == [("x", 1), ("x", 2)]
+    assert names == index[:1000].tolist()
+    with pytest.raises(IndexError):
+        names[1000]
+    assert result[1000][0].names == index[1000:].tolist()
+    # The same list of index values is shared by all cells
+    assert names.values is result[1000][0].names.values
+
+
+def test__index_to_iterable_missing_values_not_merged():
+    index = pd.MultiIndex.from_tuples([(np.nan, "a"), (np.nan, "b"), ("x", "c"), ("x", "d")])
+    result = abt.index_to_iterable(index)
+    assert [[cell.span for cell in cells] for cells in result] == [[1, 1], [1, 1], [2, 1], [1]]
+
+
 def test__get_header_iterable_plain_index():
     columns = ["a", "b", "c", "d", "e"]
     p = pd.DataFrame(np.ones((4, 5)), columns=columns)
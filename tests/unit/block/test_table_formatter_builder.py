@@ -71,3 +71,25 @@ def test_smokey():
     pybloqs.HTMLJinjaTableBlock(TEST_DATA, formatters=fmt_bldr.formatters, use_default_formatters=False).publish(
         "foo.html",
     )
+
+
+def test_color_background_conditionally_adds_one_formatter():
+    fmt_bldr = CommonTableFormatterBuilder(TEST_DATA, use_defaults=False)
+    fmt_bldr.color_background_conditionally(condition=lambda v: v < 3.8, color=colors.YELLOW, columns=["GPA"])
+    fmt_bldr.color_background_conditionally(
+        condition=lambda df: df > 9000, columns=["Tuition Fees", "Tuition Costs"], vectorised=True
+    )
+    fmt_bldr.color_background_conditionally_matching(value="French")
+    assert [type(fmt) for fmt in fmt_bldr.formatters] == [pybloqs.block.table_formatters.FmtConditionalBackground] * 3
+
+    html = pybloqs.HTMLJinjaTableBlock(TEST_DATA, formatters=fmt_bldr.formatters, use_default_formatters=False)
+    cells = [
+        [td.get("style", "") for td in tr.find_all("td")]
+        for tr in pybloqs.html.parse(html.render_html()).find("tbody").find_all("tr")
+    ]
+    columns = ["Id", *TEST_DATA.columns]
+    yellow = "background-color:" + colors.css_color(colors.YELLOW)
+    red = "background-color:" + colors.css_color(colors.RED)
+    assert [yellow in row[columns.index("GPA")] for row in cells] == (TEST_DATA["GPA"] < 3.8).tolist()
+    assert [red in row[columns.index("Tuition Costs")] for row in cells] == (TEST_DATA["Tuition Costs"] > 9000).tolist()
+    assert [red in row[columns.index("Subject")] for row in cells] == (TEST_DATA["Subject"] == "French").tolist()
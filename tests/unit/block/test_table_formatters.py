@@ -7,6 +7,7 @@ import pytest
 
 import pybloqs.block.colors as colors
 import pybloqs.block.table_formatters as pbtf
+from pybloqs.html import parse
 
 TEST_STRING = "dummy"
 
@@ -162,6 +163,276 @@ def test_TableFormatter_create_cell_level_css():
     assert res is None
 
 
+def test_TableFormatter_modify_column_content():
+    tf = pbtf.TableFormatter(rows=["a", "c"], columns=["aa"], apply_to_header_and_index=False)
+    tf._modify_column_content = lambda series, column_name: series * 10
+    series = pd.Series([1.0, 2.0, 3.0], index=["a", "b", "c"], dtype=object)
+
+    res = tf.modify_column_content(series, "aa")
+    assert res.tolist() == [10.0, 2.0, 30.0]
+    assert res.index.tolist() == ["a", "b", "c"]
+    # Unselected column and index are not modified
+    assert tf.modify_column_content(series, "bb").tolist() == [1.0, 2.0, 3.0]
+    assert tf.modify_column_content(series, pbtf.INDEX_COL_NAME).tolist() == [1.0, 2.0, 3.0]
+
+
+def test_TableFormatter_modify_column_content_not_implemented():
+    tf = pbtf.TableFormatter()
+    series = pd.Series([1.0], index=["a"], dtype=object)
+    with pytest.raises(NotImplementedError):
+        tf.modify_column_content(series, "aa")
+
+
+def test_TableFormatter_implements():
+    assert not pbtf.TableFormatter().implements("create_cell_level_css")
+    assert pbtf.FmtBold().implements("create_cell_level_css")
+    assert not pbtf.FmtBold().implements("create_row_level_css")
+    assert pbtf.FmtStripeBackground().implements("create_row_level_css")
+    assert pbtf.FmtReplaceNaN().implements("modify_dataframe")
+    tf = pbtf.TableFormatter()
+    tf.create_table_level_css = lambda: TEST_STRING
+    assert tf.implements("create_table_level_css")
+    assert not tf.implements("unknown_hook")
+
+
+def test_TableFormatter_vectorises_column_content():
+    class CustomNumbers(pbtf.FmtDecimals):
+        def _modify_cell_content(self, data):
+            return TEST_STRING
+
+    assert pbtf.FmtDecimals(2).vectorises_column_content()
+    assert pbtf.FmtDates("{}").vectorises_column_content()
+    assert pbtf.FmtValueToBps().vectorises_column_content()
+    assert not pbtf.FmtHideInsignificant().vectorises_column_content()
+    assert not pbtf.TableFormatter().vectorises_column_content()
+    # Overriding the cell hook in a derived class must not use the column hook of the base class
+    assert not CustomNumbers(2).vectorises_column_content()
+    fmt = pbtf.FmtDecimals(2)
+    fmt._modify_cell_content = lambda data: TEST_STRING
+    assert not fmt.vectorises_column_content()
+
+
+def test_TableFormatter_create_column_cell_level_css():
+    tf = pbtf.FmtBold(rows=["a", "c"], columns=["aa"], apply_to_header_and_index=False)
+    series = pd.Series([1.0, 2.0, 3.0], index=["a", "b", "c"], dtype=object)
+    css = tf.create_column_cell_level_css(series, "aa", np.arange(3))
+    assert css.tolist() == [pbtf.CSS_BOLD, None, pbtf.CSS_BOLD]
+    assert tf.create_column_cell_level_css(series, "bb", np.arange(3)).tolist() == [None, None, None]
+    assert tf.create_column_cell_level_css(series, pbtf.INDEX_COL_NAME, np.arange(3)).tolist() == [None, None, None]
+
+
+def test_TableFormatter_vectorises_css():
+    class CustomBold(pbtf.FmtBold):
+        def _create_cell_level_css(self, data):
+            return TEST_STRING
+
+    assert pbtf.FmtBold().vectorises_cell_level_css()
+    assert pbtf.FmtStripeBackground().vectorises_cell_level_css()
+    assert pbtf.FmtStripeBackground().vectorises_row_level_css()
+    assert pbtf.FmtPageBreak().vectorises_row_level_css()
+    assert pbtf.FmtHeatmap().vectorises_cell_level_css()
+    assert not pbtf.FmtHideCells().vectorises_cell_level_css()
+    assert not pbtf.TableFormatter().vectorises_cell_level_css()
+    assert not CustomBold().vectorises_cell_level_css()
+
+
+def test_TableFormatter_supports_chunks():
+    assert pbtf.TableFormatter().supports_chunks()
+    assert pbtf.FmtStripeBackground().supports_chunks()
+    assert pbtf.FmtReplaceNaN().supports_chunks()
+    assert pbtf.FmtAppendTotalsColumn().supports_chunks()
+    assert pbtf.FmtHeatmap(axis=0).supports_chunks()
+    assert not pbtf.FmtHeatmap().supports_chunks()
+    assert not pbtf.FmtHeatmapWithCenter(axis=1).supports_chunks()
+    assert not pbtf.FmtAppendTotalsRow().supports_chunks()
+    assert not pbtf.FmtExpandMultiIndex().supports_chunks()
+
+
+def test_TableFormatter_partition_rows():
+    df = pd.DataFrame({"aa": [1.0, 5.0, 3.0]}, index=["a", "b", "c"])
+    tf = pbtf.TableFormatter(rows=["a"])
+    tf.bind(df)
+    partition = tf.partition_rows(1, 3)
+    assert partition is not tf and partition.rows == ["a"]
+    assert partition._bound_rows is None and tf._bound_rows is not None
+
+    stripes = pbtf.FmtStripeBackground(first_color=colors.RED, second_color=colors.BLUE)
+    stripes.current_color = stripes.first_color
+    assert stripes.partition_rows(0, 3).current_color == stripes.first_color
+    assert stripes.current_color == stripes.second_color
+    stripes.partition_rows(3, 5)
+    assert stripes.current_color == stripes.second_color
+
+    heatmap = pbtf.FmtHeatmap(axis=0)
+    heatmap.bind(df)
+    partition = heatmap.partition_rows(1, 2)
+    partition.bind(df.iloc[1:2])
+    # Range is kept from the whole table
+    assert partition._heatmap_range.of_cell("b", "aa") == (5.0, 5.0)
+    assert partition._heatmap_range.min_max == ({"b": 5.0}, {"b": 5.0})
+
+
+def test_FmtExpandMultiIndex_partition_rows():
+    fmt = pbtf.FmtExpandMultiIndex()
+    fmt.index_level = [0, 1, 1, 0, 1]
+    assert fmt.partition_rows(0, 2).index_counter == -1
+    assert fmt.index_counter == 1
+    assert fmt.partition_rows(2, 5).index_counter == 1
+    assert fmt.index_counter == 4
+
+
+def test_FmtStripeBackground_body_rows():
+    rows = pd.Index(["a", "b", "c"])
+    fmt = pbtf.FmtStripeBackground(first_color=colors.RED, second_color=colors.BLUE)
+    fmt.create_body_row_level_css(pd.DataFrame(index=rows), rows)
+    css = fmt.create_column_cell_level_css(pd.Series([1, 2, 3], index=rows), "aa", np.arange(3))
+
+    expected = []
+    reference = pbtf.FmtStripeBackground(first_color=colors.RED, second_color=colors.BLUE)
+    for row_name in rows:
+        reference.create_row_level_css(pd.Series(name=row_name))
+        expected.append(reference.create_cell_level_css(FormatterData(1, row_name, "aa", None)))
+    assert css.tolist() == expected
+    assert fmt.current_color == reference.current_color
+
+
+def test_FmtStripeBackground_structural_css():
+    layout = pbtf.TableLayout("t", 1, pd.Index(["aa", "bb"]), fixed_positions=True)
+    fmt = pbtf.FmtStripeBackground(first_color=colors.RED, second_color=colors.BLUE, header_color=colors.GREEN)
+    # Rows continue from the current color
+    fmt.current_color = fmt.first_color
+    assert fmt.create_structural_css(layout) == [
+        "#t > thead > tr:nth-child(n) > th:nth-child(n) {background-color:" + colors.css_color(colors.GREEN) + "}",
+        "#t > tbody > tr:nth-child(odd) > td:nth-child(n) {background-color:" + colors.css_color(colors.BLUE) + "}",
+        "#t > tbody > tr:nth-child(even) > td:nth-child(n) {background-color:" + colors.css_color(colors.RED) + "}",
+    ]
+    assert pbtf.FmtStripeBackground(rows=["a"]).create_structural_css(layout) is None
+
+
+def test_TableFormatter_structural_css_selects_columns():
+    layout = pbtf.TableLayout("t", 2, pd.Index(["aa", "bb", "cc"]), fixed_positions=True)
+    fmt = pbtf.FmtBold(columns=["aa", "cc"], apply_to_header_and_index=(False, True))
+    fmt.bind(pd.DataFrame(columns=layout.body_columns))
+    selectors = [
+        "#t > tbody > tr:nth-child(n) > td:nth-child(-n+2)",
+        "#t > tbody > tr:nth-child(n) > td:nth-child(3)",
+        "#t > tbody > tr:nth-child(n) > td:nth-child(5)",
+    ]
+    assert fmt.create_structural_css(layout) == [",\n".join(selectors) + " {font-weight:bold}"]
+    # Columns of merged index cells are not at fixed positions
+    layout.fixed_positions = False
+    assert fmt.create_structural_css(layout) is None
+    assert pbtf.FmtBold().create_structural_css(layout) is not None
+
+
+def test_TableFormatter_fingerprint():
+    assert pbtf.FmtStripeBackground().fingerprint() == pbtf.FmtStripeBackground().fingerprint()
+    assert pbtf.FmtFontsize(12).fingerprint() != pbtf.FmtFontsize(14).fingerprint()
+    assert pbtf.FmtFontsize(12).fingerprint() != pbtf.FmtBold().fingerprint()
+    # Functions are fingerprinted by code and closure
+    threshold = 1
+    assert (
+        pbtf.FmtConditionalBackground(lambda df: df > threshold, colors.RED).fingerprint()
+        == pbtf.FmtConditionalBackground(lambda df: df > threshold, colors.RED).fingerprint()
+    )
+    assert (
+        pbtf.FmtConditionalBackground(lambda df: df > threshold, colors.RED).fingerprint()
+        != pbtf.FmtConditionalBackground(lambda df: df >= threshold, colors.RED).fingerprint()
+    )
+    mask = pd.DataFrame({"a": [True, False]})
+    assert pbtf.FmtConditionalText(mask).fingerprint() != pbtf.FmtConditionalText(~mask).fingerprint()
+    # Colors of the last rows rendered are left out
+    fmt = pbtf.FmtStripeBackground()
+    fmt.row_colors = np.array([fmt.first_color], dtype=object)
+    assert fmt.fingerprint() == pbtf.FmtStripeBackground().fingerprint()
+
+    fmt.cannot_fingerprint = iter([])
+    with pytest.raises(TypeError):
+        fmt.fingerprint()
+
+
+def test__fingerprint_object_values():
+    # Values of object columns and indexes are fingerprinted by type as well as string representation
+    assert pbtf._fingerprint(pd.DataFrame({"a": [1, 2]}, dtype=object)) != pbtf._fingerprint(
+        pd.DataFrame({"a": ["1", 2]}, dtype=object)
+    )
+    index = pd.Index([1], dtype=object)
+    assert pbtf._fingerprint(pd.Series([1.0], index=index)) != pbtf._fingerprint(pd.Series([1.0], index=["1"]))
+    assert pbtf._fingerprint(pd.Index([1], dtype=object)) != pbtf._fingerprint(pd.Index(["1"]))
+    assert pbtf._fingerprint(pd.DataFrame({"a": ["x", 1]})) == pbtf._fingerprint(pd.DataFrame({"a": ["x", 1]}))
+
+
+def test_TableFormatter_bind():
+    df = pd.DataFrame({"aa": [1, 2], "bb": [3, 4]}, index=["a", "b"])
+    tf = pbtf.TableFormatter(rows=pd.Index(["a", "c"]), columns=["aa", "cc"], apply_to_header_and_index=False)
+    tf.bind(df, row_names=["c"])
+    assert tf._bound_rows[1] == {pbtf.HEADER_ROW_NAME: False, "a": True, "b": False, "c": True}
+    assert tf._bound_columns[1] == {pbtf.INDEX_COL_NAME: False, "aa": True, "bb": False}
+    assert tf._is_selected_cell("a", "aa")
+    assert not tf._is_selected_cell("b", "aa")
+    assert not tf._is_selected_cell("a", "bb")
+    # Names which were not bound are looked up in the selection itself
+    assert tf._is_selected_cell("c", "cc")
+    # Changing the selection after binding invalidates the precomputed lookup
+    tf.rows = ["b"]
+    assert tf._is_selected_cell("b", "aa")
+    tf.unbind()
+    assert tf._bound_rows is None and tf._bound_columns is None
+    assert not tf._is_selected_cell("a", "aa")
+
+
+def test_TableFormatter_bind_no_selection():
+    df = pd.DataFrame({"aa": [1, 2]}, index=["a", "b"])
+    tf = pbtf.TableFormatter(rows=None, columns="aa")
+    tf.bind(df)
+    assert tf._bound_rows is None
+    # Strings keep substring semantics of `in`
+    assert tf._bound_columns[1]["aa"]
+    assert tf._is_selected_cell("a", "a")
+
+
+def test_TableStatistics():
+    df = pd.DataFrame({"aa": [1.0, np.nan, 3.0], "bb": ["x", 2, None]}, index=["a", "b", "c"])
+    stats = pbtf.TableStatistics(df)
+    np.testing.assert_array_equal(stats.numeric_values, [[1.0, np.nan], [np.nan, 2.0], [3.0, np.nan]])
+    np.testing.assert_array_equal(stats.nan_mask, [[False, True], [True, False], [False, True]])
+    np.testing.assert_array_equal(stats.na_mask, [[False, False], [True, False], [False, True]])
+    assert stats.real_mask.to_numpy().tolist() == [[True, False], [True, True], [True, True]]
+    np.testing.assert_array_equal(stats.min(axis=0), [1.0, 2.0])
+    np.testing.assert_array_equal(stats.max(axis=1), [1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(stats.sum(axis=0, rows=np.array([True, False, True])), [4.0, 0.0])
+    assert stats.mean(columns=np.array([True, False])) == 2.0
+    totals = stats.aggregate(pbtf.OP_SUM, axis=0)
+    assert totals["aa"] == 4.0 and totals["bb"] == 2
+    # Statistics are memoized
+    assert stats.numeric_values is stats.numeric_values
+    assert stats.aggregate(pbtf.OP_SUM, axis=0) is totals
+    assert stats.aggregate(pbtf.OP_SUM, axis=0, columns=["aa"]) is not totals
+
+
+def test_TableFormatter_get_statistics():
+    df = pd.DataFrame({"aa": [1, 2]})
+    stats = pbtf.TableStatistics(df)
+    tf = pbtf.TableFormatter()
+    tf.bind(df, statistics=stats)
+    assert tf.get_statistics(df) is stats
+    other = tf.get_statistics(df.copy())
+    assert other is not stats and isinstance(other, pbtf.TableStatistics)
+    tf.unbind()
+    assert tf.get_statistics(df) is not stats
+
+
+def test_FmtHeatmap_shares_statistics():
+    df = pd.DataFrame({"aa": [1.0, 2.0], "bb": [3.0, 4.0]}, index=["a", "b"])
+    stats = pbtf.TableStatistics(df)
+    heatmaps = [pbtf.FmtHeatmap(axis=1), pbtf.FmtHeatmapWithCenter(axis=1)]
+    for fmt in heatmaps:
+        fmt.bind(df, statistics=stats)
+    assert heatmaps[0]._heatmap_range.min_max == heatmaps[1]._heatmap_range.min_max
+    assert heatmaps[0]._heatmap_range.min_max == ({"aa": 1.0, "bb": 3.0}, {"aa": 2.0, "bb": 4.0})
+    assert len(stats._memo) == 3
+
+
 #######################################################################################################################
 
 
@@ -187,6 +458,14 @@ def test_FmtNumbers():
     assert res == "3"
 
 
+def test_FmtNumbers_column_content():
+    fmt = pbtf.FmtNumbers("{:.1f}")
+    series = pd.Series([2.49, TEST_STRING, 3, None, np.nan], index=list("abcde"), dtype=object)
+    res = fmt.modify_column_content(series, "aa")
+    assert res.tolist()[:4] == ["2.5", TEST_STRING, "3.0", None]
+    assert res.tolist()[4] == "nan"
+
+
 def test_FmtDecimals():
     fmt = pbtf.FmtDecimals(1)
     assert fmt.fmt_string == "{:.1f}"
@@ -211,6 +490,18 @@ def test_FmtThousandSeparator():
     assert res == "123,456,789.0"
 
 
+@pytest.mark.parametrize(
+    "fmt",
+    [pbtf.FmtDecimals(3), pbtf.FmtPercent(1), pbtf.FmtThousandSeparator(2), pbtf.FmtValueToBps(), pbtf.FmtYYYYMMDD()],
+)
+def test_column_content_matches_cell_content(fmt):
+    values = [1234.5678, -0.01234, 7, TEST_STRING, np.nan, dt(2001, 1, 2), pd.Timestamp("2020-02-03")]
+    series = pd.Series(values, index=range(len(values)), dtype=object)
+    res = fmt.modify_column_content(series, "aa")
+    expected = [fmt.modify_cell_content(FormatterData(value, i, "aa", None)) for i, value in enumerate(values)]
+    assert [str(value) for value in res] == [str(value) for value in expected]
+
+
 def test_FmtDates():
     fmt = pbtf.FmtDates("{:%B}")
 
@@ -381,6 +672,80 @@ def test_FmtHighlightBackground():
     assert pbtf.CSS_BACKGROUND_COLOR + colors.css_color(c) in res
 
 
+class _CellCSS(pbtf.TableFormatter):
+    """Formatter without vectorised CSS, so tables render it cell by cell."""
+
+    def _create_cell_level_css(self, data):
+        return None
+
+
+@pytest.mark.parametrize(
+    "mask",
+    [
+        pd.DataFrame({"bb": [True, False, True]}, index=["a", "b", "c"]),
+        # Aligned by names, missing cells are not styled
+        pd.DataFrame({"bb": [True, True], "cc": [False, False]}, index=["c", "a"]),
+        lambda df: (df[["bb"]] - 4.0).abs() > 2.0,
+        lambda df: np.column_stack([df["aa"] < 0, df["bb"] != 4.0, df["cc"] < 0]),
+    ],
+)
+def test_FmtConditionalBackground(mask):
+    from pybloqs.block.table import HTMLJinjaTableBlock
+
+    df_c = pd.DataFrame(np.arange(9.0).reshape(3, 3), index=["a", "b", "c"], columns=["aa", "bb", "cc"])
+    css = pbtf.CSS_BACKGROUND_COLOR + colors.css_color(colors.BLUE)
+    expected = [[False, True, False], [False, False, False], [False, True, False]]
+
+    for formatters in (
+        [pbtf.FmtConditionalBackground(mask, colors.BLUE)],
+        [pbtf.FmtConditionalBackground(mask, colors.BLUE), _CellCSS()],
+    ):
+        table = HTMLJinjaTableBlock(df_c, formatters, use_default_formatters=False)
+        assert table._vectorised_tbody == (len(formatters) == 1)
+        rows = parse(table.render_html()).find("tbody").find_all("tr")
+        assert [[css in td.get("style", "") for td in tr.find_all("td")[1:]] for tr in rows] == expected
+        assert css not in str(parse(table.render_html()).find("thead"))
+
+    fmt = pbtf.FmtConditionalBackground(mask, colors.BLUE)
+    # Unbound, the mask is evaluated on the dataframe of the cell
+    assert fmt.create_cell_level_css(FormatterData(1.0, "a", "bb", df_c)) == css
+    assert fmt.create_cell_level_css(FormatterData(1.0, "b", "bb", df_c)) is None
+
+
+def test_FmtConditional_series_and_index():
+    df_c = pd.DataFrame({"aa": [1.0, 2.0, 3.0]}, index=["a", "b", "c"])
+    fmt = pbtf.FmtConditionalText(df_c["aa"] > 1.0, columns=[pbtf.INDEX_COL_NAME, "aa"])
+    fmt.bind(df_c)
+    try:
+        for column_name in (pbtf.INDEX_COL_NAME, "aa"):
+            css = fmt.create_column_cell_level_css(df_c["aa"], column_name, np.arange(3))
+            assert [value is not None for value in css] == [False, True, True]
+        assert fmt.create_cell_level_css(FormatterData(3.0, "c", pbtf.INDEX_COL_NAME, df_c)) is not None
+        assert fmt.create_cell_level_css(FormatterData(1.0, "a", "aa", df_c)) is None
+    finally:
+        fmt.unbind()
+
+    with pytest.raises(ValueError):
+        pbtf.FmtConditionalText(np.ones((2, 2), dtype=bool)).bind(df_c)
+
+
+def test_FmtConditional_partitions():
+    from pybloqs.block.table import HTMLJinjaTableBlock
+
+    df_c = pd.DataFrame({"aa": np.arange(10.0)})
+
+    def mask():
+        # Depends on all rows of the table
+        return pbtf.FmtConditionalBackground(lambda df: df > df.mean())
+
+    table = HTMLJinjaTableBlock(df_c, [mask()], use_default_formatters=False)
+    truncated = HTMLJinjaTableBlock(df_c, [mask()], use_default_formatters=False, max_rows=4)
+    full_rows = [str(tr) for tr in parse(table.render_html()).find("tbody").find_all("tr")]
+    truncated_rows = [str(tr) for tr in parse(truncated.render_html()).find("tbody").find_all("tr")]
+    assert truncated_rows[:2] + truncated_rows[3:] == full_rows[:2] + full_rows[-2:]
+    assert "background-color" in truncated_rows[-1] and "background-color" not in truncated_rows[0]
+
+
 def test_FmtBold():
     fmt = pbtf.FmtBold()
     res = fmt._create_cell_level_css(None)
@@ -561,6 +926,44 @@ def test_FmtHeatmap_cell_css():
     assert res == pbtf.CSS_BACKGROUND_COLOR + colors.css_color(colors.WHITE)
 
 
+@pytest.mark.parametrize(
+    "fmt",
+    [
+        pbtf.FmtHeatmap(threshold=0.5),
+        pbtf.FmtHeatmap(axis=0, columns=["aa", "bb"]),
+        pbtf.FmtHeatmap(axis=1, rows=["a", "b"]),
+        pbtf.FmtHeatmapWithCenter(center=1.0, threshold=0.5),
+        pbtf.FmtHeatmapWithCenter(axis=0, center=-1.0),
+        pbtf.FmtHeatmapWithCenter(axis=1, columns=["aa"], center=2.0),
+    ],
+)
+def test_FmtHeatmap_column_cell_css_matches_cell_css(fmt):
+    df_pn = pd.DataFrame(np.arange(9.0).reshape(3, 3) - 4.0, index=["a", "b", "c"], columns=["aa", "bb", "cc"])
+    df_pn = df_pn.astype(object)
+    df_pn.iloc[0, 1] = "text"
+    df_pn.iloc[1, 2] = np.nan
+    expected = {
+        column_name: [
+            fmt.create_cell_level_css(FormatterData(cell, row_name, column_name, df_pn))
+            for row_name, cell in df_pn[column_name].items()
+        ]
+        for column_name in df_pn.columns
+    }
+
+    fmt.bind(df_pn)
+    try:
+        for column_name in df_pn.columns:
+            css = fmt.create_column_cell_level_css(df_pn[column_name], column_name, np.arange(len(df_pn)))
+            assert css.tolist() == expected[column_name]
+            cell_css = [
+                fmt.create_cell_level_css(FormatterData(cell, row_name, column_name, df_pn))
+                for row_name, cell in df_pn[column_name].items()
+            ]
+            assert cell_css == expected[column_name]
+    finally:
+        fmt.unbind()
+
+
 def test_FmtAppendTotalsRow_modify_dataframe():
     fmt = pbtf.FmtAppendTotalsRow()
     res = fmt._modify_dataframe(df)
@@ -721,6 +1124,35 @@ def test_FmtExpandMultiIndex_modify_dataframe():
     assert res.loc["a"].tolist() == ["", 5.0, "", ("a",)]
 
 
+def test_FmtExpandMultiIndex_modify_dataframe_unsorted_index():
+    index = pd.MultiIndex.from_tuples(
+        [("b", "x", 1), ("a", "y", 1), ("b", "x", 2), ("b", "y", 1), ("b", "y", 1), ("a", "y", 2)]
+    )
+    mi_df = pd.DataFrame({"n": [1.0, 2.0, 4.0, 8.0, 16.0, 32.0], "i": [1, 2, 3, 4, 5, 6], "s": list("uvwxyz")}, index)
+    fmt = pbtf.FmtExpandMultiIndex(operator=pbtf.OP_SUM)
+    res = fmt._modify_dataframe(mi_df)
+    # Groups are aggregated over all their rows, but inserted wherever the index changes. Repeated rows are dropped.
+    assert res.index.tolist() == ["b", "x", 1, "a", "y", 1, "b", "x", 2, "y", 1, "a", "y", 2]
+    assert fmt.index_level == [0, 1, 2, 0, 1, 2, 0, 1, 2, 1, 2, 0, 1, 2]
+    assert res[pbtf.ORG_ROW_NAMES].tolist()[:3] == [("b",), ("b", "x"), ("b", "x", 1)]
+    assert res["n"].tolist() == [29.0, 5.0, 1.0, 34.0, 34.0, 2.0, 29.0, 5.0, 4.0, 24.0, 8.0, 34.0, 34.0, 32.0]
+    assert res.iloc[0].tolist()[1:3] == [13, 0]
+
+    fmt = pbtf.FmtExpandMultiIndex(operator=lambda df, axis: df.max(axis=axis), total_columns=["i"])
+    res = fmt._modify_dataframe(mi_df)
+    assert res.iloc[0].tolist()[:3] == ["", 5, ""]
+
+
+def test_FmtExpandMultiIndex_bind():
+    mi_df = make_multiindex_table()
+    fmt = pbtf.FmtExpandMultiIndex()
+    df = fmt._modify_dataframe(mi_df)
+    fmt.bind(df)
+    assert fmt._max_index_level == 1
+    fmt.unbind()
+    assert fmt._max_index_level is None
+
+
 def test_FmtExpandMultiIndex_cell_css():
     mi_df = make_multiindex_table()
     fmt = pbtf.FmtExpandMultiIndex(
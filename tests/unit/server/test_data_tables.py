@@ -0,0 +1,99 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pybloqs.block.table_formatters as tf
+import pybloqs.server
+import pytest
+from pybloqs.block import colors
+from pybloqs.block.table import HTMLJinjaTableBlock
+from pybloqs.server import _getapp, bloqs_provider
+from pybloqs.server.block import ServerSideDataTable
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": np.arange(30.0), "b": list("xyz") * 10}, index=pd.Index(range(30), name="i"))
+
+
+def test_ServerSideDataTable_writes_no_rows(df):
+    table = ServerSideDataTable(df)
+    html = table.render_html()
+    assert "dt-server-side" in html
+    assert f'"ajax": "{table.url}"' in html
+    assert re.search(r"<tbody>\s*</tbody>", html)
+
+
+def test_ServerSideDataTable_page_data(df):
+    table = ServerSideDataTable(df, [tf.FmtHeatmap(columns=["a"])])
+    params = {
+        "draw": "3",
+        "start": "1",
+        "length": "2",
+        "search[value]": "Y",
+        "order[0][column]": "1",
+        "order[0][dir]": "desc",
+    }
+    data = table._get_page_data(params)
+    assert data["draw"] == 3
+    assert data["recordsTotal"] == 30
+    assert data["recordsFiltered"] == 10
+    assert [row["0"] for row in data["data"]] == ["25", "22"]
+    assert [row["2"] for row in data["data"]] == ["y", "y"]
+
+    # Heatmap colors are relative to the whole table, not the rows sent
+    full = HTMLJinjaTableBlock(df, [tf.FmtHeatmap(columns=["a"])], use_default_formatters=False).render_html()
+    color = data["data"][0]["cell_attrs"][1]["style"]
+    assert re.search(re.escape(color) + r'">\s*25.0', full)
+
+
+def test_ServerSideDataTable_inline_styles(df):
+    # Rows are sent without a stylesheet, so styles are inline even if the table interns them as classes
+    data = ServerSideDataTable(df, [tf.FmtStripeBackground()], css_classes=True)._get_page_data({"draw": "1"})
+    assert data["data"][0]["cell_attrs"][1] == {"style": "background-color:" + colors.css_color(colors.LIGHT_GREY)}
+    assert data["data"][1]["cell_attrs"][1] == {"style": "background-color:" + colors.css_color(colors.WHITE)}
+
+
+def test_ServerSideDataTable_column_search_and_invalid_request(df):
+    table = ServerSideDataTable(df)
+    data = table._get_page_data({"draw": "1", "columns[2][search][value]": "z", "length": "-1"})
+    assert data["recordsFiltered"] == 10
+    assert len(data["data"]) == 10
+
+    assert "error" in table._get_page_data({"draw": "1", "start": "x"})
+    # Requests with an invalid draw counter are answered as draw 0
+    data = table._get_page_data({"draw": "x"})
+    assert data["draw"] == 0 and "error" in data
+    # Columns to order by are counted from the first index level
+    for column in ("3", "-1"):
+        data = table._get_page_data({"draw": "2", "order[0][column]": column})
+        assert data["draw"] == 2 and "error" in data
+
+
+def test_ServerSideDataTable_markup_contents():
+    df = pd.DataFrame({"a": ["x < y & z", "<b>bold</b>"]})
+    data = ServerSideDataTable(df)._get_page_data({"draw": "1"})
+    assert [row["1"] for row in data["data"]] == ["x &lt; y &amp; z", "<b>bold</b>"]
+
+
+def test_ServerSideDataTable_endpoint(df):
+    table = ServerSideDataTable(df)
+    with _getapp().test_request_context(table.url + "?draw=2&start=28&length=10"):
+        data = table.serve_request().get_json()
+    assert data["recordsFiltered"] == 30
+    assert [row["0"] for row in data["data"]] == ["28.00", "29.00"]
+
+
+def test_ServerSideDataTable_created_by_provider(df, monkeypatch):
+    # The endpoint is registered once with a new app, which has handled requests before the table is created
+    monkeypatch.delattr(pybloqs.server, "app", raising=False)
+
+    @bloqs_provider
+    def provider():
+        return ServerSideDataTable(df)
+
+    client = _getapp().test_client()
+    html = client.get(provider.url).get_data(as_text=True)
+    url = re.search(r'"ajax": "([^"]+)"', html).group(1)
+    data = client.get(url + "?draw=1&start=5&length=2").get_json()
+    assert [row["0"] for row in data["data"]] == ["5.00", "6.00"]
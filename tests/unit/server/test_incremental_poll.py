@@ -0,0 +1,69 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+from pybloqs.block.table import HTMLJinjaTableBlock
+from pybloqs.server import _getapp
+from pybloqs.server.block import IncrementalPoll
+from pybloqs.server.provider import BloqsProvider
+
+
+@pytest.fixture
+def tables():
+    """Provided dataframe, which tests replace, and a poll of the table of it."""
+    state = {"df": pd.DataFrame(np.arange(12.0).reshape(4, 3), columns=["a", "b", "c"])}
+    poll = IncrementalPoll(BloqsProvider(lambda: HTMLJinjaTableBlock(state["df"])))
+    return state, poll
+
+
+def _get(poll, version=None):
+    url = poll.url if version is None else f"{poll.url}?version={version}"
+    with _getapp().test_request_context(url):
+        return poll.serve_request()
+
+
+def _version(response):
+    return re.search(r'name="version"[^>]* value="(\w+)"', response.get_data(as_text=True)).group(1)
+
+
+def test_IncrementalPoll_writes_container(tables):
+    _, poll = tables
+    html = poll.render_html()
+    assert f'hx-get="{poll.url}"' in html
+    assert f'hx-include="#poll{poll._id}-version"' in html
+
+
+def test_IncrementalPoll_sends_changed_cells(tables):
+    state, poll = tables
+    first = _get(poll)
+    assert first.headers["HX-Reswap"] == "innerHTML"
+    assert f'id="cells{poll._id}-3-3"' in first.get_data(as_text=True)
+    version = _version(first)
+
+    # Polls of the same table send nothing
+    assert _get(poll, version).status_code == 204
+
+    state["df"] = state["df"].copy()
+    state["df"].iloc[2, 1] = 99.0
+    update = _get(poll, version)
+    assert update.headers["HX-Reswap"] == "none"
+    text = update.get_data(as_text=True)
+    assert re.findall(r'<td hx-swap-oob="true" id="([\w-]+)"', text) == [f"cells{poll._id}-2-2"]
+    assert "99.00" in text
+    assert "<tr" not in text
+    assert _get(poll, _version(update)).status_code == 204
+
+
+def test_IncrementalPoll_sends_whole_table(tables):
+    state, poll = tables
+    version = _version(_get(poll))
+
+    # Unknown versions, e.g. evicted ones, and changed shapes get the whole table
+    assert _get(poll, "unknown").headers["HX-Reswap"] == "innerHTML"
+    state["df"] = pd.concat([state["df"], state["df"]])
+    update = _get(poll, version)
+    assert update.headers["HX-Reswap"] == "innerHTML"
+    text = update.get_data(as_text=True)
+    assert f'id="cells{poll._id}-7-0"' in text
+    assert 'hx-swap-oob="true"' not in text
@@ -0,0 +1,97 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pybloqs.block.table_formatters as tf
+import pybloqs.server
+import pytest
+from pybloqs.block.table import HTMLJinjaTableBlock
+from pybloqs.server import _getapp, bloqs_provider
+from pybloqs.server.block import PaginatedTable
+
+
+def _formatters():
+    return [tf.FmtHeatmap(), tf.FmtStripeBackground(), tf.FmtAppendTotalsRow()]
+
+
+def _get_page(table, page):
+    with _getapp().test_request_context(table.page_url(page)):
+        return table.serve_request()
+
+
+def _body_rows(html):
+    """Rows of the table body, without the rows loading further pages. Rows are indented by their depth in the page."""
+    return [re.sub(r"\n\s*", "\n", row) for row in re.findall(r"<tr .*?</tr>", html, re.DOTALL) if "hx-get" not in row]
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(np.arange(50.0).reshape(25, 2), columns=["a", "b"])
+
+
+def test_PaginatedTable_infinite_scroll(df):
+    table = PaginatedTable(df, _formatters(), use_default_formatters=False, page_size=10)
+    html = table.render_html()
+    assert f'hx-get="{table.page_url(1)}" hx-trigger="revealed"' in html
+
+    pages = [html] + [_get_page(table, page) for page in (1, 2)]
+    assert f'hx-get="{table.page_url(2)}"' in pages[1]
+    assert "hx-trigger" not in pages[2]
+    assert "<table" not in pages[1]
+
+    # Formatters are bound to the whole table, so pages combined match the table rendered at once
+    full = HTMLJinjaTableBlock(df, _formatters(), use_default_formatters=False).render_html()
+    assert [row for page in pages for row in _body_rows(page.split("<tbody>")[-1])] == _body_rows(
+        full.split("<tbody>")[-1]
+    )
+
+
+def test_PaginatedTable_pager(df):
+    table = PaginatedTable(df, _formatters(), use_default_formatters=False, page_size=10, infinite_scroll=False)
+    html = table.render_html()
+    assert "revealed" not in html
+    assert "Page 1 of 3" in html
+    assert table.page_url(1) in html
+
+    last = _get_page(table, 5)
+    assert "Page 3 of 3" in last
+    assert "<table" in last
+    assert len(_body_rows(last.split("<tbody>")[-1])) == 6
+
+
+@pytest.mark.parametrize("infinite_scroll", [True, False])
+def test_PaginatedTable_pages_do_not_depend_on_previous_requests(df, infinite_scroll):
+    # Pages of an odd number of rows start with either of the alternating row colors of the shared default formatters
+    table = PaginatedTable(df, page_size=7, infinite_scroll=infinite_scroll)
+    first = _body_rows(_get_page(table, 2))
+    _get_page(table, 1)
+    assert _body_rows(_get_page(table, 2)) == first
+
+
+def test_PaginatedTable_invalid_page(df):
+    table = PaginatedTable(df, _formatters(), use_default_formatters=False, page_size=10, infinite_scroll=False)
+    for page in ("abc", "", "1.5", -1):
+        assert "Page 1 of 3" in _get_page(table, page)
+    with _getapp().test_request_context(table.url):
+        assert "Page 1 of 3" in table.serve_request()
+
+
+def test_PaginatedTable_invalid_page_size(df):
+    with pytest.raises(ValueError):
+        PaginatedTable(df, page_size=0)
+
+
+def test_PaginatedTable_created_by_provider(df, monkeypatch):
+    # The endpoint is registered once with a new app, which has handled requests before the table is created
+    monkeypatch.delattr(pybloqs.server, "app", raising=False)
+
+    @bloqs_provider
+    def provider():
+        return PaginatedTable(df, _formatters(), use_default_formatters=False, page_size=10)
+
+    client = _getapp().test_client()
+    html = client.get(provider.url).get_data(as_text=True)
+    page_url = re.search(r'hx-get="([^"]+)" hx-trigger="revealed"', html).group(1)
+    page = client.get(page_url).get_data(as_text=True)
+    assert "<table" not in page
+    assert len(_body_rows(page)) == 10
@@ -0,0 +1,28 @@
+import pybloqs.server
+import pytest
+from pybloqs.server import _getapp
+from pybloqs.server.registry import BlockRegistry
+
+
+class _Block(pybloqs.BaseBlock):
+    def serve_request(self) -> str:
+        return self._id
+
+
+def test_BlockRegistry_drops_least_recent_blocks(monkeypatch):
+    registry = BlockRegistry(max_blocks=2)
+    monkeypatch.setattr(pybloqs.server.registry, "block_registry", registry)
+    first, second, third = _Block(), _Block(), _Block()
+    urls = [registry.add(first), registry.add(second)]
+    # Requests keep a block like registering it again
+    client = _getapp().test_client()
+    assert client.get(urls[0]).get_data(as_text=True) == first._id
+    registry.add(third)
+    assert registry.get(second._id) is None
+    assert client.get(urls[1]).status_code == 404
+    assert registry.get(first._id) is first and registry.get(third._id) is third
+
+
+def test_BlockRegistry_invalid_max_blocks():
+    with pytest.raises(ValueError):
+        BlockRegistry(max_blocks=0)
@@ -34,6 +34,25 @@ def test_append_to():
     assert str(p) == "<html><script></script></html>"
 
 
+def test_append_verbatim():
+    p = h.root()
+    h.append_to(p, "body")
+    h.append_verbatim(p.body, '<table a="1">\n<tr><td>a & b</td></tr>\n</table>')
+    assert h.render(p, pretty=False) == '<html><body><table a="1">\n<tr><td>a & b</td></tr>\n</table></body></html>'
+    assert '<table a="1">\n<tr><td>a & b</td></tr>\n</table>' in h.render(p, pretty=True)
+
+
+def test_append_verbatim_indent():
+    p = h.root()
+    h.append_to(p, "body")
+    h.append_verbatim(p.body, "<table>\n <tr>\n </tr>\n</table>", indent=True)
+    assert h.render(p, pretty=False) == "<html><body><table>\n <tr>\n </tr>\n</table></body></html>"
+    # Lines are indented to the depth of the element, like by prettify()
+    assert h.render(p, pretty=True) == "<html>\n <body>\n  <table>\n   <tr>\n   </tr>\n  </table>\n </body>\n</html>\n"
+    assert h.render(p.parent, pretty=True) == h.render(p, pretty=True)
+    assert h.render(p.body, pretty=True) == "<body>\n <table>\n  <tr>\n  </tr>\n </table>\n</body>\n"
+
+
 def test_construct_element():
     el = h.construct_element(container=None, content="content", tag="tag", element_type="text/tag")
     assert str(el) == '<tag type="text/tag">content</tag>'